@@ -0,0 +1,72 @@
+"""
+Benchmark of the cold start: how long importing the Flask app takes.
+
+Every run imports src/app.py in a fresh interpreter, as a serverless cold start
+does. The benchmark fails (exit status 1) when the median import time exceeds
+the budget or when a module that is only needed to build reports (pandas,
+pymongo, evds) was imported.
+
+Usage:
+    python benchmarks/bench_import_time.py [--runs 5] [--budget 0.5] [--output results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that must be imported on the first report, never on app import
+DEFERRED_MODULES = ('pandas', 'numpy', 'pymongo', 'evds')
+
+IMPORT_SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import app
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds,
+                   'loaded': [name for name in {DEFERRED_MODULES!r} if name in sys.modules]}}))
+"""
+
+
+def measure_import() -> dict:
+    env = dict(os.environ, PYTHONPATH=str(ROOT / 'src'))
+    output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the import time of the Flask app')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=0.5, help='Largest accepted median import time in seconds')
+    parser.add_argument('--output', help='JSON file for the results')
+    args = parser.parse_args()
+
+    runs = [measure_import() for _ in range(args.runs)]
+    median = statistics.median(run['seconds'] for run in runs)
+    loaded = sorted({name for run in runs for name in run['loaded']})
+
+    print(f"import app: median {median:.3f}s over {args.runs} runs (budget {args.budget:.3f}s)")
+    if loaded:
+        print(f"deferred modules imported: {', '.join(loaded)}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            'arguments': vars(args),
+            'results': {'median_seconds': round(median, 4),
+                        'runs': [round(run['seconds'], 4) for run in runs],
+                        'deferred_modules_loaded': loaded}
+        }, indent=2))
+        print(f"Results written to {args.output}")
+
+    if median > args.budget or loaded:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
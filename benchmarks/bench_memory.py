@@ -0,0 +1,99 @@
+"""
+Benchmark of the memory the parsed records of a statement take.
+
+Parses the sections of a synthetic statement under tracemalloc and reports,
+per parser, the bytes the parsed records keep alive (retained) and the peak
+of the parse, both per record. A Trade is one closed lot, so the Trades line
+is the bytes per lot. Rates come from a deterministic stub. The benchmark
+fails (exit status 1) when the retained bytes per lot exceed the budget.
+
+Usage:
+    python benchmarks/bench_memory.py [--rows 100000] [--budget 2000] [--output results.json]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from bench_report_stages import StubRateService  # noqa: E402
+from parsers.dividend_parser import DividendParser  # noqa: E402
+from parsers.fee_parser import FeeParser  # noqa: E402
+from parsers.trade_parser import TradeParser  # noqa: E402
+from parsers.withholding_tax_parser import WithholdingTaxParser  # noqa: E402
+from services.report_service import ReportService  # noqa: E402
+from utils.csv_preprocessor import CSVPreprocessor  # noqa: E402
+from utils.statement_generator import StatementGenerator  # noqa: E402
+
+
+def measure(parser, section_dfs) -> dict:
+    """Retained and peak bytes of parsing the sections, and the number of records"""
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    # Keep what the parser returns: a list of records or a columnar store
+    parsed = [parser.parse(section_df) for section_df in section_dfs]
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = sum(len(records) for records in parsed)
+    return {
+        'records': count,
+        'retained_bytes_per_record': round((current - start) / count) if count else None,
+        'peak_bytes_per_record': round((peak - start) / count) if count else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the memory of parsed records')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--budget', type=int, help='Largest accepted retained bytes per lot')
+    parser.add_argument('--output', help='JSON file for the results')
+    args = parser.parse_args()
+
+    # Parsers log to output/ relative to the project root
+    os.chdir(ROOT)
+    (ROOT / 'output').mkdir(exist_ok=True)
+
+    rates = StubRateService()
+    parsers = [TradeParser(rates), FeeParser(rates), DividendParser(rates), WithholdingTaxParser(rates)]
+    service = ReportService(parsers, writer=None)
+
+    statement_path = ROOT / 'output' / f'bench_memory_{args.rows}.csv'
+    try:
+        StatementGenerator(seed=args.seed).write(str(statement_path), args.rows)
+        sections = service._split_into_sections(CSVPreprocessor.preprocess(str(statement_path)))
+    finally:
+        statement_path.unlink(missing_ok=True)
+
+    results = {}
+    for section_parser in parsers:
+        section_dfs = [df for name, df in sections if service._find_parser(name) is section_parser]
+        name = type(section_parser).__name__
+        results[name] = measure(section_parser, section_dfs)
+        print(f"{name:<22} {results[name]['records']:>8} records  "
+              f"{results[name]['retained_bytes_per_record']:>6} bytes retained  "
+              f"{results[name]['peak_bytes_per_record']:>6} bytes peak per record")
+
+    bytes_per_lot = results['TradeParser']['retained_bytes_per_record']
+    print(f"bytes per lot: {bytes_per_lot}" + (f" (budget {args.budget})" if args.budget else ''))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({'arguments': vars(args), 'results': results}, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.budget and bytes_per_lot > args.budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark of rate resolution with cold and warm caches, fully offline.
+
+Runs the whole report on a synthetic statement against FakeRateSource (with
+injectable latency, failure rate and missing dates) and an in-memory database:
+
+    cold      empty rate cache and database, as on a fresh deployment
+    warm_db   empty rate cache, rates stored in the database, as in a new worker
+    warm      rate cache and database filled by the previous runs
+
+Usage:
+    python benchmarks/bench_rate_resolution.py [--rows 10000] [--latency 0.05]
+        [--failure-rate 0] [--missing-rate 0] [--output results.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from datetime import date
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from databases.memory_db import MemoryDB  # noqa: E402
+from parsers.dividend_parser import DividendParser  # noqa: E402
+from parsers.fee_parser import FeeParser  # noqa: E402
+from parsers.trade_parser import TradeParser  # noqa: E402
+from parsers.withholding_tax_parser import WithholdingTaxParser  # noqa: E402
+from rate_sources.fake_rate_source import FakeRateSource  # noqa: E402
+from services.evds_service import EvdsService  # noqa: E402
+from services.rate_cache_service import RateCacheService  # noqa: E402
+from services.report_service import ReportService  # noqa: E402
+from utils.statement_generator import StatementGenerator  # noqa: E402
+from writers.csv_report_writer import CSVReportWriter  # noqa: E402
+
+
+def run_report(evds_service: EvdsService, statement_path: str, work_dir: str) -> float:
+    parsers = [TradeParser(evds_service), FeeParser(evds_service),
+               DividendParser(evds_service), WithholdingTaxParser(evds_service)]
+
+    # process_report removes the statement it reads
+    input_path = os.path.join(work_dir, 'input.csv')
+    shutil.copyfile(statement_path, input_path)
+
+    start = time.perf_counter()
+    with CSVReportWriter(os.path.join(work_dir, 'report.csv')) as writer:
+        ReportService(parsers, writer, evds_service).process_report(input_path)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold and warm rate caches offline')
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds per rate source call')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of rate source calls that fail')
+    parser.add_argument('--missing-rate', type=float, default=0.0, help='Share of business days without a rate')
+    parser.add_argument('--output', help='JSON file for the results')
+    args = parser.parse_args()
+
+    # Services log to output/ relative to the project root
+    os.chdir(ROOT)
+    (ROOT / 'output').mkdir(exist_ok=True)
+
+    source = FakeRateSource(latency_seconds=args.latency, failure_rate=args.failure_rate,
+                            missing_rate=args.missing_rate, published_until=date.today(), seed=args.seed)
+    database = MemoryDB()
+    cache = RateCacheService.get_instance()
+    results = {}
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        statement_path = os.path.join(work_dir, 'statement.csv')
+        StatementGenerator(seed=args.seed).write(statement_path, args.rows)
+
+        evds_service = None
+        for scenario in ('cold', 'warm_db', 'warm'):
+            if scenario != 'warm':
+                cache.clear()
+                evds_service = EvdsService(database, source)
+
+            calls_before = source.calls
+            seconds = run_report(evds_service, statement_path, work_dir)
+            results[scenario] = {
+                'seconds': round(seconds, 4),
+                'rate_source_calls': source.calls - calls_before
+            }
+            print(f"{scenario:>8}: {seconds:8.3f}s  {source.calls - calls_before:5d} rate source calls")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({'arguments': vars(args), 'results': results}, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
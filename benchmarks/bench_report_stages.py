@@ -0,0 +1,215 @@
+"""
+End-to-end benchmark of the report pipeline on synthetic IBKR statements.
+
+Times every stage separately: CSVPreprocessor.preprocess,
+ReportService._split_into_sections, each parser and CSVReportWriter. Rates
+come from a deterministic stub, so the numbers measure the pipeline and not
+EVDS or MongoDB. With --rates fake they come from EvdsService over an empty
+in-memory database and the fake rate source, and the rate cache is cleared
+before every run, so each run resolves its rates cold; --rate-latency sets
+the seconds every rate source call takes. With --parse-workers above one the
+sections are parsed on ReportService's thread pool and written as they are
+merged, timed together as parse_and_write. Results are written as JSON and
+can be compared with an earlier run.
+
+Usage:
+    python benchmarks/bench_report_stages.py [--rows 1000 10000 100000] [--repeat 3]
+        [--rates stub|fake] [--rate-latency 0.05] [--parse-workers 4]
+        [--output results.json] [--compare earlier.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import List, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from databases.memory_db import MemoryDB  # noqa: E402
+from parsers.dividend_parser import DividendParser  # noqa: E402
+from parsers.fee_parser import FeeParser  # noqa: E402
+from parsers.trade_parser import TradeParser  # noqa: E402
+from parsers.withholding_tax_parser import WithholdingTaxParser  # noqa: E402
+from rate_sources.fake_rate_source import FakeRateSource  # noqa: E402
+from services.evds_service import EvdsService  # noqa: E402
+from services.rate_cache_service import RateCacheService  # noqa: E402
+from services.report_service import ReportService  # noqa: E402
+from utils.csv_preprocessor import CSVPreprocessor  # noqa: E402
+from utils.statement_generator import StatementGenerator  # noqa: E402
+from writers.csv_report_writer import CSVReportWriter  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+RESULTS_DIR = ROOT / 'benchmarks' / 'results'
+
+
+class StubRateService:
+    """Deterministic rates without I/O"""
+
+    def get_exchange_rate(self, date: datetime) -> Decimal:
+        return Decimal(date.toordinal() % 3000 + 10000) / Decimal('1000')
+
+    def get_next_available_exchange_rate(self, date: datetime) -> Decimal:
+        return self.get_exchange_rate(date + timedelta(days=1))
+
+    def get_yiufe_index_rate(self, buy_date: datetime, sell_date: datetime) -> Decimal:
+        return Decimal((sell_date.year - buy_date.year) * 12 + sell_date.month - buy_date.month) * Decimal('2.5')
+
+    def get_yiufe_index_rates(self, buy_dates: Sequence[datetime], sell_dates: Sequence[datetime]) -> List[Decimal]:
+        return [self.get_yiufe_index_rate(buy_date, sell_date) for buy_date, sell_date in zip(buy_dates, sell_dates)]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run_once(statement_path: str, report_path: str, rate_mode: str = 'stub', rate_latency: float = 0.0,
+             parse_workers: int = 1) -> dict:
+    """Seconds spent in each stage for one pass over the statement"""
+    evds_service = None
+    if rate_mode == 'fake':
+        RateCacheService.get_instance().clear()
+        rates = evds_service = EvdsService(MemoryDB(), FakeRateSource(latency_seconds=rate_latency))
+    else:
+        rates = StubRateService()
+    parsers = [TradeParser(rates), FeeParser(rates), DividendParser(rates), WithholdingTaxParser(rates)]
+    service = ReportService(parsers, writer=None, evds_service=evds_service, parse_workers=parse_workers)
+    stages = {}
+
+    df, stages['preprocess'] = timed(CSVPreprocessor.preprocess, statement_path)
+    sections, stages['split_sections'] = timed(service._split_into_sections, df)
+    table, stages['resolve_rates'] = timed(service._resolve_rates, sections)
+
+    if parse_workers > 1:
+        def parse_and_write():
+            with CSVReportWriter(report_path) as writer:
+                service.writer = writer
+                service._process_sections_in_parallel(sections, len(sections), table)
+                writer.write_summary(service.accumulator)
+
+        _, stages['parse_and_write'] = timed(parse_and_write)
+        stages['total'] = sum(stages.values())
+        return stages
+
+    # Sections go to the same parser as in ReportService.process_report
+    parsed = []
+    for parser in parsers:
+        stages[f"parse_{type(parser).__name__}"] = 0.0
+    for section_name, section_df in sections:
+        parser = service._find_parser(section_name)
+        if parser:
+            data, seconds = timed(parser.parse, section_df, table)
+            stages[f"parse_{type(parser).__name__}"] += seconds
+            parsed.append((section_name, data))
+
+    def write_report():
+        with CSVReportWriter(report_path) as writer:
+            for section_name, data in parsed:
+                writer.write_section(section_name, data, service.accumulator)
+            writer.write_summary(service.accumulator)
+
+    _, stages['write_report'] = timed(write_report)
+    stages['total'] = sum(stages.values())
+    return stages
+
+
+def run(sizes, repeat: int, seed: int, **options) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for rows in sizes:
+            statement_path = os.path.join(work_dir, f'statement_{rows}.csv')
+            report_path = os.path.join(work_dir, f'report_{rows}.csv')
+            row_count = StatementGenerator(seed=seed).write(statement_path, rows)
+
+            # Best of the repeats: the least disturbed measurement of each stage
+            runs = [run_once(statement_path, report_path, **options) for _ in range(repeat)]
+            stages = {stage: min(r[stage] for r in runs) for stage in runs[0]}
+            results[str(rows)] = {
+                'rows': row_count,
+                'seconds': {stage: round(seconds, 6) for stage, seconds in stages.items()},
+                'rows_per_second': round(row_count / stages['total']) if stages['total'] else None
+            }
+            print_size(rows, results[str(rows)])
+    return results
+
+
+def print_size(rows: int, result: dict) -> None:
+    print(f"\n{rows} rows ({result['rows_per_second']} rows/s)")
+    for stage, seconds in result['seconds'].items():
+        print(f"  {stage:<32} {seconds:>10.4f}s")
+
+
+def compare(current: dict, earlier: dict) -> None:
+    """Print the stage times of both runs and the change, for the sizes they share"""
+    print(f"\n{'rows':>10} {'stage':<32} {'earlier (s)':>12} {'current (s)':>12} {'change':>8}")
+    for size, result in current['results'].items():
+        previous = earlier['results'].get(size)
+        if not previous:
+            continue
+        for stage, seconds in result['seconds'].items():
+            before = previous['seconds'].get(stage)
+            if before is None:
+                continue
+            change = f"{(seconds - before) / before * 100:+.1f}%" if before else '-'
+            print(f"{size:>10} {stage:<32} {before:>12.4f} {seconds:>12.4f} {change:>8}")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the report pipeline stage by stage')
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_SIZES, help='Statement sizes (up to 1000000)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--rates', choices=('stub', 'fake'), default='stub',
+                        help='Rate stub, or EvdsService over the fake rate source with a cold cache')
+    parser.add_argument('--rate-latency', type=float, default=0.05, help='Seconds per fake rate source call')
+    parser.add_argument('--parse-workers', type=int, default=1, help='Threads parsing the sections')
+    parser.add_argument('--output', help='JSON file for the results (default: benchmarks/results/<time>.json)')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare with')
+    args = parser.parse_args()
+
+    # Parsers log to output/ relative to the project root
+    os.chdir(ROOT)
+    (ROOT / 'output').mkdir(exist_ok=True)
+
+    current = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'rates': args.rates,
+        'rate_latency': args.rate_latency,
+        'parse_workers': args.parse_workers,
+        'results': run(args.rows, args.repeat, args.seed, rate_mode=args.rates,
+                       rate_latency=args.rate_latency, parse_workers=args.parse_workers)
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(current, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(current, json.loads(Path(args.compare).read_text()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark of ReportService._split_into_sections on large synthetic statements.
+
+Compares the header-mask implementation against the former row-by-row loop.
+
+Usage:
+    python benchmarks/bench_split_sections.py [--rows 10000 50000 200000]
+"""
+import argparse
+import sys
+import time
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+import pandas as pd  # noqa: E402
+
+from services.report_service import ReportService  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 50_000, 200_000]
+SECTION_NAMES = ['Trades', 'Dividends', 'Withholding Tax', 'Fees', 'Open Positions']
+SECTION_LENGTH = 5000
+COLUMNS = 17
+
+
+def build_statement(rows: int) -> pd.DataFrame:
+    data = []
+    for i in range(rows):
+        section_name = SECTION_NAMES[(i // SECTION_LENGTH) % len(SECTION_NAMES)]
+        row_type = "Header" if i % SECTION_LENGTH == 0 else "Data"
+        data.append([section_name, row_type] + [str(i)] * (COLUMNS - 2))
+    return pd.DataFrame(data)
+
+
+def split_row_by_row(df: pd.DataFrame):
+    """Previous implementation, kept here as the baseline"""
+    sections = []
+    current_section = None
+    current_rows = []
+
+    for _, row in df.iterrows():
+        section_name = row.iloc[0]
+        if row.iloc[1] == "Header":
+            if current_section and current_rows:
+                sections.append((current_section, pd.DataFrame(current_rows)))
+            current_section = section_name
+            current_rows = []
+        current_rows.append(row)
+
+    if current_section and current_rows:
+        sections.append((current_section, pd.DataFrame(current_rows)))
+
+    return sections
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main(sizes):
+    service = ReportService(parsers=[], writer=None)
+
+    print(f"{'rows':>10} {'row-by-row (s)':>16} {'header mask (s)':>16} {'speedup':>9}")
+    for rows in sizes:
+        df = build_statement(rows)
+        expected, baseline_time = timed(split_row_by_row, df)
+        sections, mask_time = timed(service._split_into_sections, df)
+
+        assert [name for name, _ in sections] == [name for name, _ in expected]
+        assert all(a.equals(b) for (_, a), (_, b) in zip(sections, expected))
+
+        print(f"{rows:>10} {baseline_time:>16.3f} {mask_time:>16.4f} {baseline_time / mask_time:>8.0f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark splitting a statement into sections')
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_SIZES, help='Statement sizes')
+    main(parser.parse_args().rows)
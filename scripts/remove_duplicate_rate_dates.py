@@ -0,0 +1,51 @@
+"""
+One-off cleanup of rate stores written before the unique date indexes existed.
+
+Keeps the oldest document of every date in the exchange_rates and
+yiufe_indices collections, deletes the others and then creates the indexes.
+MongoDB.ensure_indexes only logs an error while duplicates block an index;
+run this once, with the application stopped, to remove them.
+
+Usage:
+    MONGODB_URI=... python scripts/remove_duplicate_rate_dates.py [--dry-run]
+"""
+import argparse
+import sys
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+
+from databases.mongo_db import MongoDB  # noqa: E402
+
+
+def duplicate_ids(collection) -> list:
+    """Ids of every document but the oldest of each date"""
+    duplicates = collection.aggregate([
+        {'$sort': {'_id': 1}},
+        {'$group': {'_id': '$date', 'ids': {'$push': '$_id'}, 'count': {'$sum': 1}}},
+        {'$match': {'count': {'$gt': 1}}}
+    ])
+    return [document_id for duplicate in duplicates for document_id in duplicate['ids'][1:]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Remove duplicate dates from the rate stores')
+    parser.add_argument('--dry-run', action='store_true', help='Only count the duplicates')
+    args = parser.parse_args()
+
+    database = MongoDB()
+    for collection in (database.exchange_rates, database.yiufe_indices):
+        ids = duplicate_ids(collection)
+        if ids and not args.dry_run:
+            collection.delete_many({'_id': {'$in': ids}})
+        print(f"{collection.name}: {len(ids)} duplicate documents" + (' found' if args.dry_run else ' removed'))
+
+    if not args.dry_run:
+        database.ensure_indexes()
+        print("Indexes created; failures are logged in output/error.log")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,12 @@
-# Service and writer imports
-from services.report_service import ReportService
-from writers.csv_report_writer import CSVReportWriter
+# Service imports; pandas, pymongo and evds are imported by the services that
+# build reports, on the first upload, so a cold start only loads Flask
+from api.api_error import APIError
+from api.api_success import APISuccess
+from services.job_service import JOB_DONE, JobService
+from services.report_cache_service import ReportCacheService
 
 # Standard library imports
-from flask import Flask, request, send_file, render_template
+from flask import Flask, abort, jsonify, request, send_file, render_template, url_for
 from pathlib import Path
 from utils.config import OUTPUT_DIR
 from werkzeug.datastructures import FileStorage
@@ -12,25 +15,9 @@ from werkzeug.datastructures import FileStorage
 import utils.config as config
 from utils.file_manager import FileManager
 
-# Parser imports
-from parsers.dividend_parser import DividendParser
-from parsers.fee_parser import FeeParser
-from parsers.trade_parser import TradeParser
-from parsers.withholding_tax_parser import WithholdingTaxParser
-
 
 app = Flask(__name__, template_folder='templates/')
 file_manager = FileManager()
-file_manager.clear_directory(config.OUTPUT_DIR)
-
-
-def initialize_parsers():
-    return [
-        TradeParser(),
-        FeeParser(),
-        DividendParser(),
-        WithholdingTaxParser(),
-    ]
 
 
 @app.route('/')
@@ -60,10 +47,12 @@ def index():
 
     Note:
         The function expects a file to be uploaded with the form field name 'file'
-        The uploaded file is temporarily saved as 'temp_uploaded_file.csv'
+        Every upload gets its own report id; the uploaded file and the report are
+        kept in a directory of that id, so concurrent uploads never share files
     """
     summary = None
     error_message = None
+    report_id = None
     if request.method == 'POST':
         try:
             # File check
@@ -74,34 +63,115 @@ def index():
             if file.filename == '':
                 raise ValueError('Dosya seçilmedi')
 
-            # Save as temporary file
-            temp_path = file_manager.create_file(config.TEMP_PATH)
-            file.save(temp_path)
+            remove_stale_outputs()
 
-            # Create report service
-            writer = CSVReportWriter(config.REPORT_PATH)
-            service = ReportService(initialize_parsers(), writer)
+            # Save as temporary file in the directory of this report
+            report_id, report_dir = file_manager.create_report_directory(config.REPORTS_DIR)
+            temp_path = report_dir / config.TEMP_NAME
+            file.save(temp_path)
 
-            # Process report and get summary
+            # Process report and get summary; identical uploads come from the report cache
+            report_path = report_dir / config.REPORT_NAME
             try:
-                summary = service.process_report(temp_path)
+                summary = ReportCacheService.get_instance().get_or_create(
+                    temp_path, report_path, lambda: create_report(temp_path, report_path))
             except Exception as e:
                 raise ValueError('Rapor işlenemedi') from e
 
         except Exception as e:
             error_message = str(e)
 
-    return render_template('index.html', summary=summary, error_message=error_message)
+    return render_template('index.html', summary=summary, error_message=error_message, report_id=report_id)
+
+
+def remove_stale_outputs():
+    """
+    Delete the report and job directories older than REPORT_RETENTION_SECONDS.
+    Runs on uploads rather than at import, so cold starts do not scan the disk.
+    """
+    file_manager.remove_stale_directories(config.REPORTS_DIR, config.REPORT_RETENTION_SECONDS)
+    file_manager.remove_stale_directories(config.JOBS_DIR, config.REPORT_RETENTION_SECONDS)
+
+
+def create_report(input_path, report_path):
+    from services.service_container import ServiceContainer
+    from writers.csv_report_writer import CSVReportWriter
+
+    with CSVReportWriter(report_path) as writer:
+        service = ServiceContainer.get_instance().create_report_service(writer)
+        return service.process_report(input_path)
 
 
-@app.route('/download')
-def download_csv():
-    return send_file(config.REPORT_PATH,
+@app.route('/download/<report_id>')
+def download_csv(report_id):
+    report_dir = file_manager.get_report_directory(config.REPORTS_DIR, report_id)
+    if report_dir is None or not (report_dir / config.REPORT_NAME).is_file():
+        abort(404)
+
+    return send_file(report_dir / config.REPORT_NAME,
+                     mimetype='text/csv',
+                     as_attachment=True,
+                     download_name=config.REPORT_NAME)
+
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    """
+    Queue the uploaded statement for background processing.
+
+    Returns 202 with the job id right away; the report is built by a worker
+    process and its state is polled from /jobs/<job_id>.
+    """
+    if 'file' not in request.files:
+        raise APIError('Dosya yüklenemedi', 400)
+
+    file = request.files['file']
+    if file.filename == '':
+        raise APIError('Dosya seçilmedi', 400)
+
+    remove_stale_outputs()
+    job = JobService.get_instance().submit(file.save)
+    response = APISuccess('Rapor işi oluşturuldu', {
+        'job_id': job.id,
+        'status_url': url_for('get_job', job_id=job.id)
+    })
+    return jsonify(response.to_dict()), 202
+
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """Status, progress and, once done, the summary of a report job"""
+    job = JobService.get_instance().get_job(job_id)
+    if job is None:
+        raise APIError('İş bulunamadı', 404)
+
+    details = job.to_dict()
+    if job.status == JOB_DONE:
+        details['download_url'] = url_for('download_job_report', job_id=job.id)
+    return jsonify(APISuccess('İş durumu', details).to_dict())
+
+
+@app.route('/jobs/<job_id>/download')
+def download_job_report(job_id):
+    job = JobService.get_instance().get_job(job_id)
+    if job is None:
+        raise APIError('İş bulunamadı', 404)
+    if job.status != JOB_DONE:
+        raise APIError('Rapor henüz hazır değil', 409, {'status': job.status})
+    if not job.report_path.is_file():
+        raise APIError('Rapor bulunamadı', 404)
+
+    return send_file(job.report_path,
                      mimetype='text/csv',
                      as_attachment=True,
                      download_name=config.REPORT_NAME)
 
 
+@app.errorhandler(APIError)
+def handle_api_error(error: APIError):
+    return jsonify({'message': error.message, 'details': error.details}), error.status_code or 500
+
+
 def create_required_directories():
     # Create output directory only
     output_dir = Path(OUTPUT_DIR)
@@ -120,18 +190,22 @@ if __name__ == '__main__':
 
     # Simulate file upload
     def simualte_file_upload():
+        from services.service_container import ServiceContainer
+        from writers.csv_report_writer import CSVReportWriter
+
         with open('sample/sample_ibkr_detailed_report.csv', 'rb') as f:
             file = FileStorage(f)
-            temp_path = file_manager.create_file(config.TEMP_PATH)
+            report_id, report_dir = file_manager.create_report_directory(config.REPORTS_DIR)
+            temp_path = report_dir / config.TEMP_NAME
             file.save(temp_path)
 
             # Create report service
-            writer = CSVReportWriter(config.REPORT_PATH)
-            service = ReportService(initialize_parsers(), writer)
-
-            # Process report
-            if not service.process_report(temp_path):
-                print("Error: Report could not be processed")
-            else:
-                print("Report created successfully")
-                print(f"Report file: {config.REPORT_PATH}")
+            with CSVReportWriter(report_dir / config.REPORT_NAME) as writer:
+                service = ServiceContainer.get_instance().create_report_service(writer)
+
+                # Process report
+                if not service.process_report(temp_path):
+                    print("Error: Report could not be processed")
+                else:
+                    print("Report created successfully")
+                    print(f"Report file: {report_dir / config.REPORT_NAME}")
@@ -1,4 +1,5 @@
-from typing import Protocol
+from decimal import Decimal
+from typing import Dict, Iterable, Protocol
 
 
 # Define the Database Protocol
@@ -14,3 +15,30 @@ class Database(Protocol):
 
     def get_exchange_rate(self, date: str) -> float:
         pass
+
+    def get_yiufe_index(self, date_str: str) -> Decimal:
+        pass
+
+    def save_yiufe_index(self, date_str: str, index: Decimal):
+        pass
+
+    def get_exchange_rates(self, dates: Iterable[str]) -> Dict[str, float]:
+        pass
+
+    def save_exchange_rates(self, rates: Dict[str, Decimal]):
+        pass
+
+    def get_yiufe_indices(self, dates: Iterable[str]) -> Dict[str, Decimal]:
+        pass
+
+    def save_yiufe_indices(self, indices: Dict[str, Decimal]):
+        pass
+
+    def save_missing_rate(self, kind: str, date_str: str, ttl_seconds: float):
+        pass
+
+    def is_rate_missing(self, kind: str, date_str: str) -> bool:
+        pass
+
+    def ensure_indexes(self):
+        pass
@@ -1,10 +1,18 @@
-from databases.mongo_db import MongoDB
+import os
+
+from utils.config import DATABASE
 
 
 class DatabaseFactory:
     @staticmethod
-    def get_database(name: str):
+    def get_database(name: str = None):
+        name = name or os.environ.get('DATABASE', DATABASE)
         if name == "mongoDB":
+            # Imported here, so that offline runs do not need pymongo
+            from databases.mongo_db import MongoDB
             return MongoDB()
+        elif name == "memory":
+            from databases.memory_db import MemoryDB
+            return MemoryDB()
         else:
             raise ValueError(f"Unknown database: {name}")
@@ -0,0 +1,67 @@
+import datetime
+import threading
+
+from databases.database import Database
+from decimal import Decimal
+from typing import Dict, Iterable, List
+
+
+class MemoryDB(Database):
+    """
+    Process-local database for offline runs, tests and benchmarks.
+    Behaves like MongoDB for rates (existing dates are kept) but nothing
+    outlives the process.
+    """
+
+    def __init__(self):
+        self.info: List[dict] = []
+        self.errors: List[dict] = []
+        self.exchange_rates: Dict[str, float] = {}
+        self.yiufe_indices: Dict[str, float] = {}
+        self.missing_rates: Dict[tuple, datetime.datetime] = {}
+        self._lock = threading.Lock()
+
+    def ensure_indexes(self):
+        pass
+
+    def log_info(self, info: dict):
+        self.info.append({**info, "type": "info", "timestamp": datetime.datetime.now()})
+
+    def log_error(self, info: dict):
+        self.errors.append({**info, "type": "error", "timestamp": datetime.datetime.now()})
+
+    def save_exchange_rate(self, date: str, rate: Decimal):
+        self.save_exchange_rates({date: rate})
+
+    def get_exchange_rate(self, date: str) -> float:
+        return self.exchange_rates.get(date)
+
+    def get_exchange_rates(self, dates: Iterable[str]) -> Dict[str, float]:
+        return {date: self.exchange_rates[date] for date in dates if date in self.exchange_rates}
+
+    def save_exchange_rates(self, rates: Dict[str, Decimal]):
+        with self._lock:
+            for date, rate in rates.items():
+                self.exchange_rates.setdefault(date, float(rate))
+
+    def get_yiufe_index(self, date_str: str) -> Decimal:
+        index = self.yiufe_indices.get(date_str)
+        return Decimal(str(index)) if index is not None else None
+
+    def save_yiufe_index(self, date_str: str, index: Decimal):
+        self.save_yiufe_indices({date_str: index})
+
+    def get_yiufe_indices(self, dates: Iterable[str]) -> Dict[str, Decimal]:
+        return {date: Decimal(str(self.yiufe_indices[date])) for date in dates if date in self.yiufe_indices}
+
+    def save_yiufe_indices(self, indices: Dict[str, Decimal]):
+        with self._lock:
+            for date, index in indices.items():
+                self.yiufe_indices.setdefault(date, float(index))
+
+    def save_missing_rate(self, kind: str, date_str: str, ttl_seconds: float):
+        self.missing_rates[(kind, date_str)] = datetime.datetime.now() + datetime.timedelta(seconds=ttl_seconds)
+
+    def is_rate_missing(self, kind: str, date_str: str) -> bool:
+        expires_at = self.missing_rates.get((kind, date_str))
+        return expires_at is not None and expires_at > datetime.datetime.now()
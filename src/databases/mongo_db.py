@@ -3,77 +3,145 @@ import os
 
 from databases.database import Database
 from decimal import Decimal
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import OperationFailure
+from services.logger_service import LoggerService
+from typing import Dict, Iterable
+from utils.config import MONGODB_MAX_POOL_SIZE
+from utils.diagnostics import count
 
 
 class MongoDB(Database):
-    def __init__(self):
-        self.client = MongoClient(os.environ.get('MONGODB_URI'))
+    def __init__(self, client: MongoClient = None):
+        # MongoClient keeps its own connection pool; create one per process and reuse it
+        self.client = client or MongoClient(os.environ.get('MONGODB_URI'), maxPoolSize=MONGODB_MAX_POOL_SIZE)
         self.db = self.client.vergi_hesaplayici_db
         self.info = self.db.info
         self.errors = self.db.errors
         self.exchange_rates = self.db.exchange_rates
+        self.yiufe_indices = self.db.yiufe_indices
+        self.missing_rates = self.db.missing_rates
+
+    def ensure_indexes(self):
+        """Create the indexes the collections rely on; safe to call repeatedly"""
+        # One document per date, so concurrent writers cannot insert duplicates
+        for collection in (self.exchange_rates, self.yiufe_indices):
+            try:
+                collection.create_index('date', unique=True)
+            except OperationFailure as e:
+                # Stores written before the index existed may hold duplicates; they are
+                # removed once with scripts/remove_duplicate_rate_dates.py, never here
+                LoggerService.get_instance().log_error(
+                    f"Unique date index of {collection.name} not created, duplicate dates block it: {str(e)}")
+
+        # Negative entries are removed by MongoDB once they expire
+        self.missing_rates.create_index('expires_at', expireAfterSeconds=0)
+        self.missing_rates.create_index([('kind', 1), ('date', 1)], unique=True)
 
     def log_info(self, info: dict):
         info_copy = info.copy()
         info_copy["type"] = "info"
         info_copy["timestamp"] = datetime.datetime.now()
+        count('mongo_calls')
         self.info.insert_one(info_copy)
 
     def log_error(self, info: dict):
         info_copy = info.copy()
         info_copy["type"] = "error"
         info_copy["timestamp"] = datetime.datetime.now()
+        count('mongo_calls')
         self.errors.insert_one(info_copy)
 
     def save_exchange_rate(self, date: str, rate: Decimal):
         """Save exchange rate to MongoDB only if it doesn't exist"""
+        self.save_exchange_rates({date: rate})
+
+    def get_exchange_rate(self, date: str) -> float:
+        count('mongo_calls')
+        rate = self.exchange_rates.find_one({'date': date})
+        return rate['rate'] if rate else None
+
+    def get_exchange_rates(self, dates: Iterable[str]) -> Dict[str, float]:
+        """Rates of all given dates that are stored, fetched with a single query"""
+        count('mongo_calls')
+        records = self.exchange_rates.find({'date': {'$in': list(dates)}}, {'date': 1, 'rate': 1})
+        return {record['date']: record['rate'] for record in records}
+
+    def save_exchange_rates(self, rates: Dict[str, Decimal]):
+        """Save many exchange rates with a single bulk write; existing dates are kept"""
         try:
-            # Check if rate already exists
-            existing_rate = self.exchange_rates.find_one({'date': date})
-            if existing_rate:
-                return  # Skip if already exists
-
-            # Insert new rate
-            self.exchange_rates.insert_one({
-                'date': date,
-                'rate': float(rate),
-                'created_at': datetime.datetime.now()
-            })
+            self._upsert_by_date(self.exchange_rates, 'rate', rates)
         except Exception as e:
             self.log_error({
-                "message": f"Error saving exchange rate: {str(e)}",
-                "date": date,
-                "rate": str(rate)
+                "message": f"Error saving exchange rates: {str(e)}",
+                "dates": list(rates)
             })
             raise
 
-    def get_exchange_rate(self, date: str) -> float:
-        rate = self.exchange_rates.find_one({'date': date})
-        return rate['rate'] if rate else None
-
     def get_yiufe_index(self, date_str: str) -> Decimal:
-        record = self.db['yiufe_indices'].find_one({'date': date_str})
+        count('mongo_calls')
+        record = self.yiufe_indices.find_one({'date': date_str})
         return Decimal(str(record['index'])) if record else None
 
     def save_yiufe_index(self, date_str: str, index: Decimal):
         """Save YI-ÜFE index to MongoDB only if it doesn't exist"""
+        self.save_yiufe_indices({date_str: index})
+
+    def get_yiufe_indices(self, dates: Iterable[str]) -> Dict[str, Decimal]:
+        """YI-ÜFE indices of all given dates that are stored, fetched with a single query"""
+        count('mongo_calls')
+        records = self.yiufe_indices.find({'date': {'$in': list(dates)}}, {'date': 1, 'index': 1})
+        return {record['date']: Decimal(str(record['index'])) for record in records}
+
+    def save_yiufe_indices(self, indices: Dict[str, Decimal]):
+        """Save many YI-ÜFE indices with a single bulk write; existing dates are kept"""
         try:
-            # Check if index already exists
-            existing_index = self.db['yiufe_indices'].find_one({'date': date_str})
-            if existing_index:
-                return  # Skip if already exists
-
-            # Insert new index
-            self.db['yiufe_indices'].insert_one({
-                'date': date_str,
-                'index': float(index),
-                'created_at': datetime.datetime.now()
-            })
+            self._upsert_by_date(self.yiufe_indices, 'index', indices)
         except Exception as e:
             self.log_error({
-                "message": f"Error saving YI-ÜFE index: {str(e)}",
-                "date": date_str,
-                "index": str(index)
+                "message": f"Error saving YI-ÜFE indices: {str(e)}",
+                "dates": list(indices)
             })
             raise
+
+    def _upsert_by_date(self, collection, field: str, values: Dict[str, Decimal]):
+        """Insert the values of dates that are not stored yet, in one round trip"""
+        if not values:
+            return
+
+        now = datetime.datetime.now()
+        operations = [
+            UpdateOne(
+                {'date': date},
+                {'$setOnInsert': {'date': date, field: float(value), 'created_at': now}},
+                upsert=True
+            )
+            for date, value in values.items()
+        ]
+        count('mongo_calls')
+        collection.bulk_write(operations, ordered=False)
+
+    def save_missing_rate(self, kind: str, date_str: str, ttl_seconds: float):
+        """Remember that no value is published for the date, until the TTL expires"""
+        try:
+            count('mongo_calls')
+            self.missing_rates.update_one(
+                {'kind': kind, 'date': date_str},
+                {'$set': {'expires_at': datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=ttl_seconds)}},
+                upsert=True
+            )
+        except Exception as e:
+            self.log_error({
+                "message": f"Error saving missing rate: {str(e)}",
+                "kind": kind,
+                "date": date_str
+            })
+
+    def is_rate_missing(self, kind: str, date_str: str) -> bool:
+        count('mongo_calls')
+        record = self.missing_rates.find_one({
+            'kind': kind,
+            'date': date_str,
+            'expires_at': {'$gt': datetime.datetime.now(datetime.timezone.utc)}
+        })
+        return record is not None
@@ -3,7 +3,7 @@ from datetime import datetime
 from decimal import Decimal
 
 
-@dataclass
+@dataclass(slots=True)
 class BaseModel:
     date: datetime                  # Date information for all transactions
     description: str                # Description information for all transactions
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+
+@dataclass(slots=True)
+class ClosedLot:
+    quantity: Decimal               # Signed quantity closed by the trade
+    buy_date: datetime              # Date the lot was opened
+    basis: Decimal                  # Cost basis in USD
+    realized_pl: Decimal            # Realized profit/loss in USD
+    price: Decimal                  # Price the lot was opened at
@@ -4,6 +4,8 @@ from .trade import Trade
 
 
 class Order:
+    __slots__ = ('symbol', 'quantity', 'is_sell', 'is_option', 'trades')
+
     def __init__(self, symbol: str, quantity: Decimal, is_option: bool):
         self.symbol = symbol
         self.quantity = quantity
@@ -1,10 +1,17 @@
 from .base_model import BaseModel
+from .closed_lot import ClosedLot
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Dict
+from typing import List, Tuple
 
 
 class Trade(BaseModel):
+    __slots__ = (
+        'symbol', 'quantity', 'commission', 'commission_tl', 'is_option', 'price', 'buy_date', 'sell_date',
+        'closed_lots', 'buy_exchange_rate', 'buy_amount_tl', 'sell_amount_tl', 'buy_price', 'sell_price',
+        'yiufe_rate', 'indexed_buy_amount_tl'
+    )
+
     def __init__(
         self,
         symbol: str,
@@ -35,7 +42,7 @@ class Trade(BaseModel):
         self.price = price
         self.buy_date = buy_date or date
         self.sell_date = sell_date or date
-        self.closed_lots: List[Dict] = []
+        self.closed_lots: Tuple[ClosedLot, ...] = ()
         self.buy_exchange_rate = buy_exchange_rate
         self.exchange_rate = exchange_rate
         self.buy_amount_tl = buy_amount_tl
@@ -44,12 +51,7 @@ class Trade(BaseModel):
         self.sell_price = sell_price
         self.yiufe_rate = yiufe_rate
 
-        is_profit = amount_usd > 0
-
-        if is_short:
-            self.description = '(Açığa) Satış Karı' if is_profit else '(Açığa) Satış Zararı'
-        else:
-            self.description = 'Satış Karı' if is_profit else 'Satış Zararı'
+        self.description = self.describe(amount_usd, is_short)
 
         # Calculate TL profit/loss including commission
         self.amount_tl = (self.sell_amount_tl - self.buy_amount_tl - self.commission_tl) if (
@@ -64,6 +66,14 @@ class Trade(BaseModel):
         # Calculate final taxable amount
         self.taxable_amount_tl = self._calculate_taxable_amount()
 
+    @staticmethod
+    def describe(amount_usd: Decimal, is_short: bool) -> str:
+        is_profit = amount_usd > 0
+
+        if is_short:
+            return '(Açığa) Satış Karı' if is_profit else '(Açığa) Satış Zararı'
+        return 'Satış Karı' if is_profit else 'Satış Zararı'
+
     def _calculate_indexed_buy_amount(self) -> Decimal:
         """Calculate indexed buy amount based on YI-ÜFE rate if applicable"""
         should_apply_indexing = (
@@ -95,8 +105,9 @@ class Trade(BaseModel):
 
         return None
 
-    def add_closed_lot(self, lot: Dict):
-        self.closed_lots.append(lot)
+    def add_closed_lot(self, lot: ClosedLot):
+        # A tuple: most trades never get lots, and an empty tuple is shared
+        self.closed_lots += (lot,)
 
     @property
     def realized_pl(self) -> Decimal:
@@ -117,7 +128,7 @@ class Trade(BaseModel):
             f"{self.commission_tl:.2f}",
             f"{self.buy_amount_tl:.2f}",
             f"{self.sell_amount_tl:.2f}",
-            f"{self.yiufe_rate:.2f}" if self.yiufe_rate > 10 else "-",
+            f"{self.yiufe_rate:.2f}" if self.yiufe_rate is not None and self.yiufe_rate > 10 else "-",
             f"{self.indexed_buy_amount_tl:.2f}",
             f"{self.taxable_amount_tl:.2f}",
             f"{self.amount_tl:.2f}",
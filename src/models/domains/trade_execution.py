@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+
+@dataclass(slots=True)
+class TradeExecution:
+    symbol: str
+    sell_date: datetime             # Execution date of the closing trade
+    quantity: Decimal               # Signed quantity of the trade
+    realized_pl: Decimal            # Realized profit/loss in USD
+    commission: Decimal             # Commission in USD, always positive
+    is_option: bool
+    price: Decimal                  # Execution price
@@ -0,0 +1,144 @@
+import numpy as np
+
+from collections.abc import Sequence
+from datetime import datetime
+from decimal import Decimal
+from models.domains.trade import Trade
+from typing import Any, Iterator, List, Optional, Union
+
+# Decimal values of a trade, kept as object columns so every value stays exactly the Decimal of the Trade
+DECIMAL_FIELDS = (
+    'quantity', 'price', 'buy_price', 'sell_price', 'amount_usd', 'commission', 'buy_exchange_rate',
+    'exchange_rate', 'buy_amount_tl', 'sell_amount_tl', 'commission_tl', 'yiufe_rate', 'indexed_buy_amount_tl',
+    'amount_tl', 'taxable_amount_tl'
+)
+
+TRADE_DTYPE = np.dtype(
+    [('symbol', np.int32),          # Code of the symbol in TradeStore.symbols
+     ('buy_day', np.int32),         # Day ordinals of the buy and sell dates
+     ('sell_day', np.int32),
+     ('is_option', np.bool_),
+     ('is_short', np.bool_)]
+    + [(name, object) for name in DECIMAL_FIELDS]
+)
+
+
+def _truthy(values: np.ndarray) -> np.ndarray:
+    return values.astype(bool)
+
+
+class TradeStore(Sequence):
+    """
+    Trades of a statement as one NumPy structured array: symbol codes, buy
+    and sell day ordinals and category flags as integer columns, the Decimal
+    values as object columns. Totals and filters are reductions over whole
+    columns; a Trade object is only created when a row is read, e.g. by a
+    writer iterating over the store.
+    """
+
+    def __init__(self, rows: np.ndarray, symbols: np.ndarray):
+        self.rows = rows
+        self.symbols = symbols
+
+    @classmethod
+    def from_columns(
+        cls,
+        symbols: List[str],
+        buy_dates: List[datetime],
+        sell_dates: List[datetime],
+        is_option: List[bool],
+        is_short: List[bool],
+        **values: List[Optional[Decimal]]
+    ) -> 'TradeStore':
+        """
+        Store of trades given column by column, with the arguments of Trade
+        (amount_usd, quantity, commission, price, buy_exchange_rate,
+        exchange_rate, buy_amount_tl, sell_amount_tl, buy_price, sell_price
+        and yiufe_rate). The values Trade derives from them are computed for
+        whole columns, with the same Decimal operations in the same order.
+        """
+        codes, rows = np.unique(np.array(symbols, dtype=object), return_inverse=True)
+        store = np.empty(len(symbols), dtype=TRADE_DTYPE)
+        store['symbol'] = rows
+        store['buy_day'] = [day.toordinal() for day in buy_dates]
+        store['sell_day'] = [day.toordinal() for day in sell_dates]
+        store['is_option'] = is_option
+        store['is_short'] = is_short
+        for name, column in values.items():
+            store[name] = column
+
+        commission, exchange_rate = store['commission'].copy(), store['exchange_rate']
+        store['commission'] = np.abs(commission)
+        has_commission = _truthy(store['commission']) & _truthy(exchange_rate)
+        store['commission_tl'][has_commission] = np.abs(commission[has_commission] * exchange_rate[has_commission])
+
+        buy, sell, commission_tl = store['buy_amount_tl'], store['sell_amount_tl'], store['commission_tl']
+        has_amounts = _truthy(sell) & _truthy(buy) & _truthy(commission_tl)
+        store['amount_tl'][has_amounts] = sell[has_amounts] - buy[has_amounts] - commission_tl[has_amounts]
+
+        # Indexing with YI-ÜFE applies above a 10% increase
+        yiufe_rate = store['yiufe_rate']
+        indexed = np.not_equal(yiufe_rate, None) & np.not_equal(buy, None)
+        indexed[indexed] = yiufe_rate[indexed] > 10
+        store['indexed_buy_amount_tl'] = buy
+        store['indexed_buy_amount_tl'][indexed] = buy[indexed] * (1 + (yiufe_rate[indexed] / 100))
+
+        indexed_buy = store['indexed_buy_amount_tl']
+        taxable = _truthy(sell) & _truthy(indexed_buy) & _truthy(commission_tl)
+        store['taxable_amount_tl'][taxable] = sell[taxable] - indexed_buy[taxable] - commission_tl[taxable]
+
+        return cls(store, codes)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Trade, 'TradeStore']:
+        if isinstance(index, slice):
+            return TradeStore(self.rows[index], self.symbols)
+        if not -len(self) <= index < len(self):
+            raise IndexError('TradeStore index out of range')
+        return next(iter(self[index:index + 1 or None]))
+
+    def __iter__(self) -> Iterator[Trade]:
+        rows = self.rows
+        return map(self._trade,
+                   self.symbols[rows['symbol']].tolist(), rows['buy_day'].tolist(), rows['sell_day'].tolist(),
+                   rows['is_option'].tolist(), rows['is_short'].tolist(),
+                   zip(*(rows[name].tolist() for name in DECIMAL_FIELDS)))
+
+    @property
+    def is_option(self) -> np.ndarray:
+        return self.rows['is_option']
+
+    def column(self, name: str) -> np.ndarray:
+        """Values of a column, e.g. 'amount_tl' or 'sell_day'"""
+        if name == 'symbol':
+            return self.symbols[self.rows['symbol']]
+        return self.rows[name]
+
+    def filter(self, mask: np.ndarray) -> 'TradeStore':
+        """Trades where mask is true, in the same order"""
+        return TradeStore(self.rows[mask], self.symbols)
+
+    def total(self, name: str, mask: np.ndarray = None, skip_empty: bool = False, start: Any = 0) -> Any:
+        """
+        Sum of a Decimal column from start, added in row order like sum()
+        over the trades; skip_empty leaves out None and zero values.
+        """
+        values = self.rows[name] if mask is None else self.rows[name][mask]
+        if skip_empty:
+            values = values[_truthy(values)]
+        return np.add.reduce(values, initial=start)
+
+    @staticmethod
+    def _trade(symbol: str, buy_day: int, sell_day: int, is_option: bool, is_short: bool, values: tuple) -> Trade:
+        trade = Trade.__new__(Trade)
+        for name, value in zip(DECIMAL_FIELDS, values):
+            setattr(trade, name, value)
+        trade.symbol = symbol
+        trade.buy_date = trade.date = datetime.fromordinal(buy_day)
+        trade.sell_date = datetime.fromordinal(sell_day)
+        trade.is_option = is_option
+        trade.closed_lots = ()
+        trade.description = Trade.describe(trade.amount_usd, is_short)
+        return trade
@@ -4,45 +4,57 @@ from datetime import datetime
 from decimal import Decimal
 from models.domains.dividend import Dividend
 from protocols.parser_protocol import ParserProtocol
+from protocols.rate_provider_protocol import RateProviderProtocol
 from services.logger_service import LoggerService
 from services.evds_service import EvdsService
+from services.rate_table import RateRequirements, convert_to_try, parse_iso_dates
 from typing import List
 
 
 class DividendParser(ParserProtocol[Dividend]):
-    def __init__(self):
+    def __init__(self, evds_service: EvdsService = None):
         self.logger = LoggerService.get_instance()
-        self.evds_service = EvdsService()
+        self.evds_service = evds_service or EvdsService()
 
     def can_parse(self, section_name: str) -> bool:
         return section_name == "Dividends"
 
-    def parse(self, df: pd.DataFrame) -> List[Dividend]:
-        dividends = []
-        for _, row in df.iterrows():
+    def collect_rate_requirements(self, df: pd.DataFrame, requirements: RateRequirements) -> None:
+        rows = df[(df.iloc[:, 1] == "Data") & (df.iloc[:, 2] == "USD")]
+        requirements.add_exchange_dates(parse_iso_dates(rows.iloc[:, 3]))
+
+    def parse(self, df: pd.DataFrame, rates: RateProviderProtocol = None) -> List[Dividend]:
+        rates = rates or self.evds_service
+        rows = []
+        for row in df.itertuples(index=False, name=None):
             try:
-                if row.iloc[1] == "Data" and row.iloc[2] == "USD":
+                if row[1] == "Data" and row[2] == "USD":
                     # Skip Total row
-                    if "Total" in str(row.iloc[2]):
+                    if "Total" in str(row[2]):
                         continue
 
-                    date = datetime.strptime(str(row.iloc[3]), '%Y-%m-%d')
-                    symbol = str(row.iloc[4]).split('(')[0].strip()
-                    amount = Decimal(str(row.iloc[5]))
-                    exchange_rate = self.evds_service.get_exchange_rate(date)
-
-                    dividend = Dividend(
-                        symbol=symbol,
-                        date=date,
-                        amount_usd=amount,
-                        amount_tl=amount * Decimal(str(exchange_rate)),
-                        taxable_amount_tl=amount * Decimal(str(exchange_rate)),
-                        exchange_rate=Decimal(str(exchange_rate)),
-                        description='Brüt Temettü'
-                    )
-                    dividends.append(dividend)
+                    date = datetime.strptime(str(row[3]), '%Y-%m-%d')
+                    symbol = str(row[4]).split('(')[0].strip()
+                    amount = Decimal(str(row[5]))
+                    rows.append((row, date, symbol, amount))
             except Exception as e:
-                self.logger.log_error(f"Dividend parser error: {str(e)}\nRow data: {row.tolist()}")
+                self.logger.log_error(f"Dividend parser error: {str(e)}\nRow data: {list(row)}")
                 continue
 
+        # Convert the whole column at once
+        amounts_tl, exchange_rates = convert_to_try(rates, [r[3] for r in rows], [r[1] for r in rows])
+
+        dividends = []
+        for (row, date, symbol, amount), amount_tl, exchange_rate in zip(rows, amounts_tl, exchange_rates):
+            dividend = Dividend(
+                symbol=symbol,
+                date=date,
+                amount_usd=amount,
+                amount_tl=amount_tl,
+                taxable_amount_tl=amount_tl,
+                exchange_rate=exchange_rate,
+                description='Brüt Temettü'
+            )
+            dividends.append(dividend)
+
         return dividends
@@ -4,47 +4,59 @@ from datetime import datetime
 from decimal import Decimal
 from models.domains.fee import Fee
 from protocols.parser_protocol import ParserProtocol
+from protocols.rate_provider_protocol import RateProviderProtocol
 from services.logger_service import LoggerService
 from typing import List
 from services.evds_service import EvdsService
+from services.rate_table import RateRequirements, convert_to_try, parse_iso_dates
 
 
 class FeeParser(ParserProtocol[Fee]):
-    def __init__(self):
+    def __init__(self, evds_service: EvdsService = None):
         self.logger = LoggerService.get_instance()
-        self.evds_service = EvdsService()
+        self.evds_service = evds_service or EvdsService()
 
     def can_parse(self, section_name: str) -> bool:
         return section_name == "Fees"
 
-    def parse(self, df: pd.DataFrame) -> List[Fee]:
-        fees = []
-        for _, row in df.iterrows():
+    def collect_rate_requirements(self, df: pd.DataFrame, requirements: RateRequirements) -> None:
+        rows = df[(df.iloc[:, 1] == "Data") & (df.iloc[:, 2] == "Other Fees")]
+        requirements.add_exchange_dates(parse_iso_dates(rows.iloc[:, 4]))
+
+    def parse(self, df: pd.DataFrame, rates: RateProviderProtocol = None) -> List[Fee]:
+        rates = rates or self.evds_service
+        rows = []
+        for row in df.itertuples(index=False, name=None):
             try:
-                if row.iloc[1] == "Data" and row.iloc[2] == "Other Fees":
+                if row[1] == "Data" and row[2] == "Other Fees":
                     # Skip Total row
-                    if "Total" in str(row.iloc[2]):
+                    if "Total" in str(row[2]):
                         continue
 
-                    date = datetime.strptime(str(row.iloc[4]), '%Y-%m-%d')
-                    description = str(row.iloc[5])
+                    date = datetime.strptime(str(row[4]), '%Y-%m-%d')
+                    description = str(row[5])
                     # Parse symbol from description
                     symbol = description.split(':')[0] if ':' in description else ""
-                    amount = Decimal(str(row.iloc[6]))
-                    exchange_rate = self.evds_service.get_exchange_rate(date)
-
-                    fee = Fee(
-                        symbol=symbol,
-                        date=date,
-                        amount_usd=amount,
-                        amount_tl=amount * Decimal(str(exchange_rate)),
-                        taxable_amount_tl=amount * Decimal(str(exchange_rate)),
-                        exchange_rate=Decimal(str(exchange_rate)),
-                        description=description
-                    )
-                    fees.append(fee)
+                    amount = Decimal(str(row[6]))
+                    rows.append((row, date, symbol, description, amount))
             except Exception as e:
-                self.logger.log_error(f"Fee parser error: {str(e)}\nRow data: {row.tolist()}")
+                self.logger.log_error(f"Fee parser error: {str(e)}\nRow data: {list(row)}")
                 continue
 
+        # Convert the whole column at once
+        amounts_tl, exchange_rates = convert_to_try(rates, [r[4] for r in rows], [r[1] for r in rows])
+
+        fees = []
+        for (row, date, symbol, description, amount), amount_tl, exchange_rate in zip(rows, amounts_tl, exchange_rates):
+            fee = Fee(
+                symbol=symbol,
+                date=date,
+                amount_usd=amount,
+                amount_tl=amount_tl,
+                taxable_amount_tl=amount_tl,
+                exchange_rate=exchange_rate,
+                description=description
+            )
+            fees.append(fee)
+
         return fees
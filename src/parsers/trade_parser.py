@@ -1,174 +1,300 @@
+import numpy as np
 import pandas as pd
 
+from dataclasses import dataclass
 from datetime import datetime
-from decimal import Decimal
-from typing import List, Dict
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, List, Dict, Sequence, Tuple
+from models.domains.closed_lot import ClosedLot
 from models.domains.trade import Trade
-from models.domains.order import Order
+from models.domains.trade_execution import TradeExecution
+from models.trade_store import TradeStore
 from protocols.parser_protocol import ParserProtocol
+from protocols.rate_provider_protocol import RateProviderProtocol
 from services.logger_service import LoggerService
 from services.evds_service import EvdsService
+from services.rate_table import RateRequirements, convert_to_try, parse_iso_dates
+from utils.config import REPORT_TRADE_STORE
+from utils.diagnostics import count
+
+
+def _to_decimal(value: str) -> Decimal:
+    return Decimal(value)
+
+
+def _to_date(value: str) -> datetime:
+    return datetime.strptime(value, '%Y-%m-%d')
+
+
+def _to_trade_date(value: str) -> datetime:
+    # Trade rows carry a time as well: '2024-01-02, 09:30:00'
+    return _to_date(value.split(',')[0])
+
+
+def _is_sell(quantity: Decimal) -> bool:
+    return quantity < 0
+
+
+def _is_profit(amount: Decimal) -> bool:
+    return amount > 0
+
+
+@dataclass(slots=True)
+class LotValues:
+    """Buy and sell side of a closed lot, as the trade of the lot is created from it"""
+    trade: TradeExecution
+    lot: ClosedLot
+    quantity: Decimal
+    is_short: bool
+    commission: Decimal
+    buy_date: datetime
+    sell_date: datetime
+    buy_price: Decimal
+    sell_price: Decimal
 
 
 class TradeParser(ParserProtocol[Trade]):
-    def __init__(self):
-        self.logger = LoggerService()
-        self.evds_service = EvdsService()
+    def __init__(self, evds_service: EvdsService = None, columnar: bool = REPORT_TRADE_STORE):
+        self.logger = LoggerService.get_instance()
+        self.evds_service = evds_service or EvdsService()
+        # Return the trades as a TradeStore instead of a list of Trade objects
+        self.columnar = columnar
 
     def can_parse(self, section_name: str) -> bool:
         return section_name == "Trades"
 
-    def parse(self, df: pd.DataFrame) -> List[Trade]:
-        trades: List[Trade] = []
-        orders: List[Order] = []
+    def collect_rate_requirements(self, df: pd.DataFrame, requirements: RateRequirements) -> None:
+        """Dates of all stock and option trades and closed lots; a superset of the dates parse uses"""
+        data = df[df.iloc[:, 1] == "Data"]
+        discriminator = data.iloc[:, 2].astype(str)
+        rows = data[discriminator.isin(("Trade", "ClosedLot")).to_numpy()
+                    & (data.iloc[:, 3].astype(str).str.strip() != "Forex").to_numpy()]
+
+        dates = parse_iso_dates(rows.iloc[:, 6])
+        requirements.add_exchange_dates(dates)
+        requirements.add_yiufe_dates(dates)
+
+    def parse(self, df: pd.DataFrame, rates: RateProviderProtocol = None) -> Sequence[Trade]:
+        lots = [self._lot_values(trade_data, lot)
+                for trade_data, closed_lots in self._build_hierarchy(df)
+                for lot in closed_lots]
+        return self._create_trades(lots, rates or self.evds_service)
+
+    def _build_hierarchy(self, df: pd.DataFrame) -> List[Tuple[TradeExecution, List[ClosedLot]]]:
+        """
+        Build the Order -> Trade -> ClosedLot hierarchy column by column.
 
-        # First pass: Build the hierarchy
-        current_order = None
-        current_trade = None
+        Returns the trades that belong to an order and have closed lots, in
+        statement order, each with its closed lots. A Trade row belongs to the
+        last Order above it and a ClosedLot row to the last Trade above it;
+        rows that cannot be parsed are logged and skipped.
+        """
+        # Keep only stock and option data rows (skip forex and totals)
+        data = df[df.iloc[:, 1] == "Data"]
+        asset_category = data.iloc[:, 3].astype(str).str.strip()
+        discriminator = data.iloc[:, 2].astype(str)
+        keep = ((asset_category != "Forex") & ~discriminator.str.contains("Total", regex=False)).to_numpy()
+        data = data[keep]
+        asset_category = asset_category[keep].to_numpy()
+        discriminator = discriminator[keep].to_numpy()
 
-        for _, row in df.iterrows():
+        is_order = discriminator == "Order"
+        is_trade = discriminator == "Trade"
+        is_lot = discriminator == "ClosedLot"
+
+        def column(index: int) -> List[str]:
+            return data.iloc[:, index].astype(str).tolist()
+
+        errors: Dict[int, str] = {}
+        dates = column(6)
+        quantities = self._parse_column(column(8), _to_decimal, errors, is_order | is_trade | is_lot)
+        prices = self._parse_column(column(9), _to_decimal, errors, is_trade | is_lot)
+        commissions = self._parse_column(column(11), _to_decimal, errors, is_trade)
+        bases = self._parse_column(column(12), _to_decimal, errors, is_lot)
+        amounts = self._parse_column(column(13), _to_decimal, errors, is_trade | is_lot)
+        trade_dates = self._parse_column(dates, _to_trade_date, errors, is_trade)
+        lot_dates = self._parse_column(dates, _to_date, errors, is_lot)
+
+        # An Order compares its quantity, a Trade takes the absolute commission and
+        # compares its amount; these fail on NaN values, which makes the row invalid
+        for position in np.flatnonzero(is_order | is_trade).tolist():
+            if position in errors:
+                continue
             try:
-                # Skip if not a trade record
-                if row.iloc[1] != "Data":
-                    continue
-
-                # Skip if not a stock or option trade (skip forex)
-                asset_category = str(row.iloc[3]).strip()
-                if asset_category == "Forex":
-                    continue
-
-                # Skip if Total row
-                if "Total" in str(row.iloc[2]):
-                    continue
-
-                # Get trade type (stock or option)
-                is_option = asset_category == "Equity and Index Options"
-
-                discriminator = row.iloc[2]
-
-                if discriminator == "Order":
-                    current_order = Order(
-                        symbol=str(row.iloc[5]),
-                        quantity=Decimal(str(row.iloc[8])),
-                        is_option=is_option
-                    )
-                    orders.append(current_order)
-
-                elif discriminator == "Trade":
-                    current_trade = Trade(
-                        symbol=str(row.iloc[5]),
-                        date=datetime.strptime(str(row.iloc[6]).split(',')[0], '%Y-%m-%d'),
-                        amount_usd=Decimal(str(row.iloc[13])),
-                        quantity=Decimal(str(row.iloc[8])),
-                        commission=Decimal(str(row.iloc[11])),
-                        is_option=is_option,
-                        price=Decimal(str(row.iloc[9]))
-                    )
-                    if current_order:
-                        current_order.add_trade(current_trade)
-
-                elif discriminator == "ClosedLot":
-                    if current_trade:
-                        current_trade.add_closed_lot({
-                            'quantity': Decimal(str(row.iloc[8])),
-                            'buy_date': datetime.strptime(str(row.iloc[6]), '%Y-%m-%d'),
-                            'basis': Decimal(str(row.iloc[12])),
-                            'realized_pl': Decimal(str(row.iloc[13])),
-                            'price': Decimal(str(row.iloc[9]))
-                        })
-
-            except Exception as e:
-                self.logger.log_error(f"Trade parser error: {str(e)}\nRow data: {row.tolist()}")
+                if is_order[position]:
+                    _is_sell(quantities[position])
+                else:
+                    commissions[position] = abs(commissions[position])
+                    _is_profit(amounts[position])
+            except (InvalidOperation, ValueError) as e:
+                errors[position] = str(e)
+
+        valid = np.ones(len(data), dtype=bool)
+        for position, message in sorted(errors.items()):
+            valid[position] = False
+            self.logger.log_error(f"Trade parser error: {message}\nRow data: {data.iloc[position].tolist()}")
+
+        # Group ids: the number of valid Orders / Trades seen up to each row
+        order_ids = np.cumsum(is_order & valid)
+        trade_ids = np.cumsum(is_trade & valid)
+
+        closed_lots: Dict[int, List[ClosedLot]] = {}
+        for position in np.flatnonzero(is_lot & valid & (trade_ids > 0)).tolist():
+            closed_lots.setdefault(trade_ids[position], []).append(ClosedLot(
+                quantity=quantities[position],
+                buy_date=lot_dates[position],
+                basis=bases[position],
+                realized_pl=amounts[position],
+                price=prices[position]
+            ))
+
+        symbols = column(5)
+        hierarchy = []
+        for position in np.flatnonzero(is_trade & valid & (order_ids > 0)).tolist():
+            lots = closed_lots.get(trade_ids[position])
+            if not lots:  # Only process if there are ClosedLots
                 continue
 
-        # Second pass: Process only trades with ClosedLots
-        for order in orders:
-            for trade in order.trades:
-                if trade.closed_lots:  # Only process if there are ClosedLots
-                    new_trades = self._create_trades_from_lots(
-                        trade_data={
-                            'symbol': trade.symbol,
-                            'sell_date': trade.sell_date,
-                            'quantity': trade.quantity,
-                            'realized_pl': trade.realized_pl,
-                            'commission': trade.commission,
-                            'is_option': trade.is_option,
-                            'price': trade.price  # Add price from trade
-                        },
-                        closed_lots=trade.closed_lots,
-                    )
-                    trades.extend(new_trades)
-
-        return trades
-
-    def _create_trades_from_lots(self, trade_data: Dict, closed_lots: List[Dict]) -> List[Trade]:
-        result = []
+            hierarchy.append((TradeExecution(
+                symbol=symbols[position],
+                sell_date=trade_dates[position],
+                quantity=quantities[position],
+                realized_pl=amounts[position],
+                commission=commissions[position],
+                is_option=asset_category[position] == "Equity and Index Options",
+                price=prices[position]
+            ), lots))
+
+        return hierarchy
 
-        for lot in closed_lots:
-            quantity = abs(lot['quantity'])
-            is_short = lot['quantity'] < 0
+    @staticmethod
+    def _parse_column(values: List[str], converter: Callable[[str], Any], errors: Dict[int, str], mask: np.ndarray) -> List[Any]:
+        """
+        Convert the masked cells of a column, parsing each distinct value once.
+        Failures are recorded in errors by row position and converted to None.
+        """
+        parsed: List[Any] = [None] * len(values)
+        seen: Dict[str, Any] = {}
 
-            # Calculate proportional commission for this lot
-            lot_commission = trade_data['commission'] * abs(lot['quantity'] / trade_data['quantity'])
+        for position in np.flatnonzero(mask).tolist():
+            raw = values[position]
+            if raw not in seen:
+                try:
+                    seen[raw] = converter(raw)
+                except Exception as e:
+                    seen[raw] = e
 
-            if is_short:
-                buy_date = trade_data['sell_date']
-                sell_date = lot['buy_date']
-                buy_price = trade_data['price']
-                sell_price = lot['price']
+            value = seen[raw]
+            if isinstance(value, Exception):
+                errors.setdefault(position, str(value))
             else:
-                buy_date = lot['buy_date']
-                sell_date = trade_data['sell_date']
-                buy_price = lot['price']
-                sell_price = trade_data['price']
+                parsed[position] = value
 
-            # Apply option price adjustment (multiply by 100)
-            if trade_data['is_option']:
-                buy_price = buy_price * Decimal('100')
-                sell_price = sell_price * Decimal('100')
+        return parsed
 
-            # Get exchange rate data and check for None values
-            buy_rate = self.evds_service.get_exchange_rate(buy_date)
-            sell_rate = self.evds_service.get_exchange_rate(sell_date)
+    @staticmethod
+    def _lot_values(trade_data: TradeExecution, lot: ClosedLot) -> LotValues:
+        """Buy and sell side of a closed lot; a short lot is bought when the trade closes it"""
+        quantity = abs(lot.quantity)
+        is_short = lot.quantity < 0
 
-            # If exchange rate data is missing (holiday etc.), use the next available business day's data
-            if buy_rate is None:
-                self.logger.log_warning(f"No exchange rate data found for {buy_date}. Using data from the next available business day.")
-                buy_rate = self.evds_service.get_next_available_exchange_rate(buy_date)
+        # Calculate proportional commission for this lot
+        lot_commission = trade_data.commission * abs(lot.quantity / trade_data.quantity)
 
-            if sell_rate is None:
-                self.logger.log_warning(f"No exchange rate data found for {sell_date}. Using data from the next available business day.")
-                sell_rate = self.evds_service.get_next_available_exchange_rate(sell_date)
+        if is_short:
+            buy_date = trade_data.sell_date
+            sell_date = lot.buy_date
+            buy_price = trade_data.price
+            sell_price = lot.price
+        else:
+            buy_date = lot.buy_date
+            sell_date = trade_data.sell_date
+            buy_price = lot.price
+            sell_price = trade_data.price
 
-            # Calculate amounts with commission
-            buy_amount_tl = quantity * buy_price * Decimal(str(buy_rate))
-            sell_amount_tl = quantity * sell_price * Decimal(str(sell_rate))
+        # Apply option price adjustment (multiply by 100)
+        if trade_data.is_option:
+            buy_price = buy_price * Decimal('100')
+            sell_price = sell_price * Decimal('100')
 
-            # Get YI-ÜFE rate using evds_service
-            yiufe_rate = self.evds_service.get_yiufe_index_rate(buy_date, sell_date)
+        return LotValues(
+            trade=trade_data,
+            lot=lot,
+            quantity=quantity,
+            is_short=is_short,
+            commission=lot_commission,
+            buy_date=buy_date,
+            sell_date=sell_date,
+            buy_price=buy_price,
+            sell_price=sell_price
+        )
 
+    def _create_trades(self, lots: List[LotValues], rates: RateProviderProtocol) -> Sequence[Trade]:
+        # Convert the buy and sell amounts of all lots at once
+        buy_amounts_tl, buy_rates = convert_to_try(
+            rates, [lot.quantity * lot.buy_price for lot in lots], [lot.buy_date for lot in lots])
+        sell_amounts_tl, sell_rates = convert_to_try(
+            rates, [lot.quantity * lot.sell_price for lot in lots], [lot.sell_date for lot in lots])
+        # YI-ÜFE rates of the holding periods, each distinct pair of months computed once
+        yiufe_rates = rates.get_yiufe_index_rates([lot.buy_date for lot in lots], [lot.sell_date for lot in lots])
+
+        kept = []
+        for lot, buy_amount_tl, buy_rate, sell_amount_tl, sell_rate, yiufe_rate in zip(
+                lots, buy_amounts_tl, buy_rates, sell_amounts_tl, sell_rates, yiufe_rates):
             if yiufe_rate is None:
-                self.logger.log_warning(f"No YI-ÜFE index data found for {buy_date} and {sell_date}. Using data from the next available business day.")
+                count('unresolved_rates')
+                self.logger.log_warning(f"No YI-ÜFE index data found for {lot.buy_date} and {lot.sell_date}. Using data from the next available business day.")
+
+            kept.append((lot, buy_amount_tl, buy_rate, sell_amount_tl, sell_rate, yiufe_rate))
 
+        if self.columnar:
+            return self._create_trade_store(kept)
+
+        result = []
+        for lot, buy_amount_tl, buy_rate, sell_amount_tl, sell_rate, yiufe_rate in kept:
+            trade_data, closed_lot = lot.trade, lot.lot
             trade = Trade(
-                symbol=trade_data['symbol'],
-                date=buy_date,
-                amount_usd=lot['realized_pl'],
-                quantity=-lot['quantity'] if not is_short else lot['quantity'],
-                commission=lot_commission,     # Store proportional commission
-                is_option=trade_data['is_option'],
-                price=trade_data['price'],
-                buy_date=buy_date,
-                sell_date=sell_date,
-                buy_exchange_rate=Decimal(str(buy_rate)),
-                exchange_rate=Decimal(str(sell_rate)),  # Use sell_rate for commission
+                symbol=trade_data.symbol,
+                date=lot.buy_date,
+                amount_usd=closed_lot.realized_pl,
+                quantity=-closed_lot.quantity if not lot.is_short else closed_lot.quantity,
+                commission=lot.commission,     # Store proportional commission
+                is_option=trade_data.is_option,
+                price=trade_data.price,
+                buy_date=lot.buy_date,
+                sell_date=lot.sell_date,
+                buy_exchange_rate=buy_rate,
+                exchange_rate=sell_rate,  # Use sell_rate for commission
                 buy_amount_tl=buy_amount_tl,
                 sell_amount_tl=sell_amount_tl,
-                buy_price=buy_price,
-                sell_price=sell_price,
-                is_short=is_short,
+                buy_price=lot.buy_price,
+                sell_price=lot.sell_price,
+                is_short=lot.is_short,
                 yiufe_rate=yiufe_rate
             )
             result.append(trade)
 
         return result
+
+    @staticmethod
+    def _create_trade_store(kept: List[Tuple]) -> TradeStore:
+        """The trades of _create_trades as columns, without creating Trade objects"""
+        lots = [values[0] for values in kept]
+        return TradeStore.from_columns(
+            symbols=[lot.trade.symbol for lot in lots],
+            buy_dates=[lot.buy_date for lot in lots],
+            sell_dates=[lot.sell_date for lot in lots],
+            is_option=[lot.trade.is_option for lot in lots],
+            is_short=[lot.is_short for lot in lots],
+            amount_usd=[lot.lot.realized_pl for lot in lots],
+            quantity=[-lot.lot.quantity if not lot.is_short else lot.lot.quantity for lot in lots],
+            commission=[lot.commission for lot in lots],
+            price=[lot.trade.price for lot in lots],
+            buy_exchange_rate=[values[2] for values in kept],
+            exchange_rate=[values[4] for values in kept],
+            buy_amount_tl=[values[1] for values in kept],
+            sell_amount_tl=[values[3] for values in kept],
+            buy_price=[lot.buy_price for lot in lots],
+            sell_price=[lot.sell_price for lot in lots],
+            yiufe_rate=[values[5] for values in kept]
+        )
@@ -4,45 +4,58 @@ from datetime import datetime
 from decimal import Decimal
 from models.domains.withholding_tax import WithholdingTax
 from protocols.parser_protocol import ParserProtocol
+from protocols.rate_provider_protocol import RateProviderProtocol
 from services.evds_service import EvdsService
+from services.rate_table import RateRequirements, convert_to_try, parse_iso_dates
 from services.logger_service import LoggerService
 from typing import List
 
 
 class WithholdingTaxParser(ParserProtocol[WithholdingTax]):
-    def __init__(self):
+    def __init__(self, evds_service: EvdsService = None):
         self.logger = LoggerService.get_instance()
-        self.evds_service = EvdsService()
+        self.evds_service = evds_service or EvdsService()
 
     def can_parse(self, section_name: str) -> bool:
         return section_name in ["Withholding Tax", "Fees"]
 
-    def parse(self, df: pd.DataFrame) -> List[WithholdingTax]:
-        taxes = []
-        for _, row in df.iterrows():
+    def collect_rate_requirements(self, df: pd.DataFrame, requirements: RateRequirements) -> None:
+        rows = df[(df.iloc[:, 1] == "Data") & (df.iloc[:, 2] != "Total")]
+        requirements.add_exchange_dates(parse_iso_dates(rows.iloc[:, 3]))
+
+    def parse(self, df: pd.DataFrame, rates: RateProviderProtocol = None) -> List[WithholdingTax]:
+        rates = rates or self.evds_service
+        rows = []
+        for row in df.itertuples(index=False, name=None):
             try:
-                if row.iloc[1] == "Data":
+                if row[1] == "Data":
                     # Total satırını atla
-                    if row.iloc[2] == "Total":
+                    if row[2] == "Total":
                         continue
 
-                    date = datetime.strptime(str(row.iloc[3]), '%Y-%m-%d')
-                    exchange_rate = self.evds_service.get_exchange_rate(date)
-                    amount = Decimal(str(row.iloc[5]))
-
-                    tax = WithholdingTax(
-                        symbol=row.iloc[4].split('(')[0].strip(),
-                        date=date,
-                        amount_usd=amount,
-                        amount_tl=amount * Decimal(str(exchange_rate)),
-                        taxable_amount_tl=amount * Decimal(str(exchange_rate)),
-                        exchange_rate=Decimal(str(exchange_rate)),
-                        description='Temettü Stopajı'
-                    )
-                    taxes.append(tax)
+                    date = datetime.strptime(str(row[3]), '%Y-%m-%d')
+                    amount = Decimal(str(row[5]))
+                    symbol = row[4].split('(')[0].strip()
+                    rows.append((row, date, symbol, amount))
             except Exception as e:
-                error_msg = f"Withholding tax parser error: {str(e)}\nRow data: {row.tolist()}"
+                error_msg = f"Withholding tax parser error: {str(e)}\nRow data: {list(row)}"
                 self.logger.log_error(error_msg)
                 continue
 
+        # Convert the whole column at once
+        amounts_tl, exchange_rates = convert_to_try(rates, [r[3] for r in rows], [r[1] for r in rows])
+
+        taxes = []
+        for (row, date, symbol, amount), amount_tl, exchange_rate in zip(rows, amounts_tl, exchange_rates):
+            tax = WithholdingTax(
+                symbol=symbol,
+                date=date,
+                amount_usd=amount,
+                amount_tl=amount_tl,
+                taxable_amount_tl=amount_tl,
+                exchange_rate=exchange_rate,
+                description='Temettü Stopajı'
+            )
+            taxes.append(tax)
+
         return taxes
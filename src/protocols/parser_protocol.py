@@ -1,6 +1,11 @@
-from typing import Protocol, TypeVar, List
+from typing import Protocol, TypeVar, Sequence, TYPE_CHECKING
 import pandas as pd
 
+from protocols.rate_provider_protocol import RateProviderProtocol
+
+if TYPE_CHECKING:
+    from services.rate_table import RateRequirements
+
 T = TypeVar('T')
 
 
@@ -10,6 +15,10 @@ class ParserProtocol(Protocol[T]):
         """Check if this parser can handle the given section"""
         ...
 
-    def parse(self, df: pd.DataFrame) -> List[T]:
-        """Parse the data and return a list of domain objects"""
+    def collect_rate_requirements(self, df: pd.DataFrame, requirements: 'RateRequirements') -> None:
+        """Add the dates whose rates parsing the data will need to requirements"""
+        ...
+
+    def parse(self, df: pd.DataFrame, rates: RateProviderProtocol = None) -> Sequence[T]:
+        """Parse the data and return a list (or a columnar store) of domain objects; rates default to the EVDS service"""
         ...
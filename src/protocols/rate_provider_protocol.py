@@ -0,0 +1,26 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, Protocol, Sequence
+
+
+class RateProviderProtocol(Protocol):
+    """
+    Protocol defining the rates parsers read: implemented by EvdsService, which
+    resolves every lookup itself, and by RateTable, which serves the rates
+    resolved for a whole statement in advance.
+    """
+    def get_exchange_rate(self, date: datetime) -> Decimal:
+        """USD/TRY rate of the date"""
+        ...
+
+    def get_next_available_exchange_rate(self, date: datetime) -> Decimal:
+        """USD/TRY rate of the first business day after the date"""
+        ...
+
+    def get_yiufe_index_rate(self, buy_date: datetime, sell_date: datetime) -> Optional[Decimal]:
+        """YI-ÜFE increase (%) between the buy and sell dates, or None"""
+        ...
+
+    def get_yiufe_index_rates(self, buy_dates: Sequence[datetime], sell_dates: Sequence[datetime]) -> List[Optional[Decimal]]:
+        """YI-ÜFE increases for whole arrays of buy and sell dates"""
+        ...
@@ -0,0 +1,15 @@
+from typing import List, Protocol
+import pandas as pd
+
+
+class RateSourceProtocol(Protocol):
+    """
+    Protocol defining the interface of rate sources, shaped like evdsAPI.get_data.
+
+    The returned DataFrame has a 'Tarih' column and one value column per series,
+    named like the series with '.' replaced by '_'. Daily series use dd-mm-YYYY
+    dates, monthly series YYYY-M. Dates without a published value are NaN.
+    """
+    def get_data(self, series: List[str], startdate: str, enddate: str = '') -> pd.DataFrame:
+        """Observations of the series between startdate and enddate (dd-mm-YYYY, inclusive)"""
+        ...
@@ -1,5 +1,7 @@
-from typing import Protocol, List, Any
-from decimal import Decimal
+from typing import Protocol, List, Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from services.totals_accumulator import TotalsAccumulator
 
 
 class ReportWriterProtocol(Protocol):
@@ -8,10 +10,10 @@ class ReportWriterProtocol(Protocol):
         """Write the report header"""
         ...
 
-    def write_section(self, section_name: str, rows: List[Any]) -> None:
-        """Write a section of the report"""
+    def write_section(self, section_name: str, rows: List[Any], totals: 'TotalsAccumulator' = None) -> None:
+        """Write a section of the report, adding every row to totals in the same pass"""
         ...
 
-    def write_summary(self, totals: dict[str, dict[str, Decimal]]) -> None:
-        """Write the report summary"""
+    def write_summary(self, totals: 'TotalsAccumulator') -> None:
+        """Write the category and grand totals of the report"""
         ...
@@ -0,0 +1,7 @@
+# src/rate_sources/__init__.py
+
+# This file makes the 'rate_sources' folder a Python package, allowing
+# imports within the 'rate_sources' folder or any of its subfolders.
+
+# You can include top-level package initialization code here if needed,
+# but it's generally left empty if no initialization is required.
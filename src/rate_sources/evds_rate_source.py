@@ -0,0 +1,21 @@
+import os
+import pandas as pd
+
+from evds import evdsAPI
+from protocols.rate_source_protocol import RateSourceProtocol
+from typing import List
+
+
+class EvdsRateSource(RateSourceProtocol):
+    """The TCMB EVDS web service; needs the TCMB_API_KEY environment variable"""
+
+    def __init__(self, api_key: str = None):
+        self.api_key = api_key or os.getenv('TCMB_API_KEY')
+
+        if not self.api_key:
+            raise ValueError("TCMB_API_KEY environment variable is not set")
+
+        self.evds = evdsAPI(self.api_key)
+
+    def get_data(self, series: List[str], startdate: str, enddate: str = '') -> pd.DataFrame:
+        return self.evds.get_data(series, startdate=startdate, enddate=enddate)
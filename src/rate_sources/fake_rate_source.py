@@ -0,0 +1,124 @@
+import hashlib
+import json
+import random
+import threading
+import time
+import pandas as pd
+
+from datetime import date, datetime, timedelta
+from protocols.rate_source_protocol import RateSourceProtocol
+from typing import Dict, Iterable, List, Optional
+
+DAILY_DATE_FORMAT = '%d-%m-%Y'
+
+# Series published once a month; all other series are daily
+MONTHLY_SERIES = ('TP.TUFE1YI.T1',)
+
+
+class FakeRateSource(RateSourceProtocol):
+    """
+    Local stand-in for EVDS, for tests and offline benchmarks.
+
+    Values come from a JSON fixture ({"series": {code: {Tarih: value}}}, dates
+    as EVDS returns them) or, without one, from a deterministic synthetic
+    series. Weekends, the given dates and weekdays, everything after
+    published_until and a stable share (missing_rate) of the other days have
+    no value. Every call waits latency_seconds and fails with ConnectionError
+    with probability failure_rate, drawn from the seeded generator.
+    """
+
+    def __init__(
+        self,
+        fixture_path: Optional[str] = None,
+        latency_seconds: float = 0.0,
+        failure_rate: float = 0.0,
+        missing_dates: Iterable[date] = (),
+        missing_weekdays: Iterable[int] = (5, 6),
+        missing_rate: float = 0.0,
+        published_until: Optional[date] = None,
+        seed: int = 0
+    ):
+        self.fixture = self._load_fixture(fixture_path) if fixture_path else None
+        self.latency_seconds = latency_seconds
+        self.failure_rate = failure_rate
+        self.missing_dates = set(missing_dates)
+        self.missing_weekdays = set(missing_weekdays)
+        self.missing_rate = missing_rate
+        self.published_until = published_until
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def get_data(self, series: List[str], startdate: str, enddate: str = '') -> pd.DataFrame:
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.failure_rate
+
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        if failed:
+            raise ConnectionError("Simulated EVDS failure")
+
+        start = datetime.strptime(startdate, DAILY_DATE_FORMAT).date()
+        end = datetime.strptime(enddate or startdate, DAILY_DATE_FORMAT).date()
+        code = series[0]
+        rows = [{'Tarih': label, code.replace('.', '_'): value}
+                for label, value in self._observations(code, start, end)]
+        return pd.DataFrame(rows, columns=['Tarih', code.replace('.', '_')])
+
+    @staticmethod
+    def write_fixture(path: str, start: date, end: date, series: Iterable[str] = ('TP.DK.USD.S.YTL', 'TP.TUFE1YI.T1')) -> None:
+        """Write the synthetic values of the series between start and end as a fixture file"""
+        source = FakeRateSource()
+        fixture = {code: {label: str(value) for label, value in source._observations(code, start, end)
+                          if value == value}
+                   for code in series}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'series': fixture}, f, indent=1)
+
+    def _observations(self, code: str, start: date, end: date):
+        """(Tarih, value) pairs between start and end; value is NaN when nothing is published"""
+        if code in MONTHLY_SERIES:
+            year, month = start.year, start.month
+            while (year, month) <= (end.year, end.month):
+                day = date(year, month, 1)
+                yield f"{year}-{month}", self._value(code, f"{year}-{month}", day, monthly=True)
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        else:
+            day = start
+            while day <= end:
+                yield day.strftime(DAILY_DATE_FORMAT), self._value(code, day.strftime(DAILY_DATE_FORMAT), day)
+                day += timedelta(days=1)
+
+    def _value(self, code: str, label: str, day: date, monthly: bool = False) -> float:
+        if self._is_missing(day, label, monthly):
+            return float('nan')
+
+        if self.fixture is not None:
+            value = self.fixture.get(code, {}).get(label)
+            return float(value) if value is not None else float('nan')
+
+        if monthly:
+            months = (day.year - 2003) * 12 + day.month
+            return round(100 + months ** 1.45, 2)
+        jitter = self._fraction(f"{code}:{label}")
+        return round(1.5 + (day - date(2005, 1, 1)).days * 0.0035 + jitter, 4)
+
+    def _is_missing(self, day: date, label: str, monthly: bool) -> bool:
+        if self.published_until and day > self.published_until:
+            return True
+        if monthly:
+            return False
+        if day.weekday() in self.missing_weekdays or day in self.missing_dates:
+            return True
+        return self.missing_rate > 0 and self._fraction(f"missing:{label}") < self.missing_rate
+
+    @staticmethod
+    def _fraction(key: str) -> float:
+        """Stable pseudo-random number in [0, 1) for the key, the same in every call and process"""
+        return int(hashlib.md5(key.encode()).hexdigest()[:8], 16) / 0x100000000
+
+    @staticmethod
+    def _load_fixture(path: str) -> Dict[str, Dict[str, str]]:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)['series']
@@ -0,0 +1,23 @@
+import os
+
+from utils.config import (RATE_SOURCE, RATE_SOURCE_FAILURE_RATE, RATE_SOURCE_FIXTURE,
+                          RATE_SOURCE_LATENCY_SECONDS)
+
+
+class RateSourceFactory:
+    @staticmethod
+    def get_rate_source(name: str = None):
+        name = name or os.environ.get('RATE_SOURCE', RATE_SOURCE)
+        if name == "evds":
+            # Imported here, so that offline runs do not need the evds package
+            from rate_sources.evds_rate_source import EvdsRateSource
+            return EvdsRateSource()
+        elif name == "fake":
+            from rate_sources.fake_rate_source import FakeRateSource
+            return FakeRateSource(
+                fixture_path=os.environ.get('RATE_SOURCE_FIXTURE', RATE_SOURCE_FIXTURE),
+                latency_seconds=float(os.environ.get('RATE_SOURCE_LATENCY_SECONDS', RATE_SOURCE_LATENCY_SECONDS)),
+                failure_rate=float(os.environ.get('RATE_SOURCE_FAILURE_RATE', RATE_SOURCE_FAILURE_RATE))
+            )
+        else:
+            raise ValueError(f"Unknown rate source: {name}")
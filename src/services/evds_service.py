@@ -1,45 +1,252 @@
-import os
-from evds import evdsAPI
 import pandas as pd
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from services.logger_service import LoggerService
+from databases.database import Database
 from databases.database_factory import DatabaseFactory
+from protocols.rate_source_protocol import RateSourceProtocol
+from rate_sources.rate_source_factory import RateSourceFactory
+from services.rate_cache_service import MISSING, RateCacheService
+from services.rate_table import RateRequirements, RateTable
+from services.yiufe_rate_matrix import YiufeRateMatrix, month_ordinal, month_start
+from typing import Dict, List, Optional, Sequence, Tuple
+from utils.business_calendar import TurkishBusinessCalendar, build_resolution_table
+from utils.config import NEGATIVE_CACHE_TTL_SECONDS
+from utils.diagnostics import count, span
+
+EXCHANGE_RATE_SERIES = 'TP.DK.USD.S.YTL'
+EXCHANGE_RATE_VALUE_CODE = 'TP_DK_USD_S_YTL'
+YIUFE_SERIES = 'TP.TUFE1YI.T1'
+YIUFE_VALUE_CODE = 'TP_TUFE1YI_T1'
+
+# Kinds of negative entries kept in the database
+MISSING_EXCHANGE_RATE = 'exchange_rate'
+MISSING_YIUFE_INDEX = 'yiufe_index'
+
+# Business days fetched past the end of a range, so that dates near the end of
+# the range can fall back to the next available business day
+EXCHANGE_RATE_LOOKAHEAD_BUSINESS_DAYS = 3
+
+# Used when no rate is published within the lookahead window
+DEFAULT_EXCHANGE_RATE = Decimal('1.0')
+
+# Days after the index date searched for a YI-ÜFE index that is not published
+YIUFE_FALLBACK_DAYS = 9
 
 
 class EvdsService:
-    def __init__(self):
-        self.logger = LoggerService()
-        self.db = DatabaseFactory.get_database('mongoDB')
-        self.api_key = os.getenv('TCMB_API_KEY')
+    def __init__(self, database: Database = None, rate_source: RateSourceProtocol = None):
+        self.logger = LoggerService.get_instance()
+        self.cache = RateCacheService.get_instance()
+        self.calendar = TurkishBusinessCalendar()
+        self.yiufe_matrix = YiufeRateMatrix(self._get_previous_month_date, self._resolve_yiufe_index, self.logger.log_warning)
+        self.db = database or DatabaseFactory.get_database()
+        # EVDS by default; a local fake for tests and offline benchmarks (see RATE_SOURCE)
+        self.rate_source = rate_source or RateSourceFactory.get_rate_source()
+
+    def resolve_rates(self, requirements: RateRequirements) -> RateTable:
+        """
+        Resolve every rate a statement needs in one batched pass and return them
+        as a read-only RateTable for the parsers.
 
-        if not self.api_key:
-            raise ValueError("TCMB_API_KEY environment variable is not set")
+        Each distinct date and month is looked up in the rate cache first; the
+        rest is read from the database with one query per series and fetched
+        from EVDS with one range call per series. The number of lookups grows
+        with the distinct dates of the statement, not with its rows.
+        """
+        count('planned_exchange_dates', len(requirements.exchange_dates))
+        count('planned_yiufe_months', len(requirements.yiufe_months))
+
+        exchange_rates = self._resolve_exchange_rate_dates(sorted(requirements.exchange_dates))
+        self._resolve_yiufe_months(sorted(requirements.yiufe_months))
+        return RateTable(exchange_rates, self)
+
+    def _resolve_exchange_rate_dates(self, days: List[date]) -> Dict[date, Decimal]:
+        """USD/TRY rates of the days, resolved like get_exchange_rate but batched"""
+        rates: Dict[date, Decimal] = {}
+        unknown = []
+        for day in days:
+            rate = self.cache.get_exchange_rate(day.strftime("%d-%m-%Y"))
+            if rate is MISSING:
+                rates[day] = self._default_exchange_rate()
+            elif rate is not None:
+                rates[day] = rate
+            else:
+                unknown.append(day)
+
+        if not unknown:
+            return rates
+
+        stored = self._load_stored(self.db.get_exchange_rates, self.cache.set_exchange_rate, unknown)
+        missing = [day for day in unknown if day.strftime("%d-%m-%Y") not in stored]
+        resolved = {}
+        if missing:
+            # One fetch covering the span of the missing days; the days in between are cached as well
+            resolved = self._resolve_exchange_rates(
+                datetime.combine(missing[0], datetime.min.time()),
+                datetime.combine(missing[-1], datetime.min.time())
+            )
+            if resolved is None:
+                # Left out of the table: the parsers look these days up again, and fail if EVDS still does
+                self.logger.log_error(f"Fetching exchange rates failed for {len(missing)} dates")
+                for day in unknown:
+                    date_str = day.strftime("%d-%m-%Y")
+                    if date_str in stored:
+                        rates[day] = stored[date_str]
+                return rates
+
+            self._save_stored(self.db.save_exchange_rates, {
+                day.strftime("%d-%m-%Y"): resolved[day][1] for day in missing if day in resolved
+            })
+
+        unresolved = 0
+        for day in unknown:
+            date_str = day.strftime("%d-%m-%Y")
+            if date_str in stored:
+                rates[day] = stored[date_str]
+            elif day in resolved:
+                rates[day] = resolved[day][1]
+            else:
+                unresolved += 1
+                rates[day] = self._default_exchange_rate()
+
+        if unresolved:
+            self.logger.log_error(f"No exchange rate data found for {unresolved} dates; using {DEFAULT_EXCHANGE_RATE}")
+        return rates
+
+    def _resolve_yiufe_months(self, months: List[int]) -> None:
+        """
+        Load the YI-ÜFE indices used by trades of the months into the rate cache
+        (and from there into the YI-ÜFE matrix) with one database query and one
+        EVDS range call, including the following days that are searched when
+        the index of a month is not published.
+        """
+        if not months:
+            return
+
+        unknown = []
+        for month in months:
+            index_date = self._get_previous_month_date(month_start(month)).date()
+            if self.cache.get_yiufe_index(index_date.strftime("%d-%m-%Y")) is None:
+                unknown.append(index_date)
+
+        stored = self._load_stored(self.db.get_yiufe_indices, self.cache.set_yiufe_index, unknown)
+        missing = [day for day in unknown if day.strftime("%d-%m-%Y") not in stored]
+        if missing:
+            fallback_end = missing[-1] + timedelta(days=YIUFE_FALLBACK_DAYS)
+            observations = self._fetch_range_from_evds(
+                YIUFE_SERIES,
+                missing[0].strftime("%d-%m-%Y"),
+                fallback_end.strftime("%d-%m-%Y"),
+                value_code=YIUFE_VALUE_CODE,
+                date_format="%Y-%m"
+            )
+
+            if observations is None:
+                # After a failed call nothing is remembered; the days are looked up one by one
+                self.logger.log_error(f"Fetching YI-ÜFE indices failed for {len(missing)} months")
+            else:
+                # The series is monthly: every day of a month has the index of the month.
+                # The following days are only searched when the month is not published
+                found = {}
+                for index_date in missing:
+                    days = [index_date + timedelta(days=offset) for offset in range(YIUFE_FALLBACK_DAYS + 1)]
+                    if index_date.replace(day=1) in observations:
+                        days = days[:1]
+
+                    for day in days:
+                        index = observations.get(day.replace(day=1))
+                        if index is not None:
+                            found[day.strftime("%d-%m-%Y")] = index
+                            self.cache.set_yiufe_index(day.strftime("%d-%m-%Y"), index)
+                        else:
+                            # Not published yet
+                            self.cache.mark_yiufe_index_missing(day.strftime("%d-%m-%Y"))
+                self._save_stored(self.db.save_yiufe_indices, found)
 
-        self.evds = evdsAPI(self.api_key)
+        try:
+            for month in months:
+                self.yiufe_matrix.index(month)
+        except Exception as e:
+            self.logger.log_error(f"Loading YI-ÜFE indices failed: {str(e)}")
+
+    def _load_stored(self, get_many, cache_value, days: List[date]) -> Dict[str, Decimal]:
+        """Read the stored values of the days in one query and put them in the rate cache"""
+        try:
+            stored = get_many([day.strftime("%d-%m-%Y") for day in days])
+        except Exception as e:
+            self.logger.log_error(f"Error reading stored rates: {str(e)}")
+            return {}
+
+        for date_str, value in stored.items():
+            cache_value(date_str, value)
+        return stored
+
+    def _save_stored(self, save_many, values: Dict[str, Decimal]) -> None:
+        """Store newly fetched values in one bulk write; the rate cache already holds them"""
+        try:
+            save_many(values)
+        except Exception as e:
+            self.logger.log_error(f"Error saving rates: {str(e)}")
 
     def get_exchange_rate(self, date: datetime) -> Decimal:
         """Get USD/TRY exchange rate for given date"""
+        with span('exchange_rate_lookup'):
+            return self._lookup_exchange_rate(date)
+
+    @staticmethod
+    def _default_exchange_rate() -> Decimal:
+        """Rate used for dates without a published rate; counted, so reports that use it are not cached"""
+        count('unresolved_rates')
+        return DEFAULT_EXCHANGE_RATE
+
+    def _lookup_exchange_rate(self, date: datetime) -> Decimal:
         date_str = date.strftime("%d-%m-%Y")
 
+        # Prefetched or previously resolved rates need no database round trip
+        rate = self.cache.get_exchange_rate(date_str)
+        if rate is MISSING:
+            return self._default_exchange_rate()
+        if rate is not None:
+            return rate
+
         try:
             # Check cache first
             existing_rate = self.db.get_exchange_rate(date_str)
             if existing_rate:
+                self.cache.set_exchange_rate(date_str, existing_rate)
                 return existing_rate
 
-            # Fetch from EVDS if not in cache
-            rate = self._fetch_from_evds('TP.DK.USD.S.YTL', date_str, value_code='TP_DK_USD_S_YTL')
+            if self.db.is_rate_missing(MISSING_EXCHANGE_RATE, date_str):
+                self.cache.mark_exchange_rate_missing(date_str)
+                return self._default_exchange_rate()
+
+            # Weekends and holidays use the rate of the next business day, which may be known already
+            rate_date = self.calendar.next_business_day(date)
+            if rate_date != date.date():
+                rate = self._get_known_exchange_rate(rate_date.strftime("%d-%m-%Y"))
+
+            # Otherwise resolve the date with a single range fetch from EVDS
             if rate is None:
-                self.logger.log_warning(f"No exchange rate data found for {date}. Using data from the next available business day.")
-                rate = self.get_next_available_exchange_rate(date)
+                resolved_rates = self._resolve_exchange_rates(date, date)
+                if resolved_rates is None:
+                    # A failed call says nothing about the date, so it is not remembered as missing
+                    raise ConnectionError("EVDS request failed")
+                resolved = resolved_rates.get(date.date())
+                if resolved:
+                    rate_date, rate = resolved
 
             if rate is None:
                 self.logger.log_error(f"No exchange rate data found for {date}")
-                return None
+                self._mark_missing(MISSING_EXCHANGE_RATE, date_str)
+                return self._default_exchange_rate()
+
+            if rate_date != date.date():
+                self.logger.log_warning(f"No exchange rate data found for {date}. Using data from the next available business day.")
 
             # Cache the result
             self.db.save_exchange_rate(date_str, rate)
+            self.cache.set_exchange_rate(date_str, rate)
             return rate
 
         except Exception as e:
@@ -48,38 +255,93 @@ class EvdsService:
 
     def get_next_available_exchange_rate(self, date):
         """
-        If there is no exchange rate data for the specified date, it returns the exchange
-        rate data for the next available business day.
+        Returns the exchange rate of the first business day after the given date.
         """
-        # Search for data starting from the next day (maximum 10 days)
-        for i in range(1, 10):
-            next_date = date + pd.Timedelta(days=i)
-            rate = self.get_exchange_rate(next_date)
-            if rate is not None:
-                return rate
+        return self.get_exchange_rate(date + timedelta(days=1))
 
-        # If no data is found within 10 days, return a default value or throw an error
-        self.logger.log_error(f"No exchange rate data found within 10 days after {date}.")
-        return 1.0  # Default value or you can return None
+    def _get_known_exchange_rate(self, date_str: str) -> Optional[Decimal]:
+        """Look up a rate in the cache and the database, without calling EVDS"""
+        rate = self.cache.get_exchange_rate(date_str)
+        if rate is MISSING:
+            return None
+        if rate is None:
+            rate = self.db.get_exchange_rate(date_str)
+            if rate:
+                self.cache.set_exchange_rate(date_str, rate)
+        return Decimal(str(rate)) if rate else None
+
+    def _resolve_exchange_rates(self, start: datetime, end: datetime) -> Optional[Dict[date, Tuple[date, Decimal]]]:
+        """
+        Fetch the rates between start and a few business days after end with one
+        EVDS call, and map every date in [start, end] to its effective rate date
+        and rate. All resolved dates are stored in the rate cache; dates without
+        a rate yet are cached as missing. Returns None when the call fails, and
+        then caches nothing.
+        """
+        fetch_end = self.calendar.add_business_days(end, EXCHANGE_RATE_LOOKAHEAD_BUSINESS_DAYS)
+        observations = self._fetch_range_from_evds(
+            EXCHANGE_RATE_SERIES,
+            start.strftime("%d-%m-%Y"),
+            fetch_end.strftime("%d-%m-%Y"),
+            value_code=EXCHANGE_RATE_VALUE_CODE
+        )
+        if observations is None:
+            return None
+
+        resolved = {}
+        table = build_resolution_table(observations, start, end)
+        day = start.date()
+        while day <= end.date():
+            if day in table:
+                rate_date = table[day]
+                self.cache.set_exchange_rate(day.strftime("%d-%m-%Y"), observations[rate_date])
+                resolved[day] = (rate_date, observations[rate_date])
+            else:
+                self.cache.mark_exchange_rate_missing(day.strftime("%d-%m-%Y"))
+            day += timedelta(days=1)
+
+        return resolved
+
+    def _mark_missing(self, kind: str, date_str: str) -> None:
+        """Store a negative entry in the cache and the database, so the miss is not repeated"""
+        if kind == MISSING_EXCHANGE_RATE:
+            self.cache.mark_exchange_rate_missing(date_str)
+        else:
+            self.cache.mark_yiufe_index_missing(date_str)
+        self.db.save_missing_rate(kind, date_str, NEGATIVE_CACHE_TTL_SECONDS)
 
     def get_yiufe_index(self, date: datetime) -> Decimal:
         """Get YI-ÜFE index for given date"""
         date_str = date.strftime("%d-%m-%Y")
 
+        index = self.cache.get_yiufe_index(date_str)
+        if index is MISSING:
+            return None
+        if index is not None:
+            return index
+
         try:
             # Check cache first
             existing_index = self.db.get_yiufe_index(date_str)
             if existing_index:
+                self.cache.set_yiufe_index(date_str, existing_index)
                 return existing_index
 
+            # Months that are not published yet are remembered for a while
+            if self.db.is_rate_missing(MISSING_YIUFE_INDEX, date_str):
+                self.cache.mark_yiufe_index_missing(date_str)
+                return None
+
             # Fetch from EVDS if not in cache
-            index = self._fetch_from_evds('TP.TUFE1YI.T1', date_str, value_code='TP_TUFE1YI_T1')
+            index = self._fetch_from_evds(YIUFE_SERIES, date_str, value_code=YIUFE_VALUE_CODE)
             if index is None:
                 self.logger.log_warning(f"No YI-ÜFE index found for {date}")
+                self._mark_missing(MISSING_YIUFE_INDEX, date_str)
                 return None
 
             # Cache the result
             self.db.save_yiufe_index(date_str, index)
+            self.cache.set_yiufe_index(date_str, index)
             return index
 
         except Exception as e:
@@ -95,42 +357,41 @@ class EvdsService:
     def get_yiufe_index_rate(self, buy_date: datetime, sell_date: datetime) -> Decimal:
         """Calculate YI-ÜFE rate between buy and sell dates"""
         try:
-            # Get the last days of previous months for buy and sell dates
-            buy_index_date = self._get_previous_month_date(buy_date)
-            sell_index_date = self._get_previous_month_date(sell_date)
-
-            buy_index = self.get_yiufe_index(buy_index_date)
-            sell_index = self.get_yiufe_index(sell_index_date)
-
-            # Log specific dates when indices are None
-            if buy_index is None:
-                self.logger.log_warning(f"No YI-ÜFE index found for buy date: {buy_index_date}")
-                buy_index = self.get_next_available_yiufe_index(buy_index_date)
-
-            if sell_index is None:
-                self.logger.log_warning(f"No YI-ÜFE index found for sell date: {sell_index_date}")
-                sell_index = self.get_next_available_yiufe_index(sell_index_date)
-
-            if buy_index is None or sell_index is None:
-                self.logger.log_warning(f"Could not calculate YI-ÜFE rate for period {buy_index_date} - {sell_index_date}")
-                return None
-
-            # Calculate increase rate
-            increase_rate = ((sell_index - buy_index) / buy_index) * 100
-
-            return Decimal(str(increase_rate))
+            with span('yiufe_lookup'):
+                return self.yiufe_matrix.rate(month_ordinal(buy_date), month_ordinal(sell_date))
 
         except Exception as e:
             self.logger.log_error(f"YI-ÜFE rate calculation failed: {str(e)}")
             return None
 
+    def get_yiufe_index_rates(self, buy_dates: Sequence[datetime], sell_dates: Sequence[datetime]) -> List[Optional[Decimal]]:
+        """Calculate YI-ÜFE rates for whole arrays of buy and sell dates at once"""
+        buy_months = [month_ordinal(date) for date in buy_dates]
+        sell_months = [month_ordinal(date) for date in sell_dates]
+        try:
+            with span('yiufe_lookup'):
+                return self.yiufe_matrix.rates(buy_months, sell_months)
+
+        except Exception as e:
+            # Fall back to lot by lot, so one failing pair does not drop the others
+            self.logger.log_error(f"YI-ÜFE batch rate calculation failed: {str(e)}")
+            return [self.get_yiufe_index_rate(buy, sell) for buy, sell in zip(buy_dates, sell_dates)]
+
+    def _resolve_yiufe_index(self, index_date: datetime) -> Optional[Decimal]:
+        """YI-ÜFE index of the given date, or of the next available day"""
+        index = self.get_yiufe_index(index_date)
+        if index is None:
+            self.logger.log_warning(f"No YI-ÜFE index found for date: {index_date}")
+            index = self.get_next_available_yiufe_index(index_date)
+        return index
+
     def get_next_available_yiufe_index(self, date):
         """
         For the specified date, it returns the index
         data for the next available business day.
         """
         # Search for data starting from the next day (maximum 10 days)
-        for i in range(1, 10):
+        for i in range(1, YIUFE_FALLBACK_DAYS + 1):
             next_date = date + pd.Timedelta(days=i)
             index = self.get_yiufe_index(next_date)
             if index is not None:
@@ -140,25 +401,53 @@ class EvdsService:
         self.logger.log_error(f"No YI-ÜFE index data found within 10 days after {date}.")
         return None
 
-    def _fetch_from_evds(self, series_code: str, date_str: str, value_code=None) -> Decimal:
-        """Fetch data from EVDS API for given series and date"""
+    def _fetch_from_evds(self, series_code: str, date_str: str, value_code=None) -> Optional[Decimal]:
+        """Fetch data from EVDS API for given series and date; None when nothing is published, raises when the call fails"""
         if not value_code:
             value_code = series_code
         try:
-            df = self.evds.get_data([series_code], startdate=date_str, enddate=date_str)
+            count('evds_calls')
+            df = self.rate_source.get_data([series_code], startdate=date_str, enddate=date_str)
+        except Exception as e:
+            self.logger.log_error(f"EVDS API error for {series_code}: {str(e)}")
+            raise
 
-            if df.empty:
-                self.logger.log_error(f"No data returned from EVDS API for {series_code} on {date_str}")
-                return None
+        if df is None or df.empty:
+            self.logger.log_error(f"No data returned from EVDS API for {series_code} on {date_str}")
+            return None
 
-            # Get the first value from the series
-            value = df.iloc[0][value_code]
+        # Get the first value from the series
+        value = df.iloc[0][value_code]
 
-            # Check if value is valid (not NaN or None)
-            if pd.notna(value):
-                return Decimal(str(value))
+        # Check if value is valid (not NaN or None)
+        if pd.notna(value):
+            return Decimal(str(value))
 
-            return None
+        return None
+
+    def _fetch_range_from_evds(self, series_code: str, start_str: str, end_str: str, value_code=None,
+                               date_format: str = "%d-%m-%Y") -> Optional[Dict[date, Decimal]]:
+        """
+        Fetch all observations of a series between two dates with a single EVDS
+        call. Monthly series (date_format '%Y-%m') are keyed by the first day
+        of the month. Returns an empty dict when nothing is published and None
+        when the call or its response fails.
+        """
+        if not value_code:
+            value_code = series_code
+        try:
+            count('evds_calls')
+            df = self.rate_source.get_data([series_code], startdate=start_str, enddate=end_str)
+
+            if df is None or df.empty:
+                self.logger.log_error(f"No data returned from EVDS API for {series_code} between {start_str} and {end_str}")
+                return {}
+
+            observations = {}
+            for date_value, value in zip(df['Tarih'], df[value_code]):
+                if pd.notna(value):
+                    observations[datetime.strptime(str(date_value), date_format).date()] = Decimal(str(value))
+            return observations
 
         except Exception as e:
             self.logger.log_error(f"EVDS API error for {series_code}: {str(e)}")
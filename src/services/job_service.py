@@ -0,0 +1,221 @@
+import multiprocessing
+import shutil
+import threading
+import uuid
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from services.logger_service import LoggerService
+from services.report_cache_service import ReportCacheService
+from typing import Any, Callable, Dict, Optional
+from utils.config import JOBS_DIR, REPORT_JOB_HISTORY, REPORT_JOB_WORKERS, REPORT_NAME
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+INPUT_NAME = 'statement.csv'
+
+# Set in every worker process by _init_worker
+_progress_queue = None
+
+
+def _init_worker(progress_queue) -> None:
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _run_report_job(job_id: str, input_path: str, report_path: str) -> Dict[str, Any]:
+    """Runs in a worker process: builds the report and returns its summary"""
+    from services.service_container import ServiceContainer
+    from writers.csv_report_writer import CSVReportWriter
+
+    def on_progress(done: int, total: Optional[int]) -> None:
+        _progress_queue.put((job_id, done, total))
+
+    def create_report() -> Dict[str, Any]:
+        with CSVReportWriter(report_path) as writer:
+            service = ServiceContainer.get_instance().create_report_service(writer, on_progress)
+            return service.process_report(input_path)
+
+    on_progress(0, None)
+    try:
+        return ReportCacheService.get_instance().get_or_create(Path(input_path), Path(report_path), create_report)
+    finally:
+        # Pool workers exit without running atexit handlers
+        LoggerService.get_instance().flush()
+
+
+def _to_json(value: Any) -> Any:
+    """Summary values as JSON types; Decimals are kept exact as strings"""
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class ReportJob:
+    def __init__(self, job_id: str, directory: Path):
+        self.id = job_id
+        self.directory = directory
+        self.input_path = directory / INPUT_NAME
+        self.report_path = directory / REPORT_NAME
+        self.status = JOB_QUEUED
+        self.sections_done = 0
+        self.section_count: Optional[int] = None
+        self.summary: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JOB_DONE, JOB_FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        progress = 1.0 if self.status == JOB_DONE else None
+        if progress is None and self.section_count:
+            progress = round(self.sections_done / self.section_count, 4)
+
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': progress,
+            'sections_done': self.sections_done,
+            'summary': _to_json(self.summary),
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class JobService:
+    """
+    Runs reports in the background on a bounded pool of worker processes.
+
+    Workers report section progress through a multiprocessing queue that a
+    listener thread drains into the job table, so no outside broker is needed.
+    The job table lives in the web process that accepted the upload: status
+    polls must reach the same process (one web worker with threads, or sticky
+    sessions). Workers are started by a fork server where available, else
+    spawned: forking the threaded web process could copy a lock held by
+    another thread. A pool that broke because a worker died is replaced, so
+    later jobs still run.
+    """
+    _instance: Optional['JobService'] = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'JobService':
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = JobService()
+        return cls._instance
+
+    def __init__(self, max_workers: int = REPORT_JOB_WORKERS, jobs_dir: Path = JOBS_DIR):
+        self.logger = LoggerService.get_instance()
+        self.jobs_dir = Path(jobs_dir)
+        self.jobs: Dict[str, ReportJob] = {}
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor_lock = threading.Lock()
+
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        if self._context.get_start_method() == 'forkserver':
+            # Loaded once in the fork server rather than in every worker
+            self._context.set_forkserver_preload(['services.service_container'])
+        self._progress_queue = self._context.Queue()
+        self.executor = self._create_executor()
+
+        self._listener = threading.Thread(target=self._listen, name='report-job-progress', daemon=True)
+        self._listener.start()
+
+    def submit(self, save_input: Callable[[str], None]) -> ReportJob:
+        """Create a job, let the caller store the statement in it and queue it"""
+        job_id = uuid.uuid4().hex
+        job = ReportJob(job_id, self.jobs_dir / job_id)
+        job.directory.mkdir(parents=True, exist_ok=True)
+        save_input(str(job.input_path))
+
+        with self._lock:
+            self.jobs[job_id] = job
+            self._evict_finished_jobs()
+
+        executor = self.executor
+        try:
+            future = executor.submit(_run_report_job, job_id, str(job.input_path), str(job.report_path))
+        except BrokenProcessPool:
+            executor = self._replace_executor(executor)
+            future = executor.submit(_run_report_job, job_id, str(job.input_path), str(job.report_path))
+        future.add_done_callback(lambda done: self._finish(job, done, executor))
+        return job
+
+    def get_job(self, job_id: str) -> Optional[ReportJob]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(self._progress_queue,)
+        )
+
+    def _replace_executor(self, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """Start a new pool in place of a broken one, once even when several callers notice"""
+        with self._executor_lock:
+            if self.executor is broken:
+                self.logger.log_error("Report worker pool is broken; starting a new one")
+                broken.shutdown(wait=False)
+                self.executor = self._create_executor()
+            return self.executor
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+        self._progress_queue.put(None)
+        self._listener.join()
+
+    def _listen(self) -> None:
+        while True:
+            message = self._progress_queue.get()
+            if message is None:
+                return
+
+            job_id, done, total = message
+            with self._lock:
+                job = self.jobs.get(job_id)
+                # Progress can arrive after the result; a finished job stays finished
+                if job is None or job.is_finished:
+                    continue
+                job.status = JOB_RUNNING
+                job.sections_done = done
+                job.section_count = total
+
+    def _finish(self, job: ReportJob, future: Future, executor: ProcessPoolExecutor) -> None:
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._replace_executor(executor)
+
+        with self._lock:
+            try:
+                job.summary = future.result()
+                job.status = JOB_DONE
+            except Exception as e:
+                self.logger.log_error(f"Report job {job.id} failed: {str(e)}")
+                job.error = 'Rapor işlenemedi'
+                job.status = JOB_FAILED
+            job.finished_at = datetime.now()
+
+    def _evict_finished_jobs(self) -> None:
+        """Forget the oldest finished jobs beyond the history size and delete their files"""
+        finished = [job for job in self.jobs.values() if job.is_finished]
+        for job in finished[:max(0, len(finished) - REPORT_JOB_HISTORY)]:
+            del self.jobs[job.id]
+            shutil.rmtree(job.directory, ignore_errors=True)
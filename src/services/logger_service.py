@@ -1,13 +1,39 @@
-from typing import Optional
+import atexit
+import os
+import queue
+import threading
+import time
+import weakref
+
+from typing import Callable, Dict, IO, List, Optional, Tuple
 from datetime import datetime
+from utils.config import (LOG_BACKUP_COUNT, LOG_DEDUP_WINDOW_SECONDS, LOG_FLUSH_INTERVAL_SECONDS,
+                          LOG_MAX_BYTES)
 
 ERROR_LOG_PATH = 'output/error.log'
 INFO_LOG_PATH = 'output/info.log'
 WARNING_LOG_PATH = 'output/warning.log'
 
+# Largest number of entries written between two flushes
+MAX_BATCH_SIZE = 1000
+
+# Entry: (level, message, file_path, timestamp)
+LogEntry = Tuple[str, str, str, str]
+
 
 class LoggerService:
+    """
+    Non-blocking logger: log calls only put the entry on a queue. A background
+    thread writes the entries in batches, keeps one handle per log file open
+    and rotates a file once it grows beyond LOG_MAX_BYTES (keeping
+    LOG_BACKUP_COUNT old files as .1, .2, ...).
+
+    A warning that repeats within LOG_DEDUP_WINDOW_SECONDS is written once;
+    the repetitions are written as a single count when the window closes.
+    Pending entries are written by flush(), which also runs at exit.
+    """
     _instance: Optional['LoggerService'] = None
+    _instances = weakref.WeakSet()
 
     @classmethod
     def get_instance(cls) -> 'LoggerService':
@@ -15,6 +41,12 @@ class LoggerService:
             cls._instance = LoggerService()
         return cls._instance
 
+    def __init__(self):
+        self._start_lock = threading.Lock()
+        self._reset()
+        LoggerService._instances.add(self)
+        atexit.register(self.close)
+
     def log_error(self, message: str):
         self._log("ERROR", message, ERROR_LOG_PATH)
 
@@ -25,10 +57,165 @@ class LoggerService:
         """Log warning message"""
         self._log("WARNING", message, WARNING_LOG_PATH)
 
+    def flush(self, timeout: float = 10.0) -> None:
+        """Wait until every entry logged so far is written"""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self) -> None:
+        """Write pending entries, including open repeat counts, and close the files"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=10.0)
+        self._thread = None
+
     def _log(self, level: str, message: str, file_path: str):
-        """Internal method to write log entry"""
+        """Internal method to queue a log entry"""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_entry = f"[{timestamp}] {level}: {message}\n"
+        if self._thread is None:
+            self._start()
+        self._queue.put((level, message, file_path, timestamp))
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='logger', daemon=True)
+                self._thread.start()
+
+    def _reset(self) -> None:
+        """Fresh queue, files and writer thread state (also used in forked children)"""
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._files: Dict[str, IO] = {}
+        self._sizes: Dict[str, int] = {}
+        # (file_path, message) -> [first_seen, repetitions, last_timestamp]
+        self._repeats: Dict[Tuple[str, str], list] = {}
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=LOG_FLUSH_INTERVAL_SECONDS)
+            except queue.Empty:
+                self._write_safely(self._close_expired_windows)
+                continue
+
+            batch: List[LogEntry] = []
+            markers: List[threading.Event] = []
+            stop = False
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= MAX_BATCH_SIZE:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            self._write_safely(self._write_batch, batch)
+            self._write_safely(self._close_expired_windows, force=stop or bool(markers))
+            for marker in markers:
+                marker.set()
+
+            if stop:
+                for handle in self._files.values():
+                    handle.close()
+                self._files.clear()
+                return
+
+    def _write_safely(self, write: Callable[..., None], *args, **kwargs) -> None:
+        """Run a write step and flush; an error drops what is left of the step but keeps the writer thread alive"""
+        try:
+            write(*args, **kwargs)
+        except Exception:
+            pass
+        self._flush_files()
+
+    def _write_batch(self, batch: List[LogEntry]) -> None:
+        now = time.monotonic()
+        for level, message, file_path, timestamp in batch:
+            if level == "WARNING":
+                repeat = self._repeats.get((file_path, message))
+                if repeat is not None and now - repeat[0] < LOG_DEDUP_WINDOW_SECONDS:
+                    repeat[1] += 1
+                    repeat[2] = timestamp
+                    continue
+                if repeat is not None:
+                    self._write_repeat_count(file_path, message, repeat)
+                self._repeats[(file_path, message)] = [now, 0, timestamp]
+
+            self._write(file_path, f"[{timestamp}] {level}: {message}\n")
+
+    def _close_expired_windows(self, force: bool = False) -> None:
+        """Write the repeat counts of windows that are over (all of them when forced)"""
+        now = time.monotonic()
+        for key, repeat in list(self._repeats.items()):
+            if force or now - repeat[0] >= LOG_DEDUP_WINDOW_SECONDS:
+                self._write_repeat_count(key[0], key[1], repeat)
+                del self._repeats[key]
+
+    def _write_repeat_count(self, file_path: str, message: str, repeat: list) -> None:
+        if repeat[1]:
+            self._write(file_path, f"[{repeat[2]}] WARNING: (repeated {repeat[1]} more times) {message}\n")
+            repeat[1] = 0
+
+    def _write(self, file_path: str, text: str) -> None:
+        try:
+            handle = self._files.get(file_path)
+            if handle is None:
+                handle = self._files[file_path] = open(file_path, 'a', encoding='utf-8', errors='backslashreplace')
+                self._sizes[file_path] = os.path.getsize(file_path)
+            handle.write(text)
+            # Characters, not bytes: close enough for rotation and needs no flush
+            self._sizes[file_path] += len(text)
+            if self._sizes[file_path] >= LOG_MAX_BYTES:
+                self._rotate(file_path)
+        except Exception:
+            # Logging must never break the report; the directory may be cleaned meanwhile
+            self._close_file(file_path)
+
+    def _close_file(self, file_path: str) -> None:
+        """Close the file and forget its size; it is reopened by the next write"""
+        handle = self._files.pop(file_path, None)
+        self._sizes.pop(file_path, None)
+        if handle is not None:
+            try:
+                handle.close()
+            except Exception:
+                pass
+
+    def _rotate(self, file_path: str) -> None:
+        self._close_file(file_path)
+        for index in range(LOG_BACKUP_COUNT - 1, 0, -1):
+            if os.path.exists(f"{file_path}.{index}"):
+                os.replace(f"{file_path}.{index}", f"{file_path}.{index + 1}")
+        if LOG_BACKUP_COUNT > 0:
+            os.replace(file_path, f"{file_path}.1")
+        else:
+            os.remove(file_path)
+
+    def _flush_files(self) -> None:
+        for handle in self._files.values():
+            try:
+                handle.flush()
+            except Exception:
+                pass
+
+    @classmethod
+    def _after_fork(cls) -> None:
+        # The writer thread does not exist in the child; start over with its own queue
+        for instance in list(cls._instances):
+            instance._start_lock = threading.Lock()
+            instance._reset()
+
 
-        with open(file_path, 'a', encoding='utf-8') as f:
-            f.write(log_entry)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=LoggerService._after_fork)
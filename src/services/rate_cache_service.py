@@ -0,0 +1,153 @@
+import threading
+import time
+
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Dict, Hashable, Optional
+from utils.config import NEGATIVE_CACHE_TTL_SECONDS, RATE_CACHE_MAX_SIZE
+from utils.diagnostics import count
+
+
+class _MissingEntry:
+    """Negative cache entry: the value is known not to exist until expires_at"""
+    __slots__ = ('expires_at',)
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+
+
+# Returned by lookups of values that are known to be missing
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded mapping that evicts the least recently used entry.
+    Keys can also be marked as missing for a limited time; get returns MISSING
+    for them until the entry expires.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+
+            value = self._entries[key]
+            if isinstance(value, _MissingEntry):
+                if value.expires_at <= time.monotonic():
+                    del self._entries[key]
+                    self.misses += 1
+                    return None
+                self._entries.move_to_end(key)
+                self.negative_hits += 1
+                return MISSING
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def set_missing(self, key: Hashable, ttl_seconds: float = NEGATIVE_CACHE_TTL_SECONDS) -> None:
+        self.set(key, _MissingEntry(time.monotonic() + ttl_seconds))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.negative_hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RateCacheService:
+    """
+    Process-wide cache of exchange rates and YI-ÜFE indices, shared by all parsers
+    and requests. Sits in front of the database so that a date is read from
+    MongoDB at most once per process.
+
+    Lookups return None for unknown dates and MISSING for dates that are known
+    to have no published value (see mark_exchange_rate_missing).
+    """
+    _instance: Optional['RateCacheService'] = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'RateCacheService':
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = RateCacheService()
+        return cls._instance
+
+    def __init__(self, max_size: int = RATE_CACHE_MAX_SIZE):
+        self.exchange_rates = LRUCache(max_size)
+        self.yiufe_indices = LRUCache(max_size)
+
+    def get_exchange_rate(self, date_str: str) -> Optional[Decimal]:
+        return self._counted(self.exchange_rates.get(date_str))
+
+    def set_exchange_rate(self, date_str: str, rate: Decimal) -> None:
+        self.exchange_rates.set(date_str, Decimal(str(rate)))
+
+    def mark_exchange_rate_missing(self, date_str: str, ttl_seconds: float = NEGATIVE_CACHE_TTL_SECONDS) -> None:
+        self.exchange_rates.set_missing(date_str, ttl_seconds)
+
+    def get_yiufe_index(self, date_str: str) -> Optional[Decimal]:
+        return self._counted(self.yiufe_indices.get(date_str))
+
+    def set_yiufe_index(self, date_str: str, index: Decimal) -> None:
+        self.yiufe_indices.set(date_str, Decimal(str(index)))
+
+    def mark_yiufe_index_missing(self, date_str: str, ttl_seconds: float = NEGATIVE_CACHE_TTL_SECONDS) -> None:
+        self.yiufe_indices.set_missing(date_str, ttl_seconds)
+
+    @staticmethod
+    def _counted(value: Any) -> Any:
+        """Count the lookup in the diagnostics of the running report"""
+        if value is MISSING:
+            count('rate_cache_negative_hits')
+        elif value is None:
+            count('rate_cache_misses')
+        else:
+            count('rate_cache_hits')
+        return value
+
+    def clear(self) -> None:
+        self.exchange_rates.clear()
+        self.yiufe_indices.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            'exchange_rates': self.exchange_rates.stats(),
+            'yiufe_indices': self.yiufe_indices.stats()
+        }
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from protocols.rate_provider_protocol import RateProviderProtocol
+from services.yiufe_rate_matrix import month_ordinal
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+from utils.diagnostics import count
+
+# Matches the leading ISO date of values like '2024-01-02' or '2024-01-02, 09:30:00'
+DATE_PATTERN = r'^(\d{4}-\d{2}-\d{2})'
+
+
+def parse_iso_dates(values: pd.Series) -> List[date]:
+    """Distinct leading ISO dates of the values; values without a valid date are skipped"""
+    dates = []
+    for value in values.astype(str).str.extract(DATE_PATTERN)[0].dropna().unique().tolist():
+        try:
+            dates.append(datetime.strptime(value, '%Y-%m-%d').date())
+        except ValueError:
+            continue
+    return dates
+
+
+class RateRequirements:
+    """
+    Distinct dates and months whose rates the sections of a statement need,
+    collected by the parsers before any section is parsed.
+    """
+
+    def __init__(self):
+        self.exchange_dates: Set[date] = set()
+        self.yiufe_months: Set[int] = set()
+
+    def add_exchange_dates(self, dates: Iterable[date]) -> None:
+        self.exchange_dates.update(dates)
+
+    def add_yiufe_dates(self, dates: Iterable[date]) -> None:
+        """Trade dates whose YI-ÜFE index is needed; the index depends only on the month"""
+        self.yiufe_months.update(month_ordinal(day) for day in dates)
+
+
+class RateTable(RateProviderProtocol):
+    """
+    Read-only rates resolved for a RateRequirements by EvdsService.resolve_rates,
+    with the read API of EvdsService, so parsers compute without any I/O.
+
+    Exchange rates are served from the table. Their effective business day is
+    already applied, and they are kept both by date and in an array indexed by
+    day ordinal, so convert_to_try finds the rates of a whole column with one
+    NumPy index instead of a dict lookup per row. YI-ÜFE increases are computed by the service from the indices of
+    the planned months, which it has already loaded. A date that was not
+    planned is looked up through the service and counted as rate_table_misses.
+    """
+
+    def __init__(self, exchange_rates: Mapping[date, Decimal], rate_service: RateProviderProtocol):
+        self._exchange_rates = MappingProxyType(dict(exchange_rates))
+        self._rate_service = rate_service
+
+        # Rates as the parsers use them (Decimal(str(rate))); None marks days that were not planned
+        self._first_ordinal = min(exchange_rates).toordinal() if exchange_rates else 0
+        span = max(exchange_rates).toordinal() - self._first_ordinal + 1 if exchange_rates else 0
+        self._rate_array = np.full(span, None, dtype=object)
+        for day, rate in exchange_rates.items():
+            self._rate_array[day.toordinal() - self._first_ordinal] = Decimal(str(rate))
+
+    def get_exchange_rate(self, date: datetime) -> Decimal:
+        rate = self._exchange_rates.get(date.date())
+        if rate is None:
+            count('rate_table_misses')
+            return self._rate_service.get_exchange_rate(date)
+        return rate
+
+    def get_exchange_rates(self, dates: Sequence[datetime]) -> List[Optional[Decimal]]:
+        """Rates of whole columns of dates, gathered by day ordinal; None where the table has no rate"""
+        if not len(self._rate_array):
+            return [None] * len(dates)
+
+        positions = np.fromiter((day.toordinal() for day in dates), dtype=np.int64, count=len(dates))
+        positions -= self._first_ordinal
+        covered = (positions >= 0) & (positions < len(self._rate_array))
+
+        rates = self._rate_array[np.where(covered, positions, 0)]
+        rates[~covered] = None
+        return rates.tolist()
+
+    def get_next_available_exchange_rate(self, date: datetime) -> Decimal:
+        return self.get_exchange_rate(date + timedelta(days=1))
+
+    def get_yiufe_index_rate(self, buy_date: datetime, sell_date: datetime) -> Optional[Decimal]:
+        return self._rate_service.get_yiufe_index_rate(buy_date, sell_date)
+
+    def get_yiufe_index_rates(self, buy_dates: Sequence[datetime], sell_dates: Sequence[datetime]) -> List[Optional[Decimal]]:
+        return self._rate_service.get_yiufe_index_rates(buy_dates, sell_dates)
+
+
+def convert_to_try(
+    rates: RateProviderProtocol,
+    amounts: Sequence[Decimal],
+    dates: Sequence[datetime]
+) -> Tuple[List[Decimal], List[Decimal]]:
+    """
+    Convert whole columns of USD amounts to TRY: returns the TRY amounts and
+    the rates used.
+
+    A RateTable finds the rates of the dates it covers with one array index;
+    other dates, and all dates of other providers, are looked up one by one.
+    A rate that cannot be resolved raises, so no row is silently left out.
+    The multiply is Decimal, row by row, so every result is exactly the
+    amount * Decimal(str(rate)) of the row-by-row conversion.
+    """
+    if isinstance(rates, RateTable):
+        used = rates.get_exchange_rates(dates)
+    else:
+        used = [None] * len(dates)
+
+    for position in [position for position, rate in enumerate(used) if rate is None]:
+        rate = rates.get_exchange_rate(dates[position])
+        if rate is None:
+            rate = rates.get_next_available_exchange_rate(dates[position])
+        if rate is None:
+            raise ValueError(f"Could not get exchange rate for {dates[position]:%d-%m-%Y}")
+        used[position] = Decimal(str(rate))
+
+    return [amount * rate for amount, rate in zip(amounts, used)], used
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from services.logger_service import LoggerService
+from typing import Any, Callable, Dict, Optional
+from utils.config import RATE_DATA_VERSION, REPORT_CACHE_DIR, REPORT_CACHE_MAX_BYTES
+
+SUMMARY_NAME = 'summary.json'
+REPORT_NAME = 'report.csv'
+
+# Uploads are hashed in chunks, so large statements are never held in memory
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Key of the JSON objects that hold a Decimal of the summary as a string
+DECIMAL_KEY = '$decimal'
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return {DECIMAL_KEY: str(value)}
+    raise TypeError(f"{type(value).__name__} cannot be cached")
+
+
+def _decode(value: Dict[str, Any]) -> Any:
+    if value.keys() == {DECIMAL_KEY}:
+        return Decimal(value[DECIMAL_KEY])
+    return value
+
+
+class ReportCacheService:
+    """
+    On-disk cache of finished reports, keyed by the SHA-256 of the uploaded
+    bytes and the version of the rate data they were computed with.
+
+    The rate data version combines RATE_DATA_VERSION with the current date:
+    rates published later (or corrected) invalidate the results of the day
+    before. Entries are directories holding the summary as JSON, with exact
+    Decimals, and the report CSV. They are written atomically, so web workers
+    and job workers can share the cache. The least recently used entries are
+    evicted once the cache grows beyond REPORT_CACHE_MAX_BYTES.
+
+    A report that used a fallback for a rate that was not published yet (the
+    default exchange rate or a missing YI-ÜFE index, counted as
+    unresolved_rates in its diagnostics) is not cached: it changes once the
+    rate is published.
+    """
+    _instance: Optional['ReportCacheService'] = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'ReportCacheService':
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = ReportCacheService()
+        return cls._instance
+
+    def __init__(self, cache_dir: Path = REPORT_CACHE_DIR, max_bytes: int = REPORT_CACHE_MAX_BYTES):
+        self.logger = LoggerService.get_instance()
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def get_or_create(self, input_path: Path, report_path: Path, create: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Return the summary of the uploaded statement and put its report at
+        report_path, from the cache when the same statement was processed
+        before with the same rate data, otherwise by calling create.
+        """
+        key = self.key_for(input_path)
+        summary = self.get(key, report_path)
+        if summary is not None:
+            self.logger.log_info(f"Report cache hit: {key}")
+            # The report service removes the uploaded file when it processes it
+            os.remove(input_path)
+            # Timings of the original run do not describe this request
+            summary['diagnostics'] = {'report_cache_hit': True}
+            return summary
+
+        summary = create()
+        unresolved = summary.get('diagnostics', {}).get('counters', {}).get('unresolved_rates')
+        if unresolved:
+            self.logger.log_info(f"Report not cached: {unresolved} unresolved rates: {key}")
+        else:
+            self.put(key, summary, report_path)
+        return summary
+
+    def key_for(self, input_path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(input_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return f"{RATE_DATA_VERSION}-{date.today():%Y%m%d}-{digest.hexdigest()}"
+
+    def get(self, key: str, report_path: Path) -> Optional[Dict[str, Any]]:
+        """Copy the cached report to report_path and return its summary, or None on a miss"""
+        entry = self.cache_dir / key
+        try:
+            with open(entry / SUMMARY_NAME, encoding='utf-8') as f:
+                summary = json.load(f, object_hook=_decode)
+            shutil.copyfile(entry / REPORT_NAME, report_path)
+            # The modification time orders entries for eviction
+            os.utime(entry)
+            return summary
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.log_error(f"Report cache read failed for {key}: {str(e)}")
+            return None
+
+    def put(self, key: str, summary: Dict[str, Any], report_path: Path) -> None:
+        """Store a finished report; failures are logged and never fail the request"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            staging = Path(tempfile.mkdtemp(dir=self.cache_dir, prefix='.staging-'))
+            with open(staging / SUMMARY_NAME, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, default=_encode)
+            shutil.copyfile(report_path, staging / REPORT_NAME)
+
+            try:
+                os.rename(staging, self.cache_dir / key)
+            except OSError:
+                # Another worker stored the same report first
+                shutil.rmtree(staging, ignore_errors=True)
+
+            self._evict()
+        except Exception as e:
+            self.logger.log_error(f"Report cache write failed for {key}: {str(e)}")
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries until the cache fits in max_bytes"""
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_dir() and not entry.name.startswith('.'):
+                    size = sum(item.stat().st_size for item in os.scandir(entry.path))
+                    entries.append((entry.stat().st_mtime, size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
@@ -1,51 +1,98 @@
+import contextvars
+import json
 import os
+import numpy as np
 import pandas as pd
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from decimal import Decimal
 from protocols.parser_protocol import ParserProtocol
+from protocols.rate_provider_protocol import RateProviderProtocol
 from protocols.report_writer_protocol import ReportWriterProtocol
+from services.evds_service import EvdsService
 from services.logger_service import LoggerService
-from typing import List, Dict, Any
+from services.rate_table import RateRequirements
+from services.totals_accumulator import TotalsAccumulator
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional
+from utils.config import REPORT_ENGINE, REPORT_PARSE_WORKERS
 from utils.csv_preprocessor import CSVPreprocessor
+from utils.diagnostics import collect, span
 
 
 class ReportService:
     def __init__(
         self,
         parsers: List[ParserProtocol],
-        writer: ReportWriterProtocol
+        writer: ReportWriterProtocol,
+        evds_service: EvdsService = None,
+        engine: str = REPORT_ENGINE,
+        on_progress: Callable[[int, Optional[int]], None] = None,
+        parse_workers: int = REPORT_PARSE_WORKERS
     ):
+        if engine not in ('pandas', 'stream'):
+            raise ValueError(f"Unknown report engine: {engine}")
+
         self.parsers = parsers
         self.writer = writer
+        self.evds_service = evds_service
+        self.engine = engine
+        self.on_progress = on_progress
+        self.parse_workers = parse_workers
         self.logger = LoggerService.get_instance()
-        self.totals: Dict[str, Dict[str, Decimal]] = {
-            'Hisse Senedi': {'USD': Decimal('0'), 'TL': Decimal('0')},
-            'Opsiyon': {'USD': Decimal('0'), 'TL': Decimal('0')},
-            'Temettü': {'USD': Decimal('0'), 'TL': Decimal('0')},
-            'Stopaj': {'USD': Decimal('0'), 'TL': Decimal('0')},
-            'Ücretler': {'USD': Decimal('0'), 'TL': Decimal('0')}  # Add fees
-        }
+        # Filled by the writer while it writes the sections
+        self.accumulator = TotalsAccumulator()
+        self.totals: Dict[str, Dict[str, Decimal]] = self.accumulator.categories
 
     def process_report(self, file_path: str) -> Dict[str, Any]:
-        """Process report and return tax summary"""
-        try:
-            # Preprocess CSV file
-            df = CSVPreprocessor.preprocess(file_path)
+        """
+        Process report and return tax summary. Stage timings and rate lookup
+        counters are returned under the 'diagnostics' key and logged as one
+        JSON line.
+        """
+        with collect() as diagnostics:
+            summary = self._build_report(file_path)
+
+        summary['diagnostics'] = diagnostics.to_dict()
+        if self.evds_service:
+            summary['diagnostics']['rate_cache'] = self.evds_service.cache.stats()
+        self.logger.log_info(json.dumps({'event': 'report_diagnostics', 'engine': self.engine, **summary['diagnostics']}))
+        return summary
 
+    def _build_report(self, file_path: str) -> Dict[str, Any]:
+        try:
             # Write header
             self.writer.write_header()
 
+            if self.engine == 'stream':
+                # Two passes over the file, each holding a single section in memory
+                rates = self._resolve_rates(self._stream_sections(file_path))
+                sections = self._stream_sections(file_path)
+            else:
+                # Preprocess CSV file
+                with span('preprocess'):
+                    df = CSVPreprocessor.preprocess(file_path)
+                with span('split_sections'):
+                    sections = self._split_into_sections(df)
+
+                # Resolve all rates the statement needs at once
+                rates = self._resolve_rates(sections)
+
+            # The number of sections is not known before a streamed file has been read
+            section_count = len(sections) if isinstance(sections, list) else None
+
             # Process each section
-            sections = self._split_into_sections(df)
-            for section_name, section_df in sections:
-                parser = self._find_parser(section_name)
-                if parser:
-                    parsed_data = parser.parse(section_df)
-                    self._update_totals(section_name, parsed_data)
-                    self.writer.write_section(section_name, parsed_data)
+            if self.parse_workers > 1:
+                self._process_sections_in_parallel(sections, section_count, rates)
+            else:
+                for position, (section_name, section_df) in enumerate(sections, start=1):
+                    parser = self._find_parser(section_name)
+                    parsed_data = self._parse_section(parser, section_df, rates) if parser else None
+                    self._write_section(section_name, parsed_data, position, section_count)
 
             # Write summary
-            self.writer.write_summary(self.totals)
+            with span('write_summary'):
+                self.writer.write_summary(self.accumulator)
 
             # Calculate summary values
             stock_profit = self.totals.get('Hisse Senedi', {}).get('TL', Decimal('0'))
@@ -80,10 +127,7 @@ class ReportService:
                     'Ücretler': {'USD': self.totals.get('Ücretler', {}).get('USD', Decimal('0')),  # Add fees
                                 'TL': fees}
                 },
-                'totals': {
-                    'USD': sum(cat.get('USD', Decimal('0')) for cat in self.totals.values()),
-                    'TL': sum(cat.get('TL', Decimal('0')) for cat in self.totals.values()),
-                },
+                'totals': dict(self.accumulator.grand_totals()),
                 'tax_summary': {
                     'taxable_profit': total_taxable_profit,
                     'tax_amount': total_tax_amount,
@@ -95,45 +139,130 @@ class ReportService:
             self.logger.log_error(f"Rapor işlenirken hata: {str(e)}")
             raise
 
+    def _process_sections_in_parallel(
+        self,
+        sections: Iterable[tuple[str, pd.DataFrame]],
+        section_count: Optional[int],
+        rates: Optional[RateProviderProtocol]
+    ) -> None:
+        """
+        Parse the sections on a thread pool, where their rate lookups wait at
+        the same time, and merge and write the results one by one in statement
+        order, so totals and output match the sequential run. At most
+        parse_workers sections wait to be written, which keeps streamed
+        statements from being read into memory at once.
+        """
+        pending: deque[tuple[str, Optional[Future]]] = deque()
+        position = 0
+
+        def write_next() -> None:
+            nonlocal position
+            section_name, future = pending.popleft()
+            position += 1
+            self._write_section(section_name, future.result() if future else None, position, section_count)
+
+        with ThreadPoolExecutor(max_workers=self.parse_workers, thread_name_prefix='report-parse') as executor:
+            try:
+                for section_name, section_df in sections:
+                    parser = self._find_parser(section_name)
+                    future = None
+                    if parser:
+                        # Each task runs in a copy of this context: diagnostics and the decimal context
+                        future = executor.submit(contextvars.copy_context().run, self._parse_section, parser, section_df, rates)
+                    pending.append((section_name, future))
+                    if len(pending) > self.parse_workers:
+                        write_next()
+
+                while pending:
+                    write_next()
+            except BaseException:
+                for _, future in pending:
+                    if future:
+                        future.cancel()
+                raise
+
+    def _parse_section(self, parser: ParserProtocol, section_df: pd.DataFrame, rates: Optional[RateProviderProtocol]) -> List[Any]:
+        with span(f"parse.{type(parser).__name__}"):
+            return parser.parse(section_df, rates)
+
+    def _write_section(self, section_name: str, parsed_data: Optional[List[Any]], position: int, section_count: Optional[int]) -> None:
+        """Write a parsed section, which adds it to the totals; sections without a parser only count as progress"""
+        if parsed_data is not None:
+            with span('write_sections'):
+                self.writer.write_section(section_name, parsed_data, self.accumulator)
+        self._report_progress(position, section_count)
+
+    def _report_progress(self, done: int, total: Optional[int]) -> None:
+        """Tell the caller how many sections are processed; a failing callback must not stop the report"""
+        if not self.on_progress:
+            return
+        try:
+            self.on_progress(done, total)
+        except Exception as e:
+            self.logger.log_error(f"Progress callback failed: {str(e)}")
+
     def _split_into_sections(self, df: pd.DataFrame) -> List[tuple[str, pd.DataFrame]]:
-        sections = []
-        current_section = None
-        current_rows = []
+        """
+        Split the statement at its header rows. Each section is returned as a
+        positional slice of df (a view, no rows are copied) that starts with
+        its header row. Rows before the first header are ignored.
+        """
+        if df.empty:
+            return []
 
-        for _, row in df.iterrows():
-            section_name = row.iloc[0]
-            if row.iloc[1] == "Header":
-                if current_section and current_rows:
-                    sections.append((current_section, pd.DataFrame(current_rows)))
-                current_section = section_name
-                current_rows = []
-            current_rows.append(row)
+        header_positions = np.flatnonzero((df.iloc[:, 1] == "Header").to_numpy())
+        boundaries = np.append(header_positions, len(df))
 
-        if current_section and current_rows:
-            sections.append((current_section, pd.DataFrame(current_rows)))
+        sections = []
+        for start, end in zip(boundaries[:-1], boundaries[1:]):
+            section_name = df.iat[start, 0]
+            if section_name:
+                sections.append((section_name, df.iloc[start:end]))
 
         return sections
 
+    def _stream_sections(self, file_path: str) -> Iterator[tuple[str, pd.DataFrame]]:
+        """Read only the sections that have a parser, one at a time"""
+        streamed = CSVPreprocessor.stream_sections(
+            file_path,
+            accept_section=lambda section_name: self._find_parser(section_name) is not None
+        )
+        while True:
+            # Reading is timed separately from the parsing that happens between the yields
+            with span('read_sections'):
+                section = next(streamed, None)
+                if section is None:
+                    return
+                section_name, header, rows = section
+                section_df = pd.DataFrame([header] + rows)
+            yield section_name, section_df
+
+    def _resolve_rates(self, sections: Iterable[tuple[str, pd.DataFrame]]) -> Optional[RateProviderProtocol]:
+        """
+        Plan the rates the sections need, then resolve them in one batched pass.
+        Returns the rate table the parsers compute from, or None when there is
+        no rate service or resolving fails; the parsers then look rates up one
+        by one.
+        """
+        if not self.evds_service:
+            return None
+
+        with span('plan_rates'):
+            requirements = RateRequirements()
+            for section_name, section_df in sections:
+                parser = self._find_parser(section_name)
+                if parser:
+                    parser.collect_rate_requirements(section_df, requirements)
+
+        try:
+            with span('resolve_rates'):
+                return self.evds_service.resolve_rates(requirements)
+        except Exception as e:
+            self.logger.log_error(f"Rate resolution failed: {str(e)}")
+            return None
+
     def _find_parser(self, section_name: str) -> ParserProtocol:
         return next(
             (p for p in self.parsers if p.can_parse(section_name)),
             None
         )
-
-    def _update_totals(self, section_name: str, data: List[Any]) -> None:
-        for item in data:
-            category = self._get_category(section_name, item)
-            if category in self.totals:
-                self.totals[category]['USD'] += item.amount_usd
-                self.totals[category]['TL'] += item.taxable_amount_tl
-
-    def _get_category(self, section_name: str, item: Any) -> str:
-        if section_name == "Trades":
-            return "Opsiyon" if item.is_option else "Hisse Senedi"
-        elif section_name == "Dividends":
-            return "Temettü"
-        elif section_name == "Withholding Tax":
-            return "Stopaj"
-        elif section_name == "Fees":
-            return "Ücretler"
-        return ""
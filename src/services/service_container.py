@@ -0,0 +1,63 @@
+import os
+import threading
+
+from databases.database import Database
+from databases.database_factory import DatabaseFactory
+from parsers.dividend_parser import DividendParser
+from parsers.fee_parser import FeeParser
+from parsers.trade_parser import TradeParser
+from parsers.withholding_tax_parser import WithholdingTaxParser
+from protocols.parser_protocol import ParserProtocol
+from protocols.report_writer_protocol import ReportWriterProtocol
+from services.evds_service import EvdsService
+from services.report_service import ReportService
+from typing import Callable, List, Optional
+
+
+class ServiceContainer:
+    """
+    Application-scoped services shared by all requests of a worker process:
+    the pooled MongoDB client, the EVDS client and the stateless parsers.
+
+    The container is built lazily on first use, so every forked worker opens
+    its own connections. Per-request state (totals, the report writer) lives in
+    the ReportService created by create_report_service.
+    """
+    _instance: Optional['ServiceContainer'] = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'ServiceContainer':
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = ServiceContainer()
+        return cls._instance
+
+    @classmethod
+    def reset(cls) -> None:
+        """Drop the container, e.g. in a forked child that must not reuse the parent's sockets"""
+        cls._instance = None
+        cls._instance_lock = threading.Lock()
+
+    def __init__(self, database: Database = None):
+        self.database = database or DatabaseFactory.get_database()
+        self.database.ensure_indexes()
+        self.evds_service = EvdsService(self.database)
+        self.parsers: List[ParserProtocol] = [
+            TradeParser(self.evds_service),
+            FeeParser(self.evds_service),
+            DividendParser(self.evds_service),
+            WithholdingTaxParser(self.evds_service),
+        ]
+
+    def create_report_service(
+        self,
+        writer: ReportWriterProtocol,
+        on_progress: Callable[[int, Optional[int]], None] = None
+    ) -> ReportService:
+        return ReportService(self.parsers, writer, self.evds_service, on_progress=on_progress)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=ServiceContainer.reset)
@@ -0,0 +1,91 @@
+from decimal import Decimal
+from models.trade_store import TradeStore
+from typing import Any, Dict, Iterable, Optional
+
+# Summary categories, in the order of the report
+CATEGORIES = ('Hisse Senedi', 'Opsiyon', 'Temettü', 'Stopaj', 'Ücretler')
+
+# Category of the items of each section; trades go to 'Opsiyon' or 'Hisse Senedi'
+SECTION_CATEGORIES = {
+    'Dividends': 'Temettü',
+    'Withholding Tax': 'Stopaj',
+    'Fees': 'Ücretler'
+}
+
+
+class SectionTotals:
+    """
+    Totals of one written section, for its TOPLAM row. Each item added also
+    goes to the total of its category. USD, TL and taxable amounts are added
+    in row order; like sum() over the items, None and zero values are left
+    out of the section totals.
+    """
+    __slots__ = ('usd', 'tl', 'taxable', '_categories', '_category', '_is_trades')
+
+    def __init__(self, section_name: str, categories: Dict[str, Dict[str, Decimal]]):
+        self.usd = 0
+        self.tl = 0
+        self.taxable = 0
+        self._categories = categories
+        self._category = categories.get(SECTION_CATEGORIES.get(section_name))
+        self._is_trades = section_name == "Trades"
+
+    def add(self, item: Any) -> None:
+        amount_usd, amount_tl, taxable_amount_tl = item.amount_usd, item.amount_tl, item.taxable_amount_tl
+        if amount_usd:
+            self.usd += amount_usd
+        if amount_tl:
+            self.tl += amount_tl
+        if taxable_amount_tl:
+            self.taxable += taxable_amount_tl
+
+        if self._is_trades:
+            category = self._categories["Opsiyon" if item.is_option else "Hisse Senedi"]
+        else:
+            category = self._category
+        if category is not None:
+            category['USD'] += amount_usd
+            category['TL'] += taxable_amount_tl
+
+    def add_all(self, data: Iterable[Any]) -> None:
+        """Add a whole section; a TradeStore is added column by column"""
+        if not isinstance(data, TradeStore):
+            for item in data:
+                self.add(item)
+            return
+
+        self.usd = data.total('amount_usd', skip_empty=True, start=self.usd)
+        self.tl = data.total('amount_tl', skip_empty=True, start=self.tl)
+        self.taxable = data.total('taxable_amount_tl', skip_empty=True, start=self.taxable)
+        for name, mask in (("Opsiyon", data.is_option), ("Hisse Senedi", ~data.is_option)):
+            category = self._categories[name]
+            category['USD'] = data.total('amount_usd', mask, start=category['USD'])
+            category['TL'] = data.total('taxable_amount_tl', mask, start=category['TL'])
+
+
+class TotalsAccumulator:
+    """
+    Section and category totals of a report, collected by the writer in the
+    loop that writes the rows, so every item is read once. categories holds
+    the running USD and TL totals of each summary category.
+    """
+
+    def __init__(self):
+        self.categories: Dict[str, Dict[str, Decimal]] = {
+            category: {'USD': Decimal('0'), 'TL': Decimal('0')} for category in CATEGORIES
+        }
+        self._grand_totals: Optional[Dict[str, Decimal]] = None
+
+    def section(self, section_name: str) -> SectionTotals:
+        """Totals of a section that is about to be written"""
+        self._grand_totals = None
+        return SectionTotals(section_name, self.categories)
+
+    def grand_totals(self) -> Dict[str, Decimal]:
+        """USD and TL totals of all categories, summed once the sections are written"""
+        if self._grand_totals is None:
+            self._grand_totals = {
+                'USD': sum(amounts['USD'] for amounts in self.categories.values()),
+                'TL': sum(amounts['TL'] for amounts in self.categories.values())
+            }
+        return self._grand_totals
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import numpy as np
+
+from concurrent.futures import Future
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from utils.config import NEGATIVE_CACHE_TTL_SECONDS
+
+
+def month_ordinal(date: datetime) -> int:
+    """Months since year 0, so that consecutive months differ by one"""
+    return date.year * 12 + date.month - 1
+
+
+def month_start(month: int) -> datetime:
+    """First day of the month with the given ordinal"""
+    year, month_index = divmod(month, 12)
+    return datetime(year, month_index + 1, 1)
+
+
+class YiufeRateMatrix:
+    """
+    Memoized YI-ÜFE increase rates keyed by (buy month, sell month).
+
+    The index used for a trade depends only on the month of the trade:
+    index_date maps the first day of a month to the date whose index applies.
+    That index is resolved once per month through resolve_index and kept in a
+    month-indexed array; the increase rate of every (buy month, sell month)
+    pair is computed once and memoized. Months without a published index are
+    retried after NEGATIVE_CACHE_TTL_SECONDS.
+
+    The lock only guards the arrays and the memo: an index is resolved outside
+    of it, and threads asking for a month that is being resolved wait for the
+    future of that month instead of resolving it again.
+    """
+
+    def __init__(
+        self,
+        index_date: Callable[[datetime], datetime],
+        resolve_index: Callable[[datetime], Optional[Decimal]],
+        warn: Callable[[str], None]
+    ):
+        self._index_date = index_date
+        self._resolve_index = resolve_index
+        self._warn = warn
+        self._first_month: Optional[int] = None
+        self._indices: List[Optional[Decimal]] = []
+        self._loaded: List[bool] = []
+        self._missing_until: Dict[int, float] = {}
+        self._rates: Dict[Tuple[int, int], Optional[Decimal]] = {}
+        self._resolving: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+
+    def index(self, month: int) -> Optional[Decimal]:
+        """YI-ÜFE index used for trades made in the given month"""
+        with self._lock:
+            position = self._position(month)
+            if self._loaded[position] and not self._is_expired(month):
+                return self._indices[position]
+
+            future = self._resolving.get(month)
+            resolving = future is None
+            if resolving:
+                future = self._resolving[month] = Future()
+
+        if not resolving:
+            return future.result()
+
+        try:
+            index = self._resolve_index(self._index_date(month_start(month)))
+        except BaseException as e:
+            with self._lock:
+                del self._resolving[month]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            position = self._position(month)
+            self._indices[position] = index
+            self._loaded[position] = True
+            del self._resolving[month]
+
+            if index is None:
+                self._missing_until[month] = time.monotonic() + NEGATIVE_CACHE_TTL_SECONDS
+            else:
+                self._missing_until.pop(month, None)
+
+            # Rates that used the old value must be recomputed
+            for pair in [pair for pair in self._rates if month in pair]:
+                del self._rates[pair]
+
+        future.set_result(index)
+        return index
+
+    def rate(self, buy_month: int, sell_month: int) -> Optional[Decimal]:
+        """YI-ÜFE increase (%) between the indices of the buy and sell months"""
+        pair = (buy_month, sell_month)
+        buy_index = self.index(buy_month)
+        sell_index = self.index(sell_month)
+        with self._lock:
+            if pair not in self._rates:
+                self._rates[pair] = self._calculate_rate(buy_month, sell_month, buy_index, sell_index)
+            return self._rates[pair]
+
+    def rates(self, buy_months: Sequence[int], sell_months: Sequence[int]) -> List[Optional[Decimal]]:
+        """Rates for whole arrays of buy and sell months, computing each distinct pair once"""
+        buy_months = np.asarray(buy_months, dtype=np.int64)
+        sell_months = np.asarray(sell_months, dtype=np.int64)
+        if buy_months.size == 0:
+            return []
+
+        pairs, inverse = np.unique(np.stack([buy_months, sell_months], axis=1), axis=0, return_inverse=True)
+        unique_rates = [self.rate(int(buy), int(sell)) for buy, sell in pairs]
+        return [unique_rates[position] for position in inverse.reshape(-1).tolist()]
+
+    def _calculate_rate(self, buy_month: int, sell_month: int,
+                        buy_index: Optional[Decimal], sell_index: Optional[Decimal]) -> Optional[Decimal]:
+        if buy_index is None or sell_index is None:
+            self._warn(f"Could not calculate YI-ÜFE rate for period "
+                       f"{self._index_date(month_start(buy_month))} - {self._index_date(month_start(sell_month))}")
+            return None
+
+        # Calculate increase rate
+        increase_rate = ((sell_index - buy_index) / buy_index) * 100
+        return Decimal(str(increase_rate))
+
+    def _is_expired(self, month: int) -> bool:
+        missing_until = self._missing_until.get(month)
+        return missing_until is not None and missing_until <= time.monotonic()
+
+    def _position(self, month: int) -> int:
+        """Position of the month in the arrays, growing them to cover it"""
+        if self._first_month is None:
+            self._first_month = month
+
+        if month < self._first_month:
+            padding = self._first_month - month
+            self._indices[:0] = [None] * padding
+            self._loaded[:0] = [False] * padding
+            self._first_month = month
+
+        position = month - self._first_month
+        if position >= len(self._indices):
+            padding = position + 1 - len(self._indices)
+            self._indices.extend([None] * padding)
+            self._loaded.extend([False] * padding)
+
+        return position
@@ -0,0 +1,133 @@
+import threading
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional, Set, Union
+
+# Official holidays on fixed dates (month, day)
+FIXED_HOLIDAYS = [
+    (1, 1),    # Yılbaşı
+    (4, 23),   # Ulusal Egemenlik ve Çocuk Bayramı
+    (5, 1),    # Emek ve Dayanışma Günü
+    (5, 19),   # Atatürk'ü Anma, Gençlik ve Spor Bayramı
+    (8, 30),   # Zafer Bayramı
+    (10, 29),  # Cumhuriyet Bayramı
+]
+
+# Demokrasi ve Milli Birlik Günü is an official holiday since 2017
+JULY_15_FIRST_YEAR = 2017
+
+# First days of the religious holidays, which move with the lunar calendar
+RAMAZAN_BAYRAMI = {
+    2015: date(2015, 7, 17), 2016: date(2016, 7, 5), 2017: date(2017, 6, 25),
+    2018: date(2018, 6, 15), 2019: date(2019, 6, 4), 2020: date(2020, 5, 24),
+    2021: date(2021, 5, 13), 2022: date(2022, 5, 2), 2023: date(2023, 4, 21),
+    2024: date(2024, 4, 10), 2025: date(2025, 3, 30), 2026: date(2026, 3, 20),
+    2027: date(2027, 3, 9), 2028: date(2028, 2, 26), 2029: date(2029, 2, 14),
+    2030: date(2030, 2, 4),
+}
+RAMAZAN_BAYRAMI_DAYS = 3
+
+KURBAN_BAYRAMI = {
+    2015: date(2015, 9, 24), 2016: date(2016, 9, 12), 2017: date(2017, 9, 1),
+    2018: date(2018, 8, 21), 2019: date(2019, 8, 11), 2020: date(2020, 7, 31),
+    2021: date(2021, 7, 20), 2022: date(2022, 7, 9), 2023: date(2023, 6, 28),
+    2024: date(2024, 6, 16), 2025: date(2025, 6, 6), 2026: date(2026, 5, 27),
+    2027: date(2027, 5, 16), 2028: date(2028, 5, 5), 2029: date(2029, 4, 24),
+    2030: date(2030, 4, 13),
+}
+KURBAN_BAYRAMI_DAYS = 4
+
+DateLike = Union[date, datetime]
+
+
+def _as_date(value: DateLike) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+class TurkishBusinessCalendar:
+    """
+    Turkish business days: weekends and official holidays are closed. Half days
+    (arife, 28 October) count as business days since TCMB still publishes rates.
+
+    The calendar only predicts which dates have a published rate. Observed
+    EVDS data stays authoritative, see build_resolution_table.
+
+    Holidays are added a year at a time, under a lock; a year counts as loaded
+    only once all its holidays are in, so threads sharing the calendar never
+    see a year without its holidays.
+    """
+
+    def __init__(self, extra_holidays: Iterable[date] = ()):
+        self._holidays: Set[date] = set(extra_holidays)
+        self._years: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def is_holiday(self, day: DateLike) -> bool:
+        day = _as_date(day)
+        if day.year not in self._years:
+            self._add_year(day.year)
+        return day in self._holidays
+
+    def is_business_day(self, day: DateLike) -> bool:
+        day = _as_date(day)
+        return day.weekday() < 5 and not self.is_holiday(day)
+
+    def next_business_day(self, day: DateLike) -> date:
+        """Returns the given day if it is a business day, otherwise the first one after it"""
+        day = _as_date(day)
+        while not self.is_business_day(day):
+            day += timedelta(days=1)
+        return day
+
+    def add_business_days(self, day: DateLike, count: int) -> date:
+        """Returns the business day that comes count business days after the given day"""
+        day = _as_date(day)
+        while count > 0:
+            day = self.next_business_day(day + timedelta(days=1))
+            count -= 1
+        return day
+
+    def _add_year(self, year: int) -> None:
+        with self._lock:
+            if year in self._years:
+                return
+
+            holidays = {date(year, month, day) for month, day in FIXED_HOLIDAYS}
+            if year >= JULY_15_FIRST_YEAR:
+                holidays.add(date(year, 7, 15))
+
+            for first_days, length in ((RAMAZAN_BAYRAMI, RAMAZAN_BAYRAMI_DAYS), (KURBAN_BAYRAMI, KURBAN_BAYRAMI_DAYS)):
+                first_day = first_days.get(year)
+                if first_day:
+                    holidays.update(first_day + timedelta(days=i) for i in range(length))
+
+            self._holidays.update(holidays)
+            # Last, so other threads only see the year once its holidays are in
+            self._years.add(year)
+
+
+def build_resolution_table(published: Iterable[DateLike], start: DateLike, end: DateLike) -> Dict[date, date]:
+    """
+    Maps every calendar date between start and end to its effective rate date:
+    the first date on or after it that has a published value. Dates with no
+    published value up to the last published date are left out.
+    """
+    published_dates = sorted({_as_date(day) for day in published})
+    start, end = _as_date(start), _as_date(end)
+
+    table: Dict[date, date] = {}
+    effective: Optional[date] = None
+    remaining = iter(reversed(published_dates))
+    candidate = next(remaining, None)
+
+    # Walk backwards so every day knows the next published date
+    day = end
+    while day >= start:
+        while candidate is not None and candidate >= day:
+            effective = candidate
+            candidate = next(remaining, None)
+        if effective is not None:
+            table[day] = effective
+        day -= timedelta(days=1)
+
+    return table
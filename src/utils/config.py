@@ -5,6 +5,62 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 # Define paths
 OUTPUT_DIR = BASE_DIR / 'output'
-TEMP_PATH = OUTPUT_DIR / 'temp_uploaded_file.csv'
-REPORT_PATH = OUTPUT_DIR / 'vergi_hesaplama_raporu.csv'
+TEMP_NAME = 'temp_uploaded_file.csv'
 REPORT_NAME = 'vergi_hesaplama_raporu.csv'
+
+# Every upload gets its own directory under REPORTS_DIR, named by its report id,
+# holding the uploaded file and the generated report
+REPORTS_DIR = OUTPUT_DIR / 'reports'
+
+# Report directories older than this are deleted when new uploads arrive
+REPORT_RETENTION_SECONDS = 24 * 60 * 60
+
+# Maximum number of entries per series kept in the in-process rate cache
+RATE_CACHE_MAX_SIZE = 20000
+
+# Connections kept open by the shared MongoDB client of each worker process
+MONGODB_MAX_POOL_SIZE = 20
+
+# How ReportService reads statements: 'pandas' loads the whole file into a
+# DataFrame, 'stream' reads it section by section
+REPORT_ENGINE = 'pandas'
+
+# Threads parsing the sections of a statement at the same time; 1 parses them
+# one after another. Parsing holds the GIL, so more threads only help while
+# rate lookups wait on the network; raise it to opt in to the pool
+REPORT_PARSE_WORKERS = 1
+
+# Parse trades into a columnar TradeStore; totals are then computed on whole
+# columns and Trade objects are only created while the report is written
+REPORT_TRADE_STORE = True
+
+# How long a date or month without published data is remembered as missing
+NEGATIVE_CACHE_TTL_SECONDS = 6 * 60 * 60
+
+# Report jobs: directory of per-job files, worker processes, and how many
+# finished jobs are kept for status polling
+JOBS_DIR = OUTPUT_DIR / 'jobs'
+REPORT_JOB_WORKERS = 2
+REPORT_JOB_HISTORY = 100
+
+# Finished reports are cached by upload hash; bump RATE_DATA_VERSION when the
+# stored rates or the calculation change, so cached results are not reused
+REPORT_CACHE_DIR = OUTPUT_DIR / 'report_cache'
+REPORT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+RATE_DATA_VERSION = 1
+
+# Rate store and rate source; both can be overridden with environment variables
+# of the same name. 'memory' and 'fake' run fully offline (see rate_sources/)
+DATABASE = 'mongoDB'
+RATE_SOURCE = 'evds'
+RATE_SOURCE_FIXTURE = None
+RATE_SOURCE_LATENCY_SECONDS = 0.0
+RATE_SOURCE_FAILURE_RATE = 0.0
+
+# Log files are rotated at LOG_MAX_BYTES, keeping LOG_BACKUP_COUNT old files.
+# Pending entries are written at least every LOG_FLUSH_INTERVAL_SECONDS, and a
+# warning repeated within LOG_DEDUP_WINDOW_SECONDS is written once with a count
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+LOG_FLUSH_INTERVAL_SECONDS = 0.5
+LOG_DEDUP_WINDOW_SECONDS = 60
@@ -1,6 +1,6 @@
 import pandas as pd
 import csv
-from typing import List
+from typing import Callable, Iterator, List, Optional, Tuple
 
 
 class CSVPreprocessor:
@@ -21,12 +21,61 @@ class CSVPreprocessor:
         with open(input_path, 'r', encoding='utf-8') as file:
             csv_reader = csv.reader(file)
             for row in csv_reader:
-                # Satırı istenen uzunluğa getir
-                if len(row) < expected_columns:
-                    row.extend([''] * (expected_columns - len(row)))
-                elif len(row) > expected_columns:
-                    row = row[:expected_columns]
-                rows.append(row)
+                rows.append(CSVPreprocessor._fit_row(row, expected_columns))
 
         # DataFrame'e çevir
         return pd.DataFrame(rows)
+
+    @staticmethod
+    def stream_sections(
+        input_path: str,
+        accept_section: Optional[Callable[[str], bool]] = None,
+        expected_columns: int = 17
+    ) -> Iterator[Tuple[str, List[str], List[List[str]]]]:
+        """
+        Reads the CSV file in a single pass and yields its sections one by one.
+
+        A section starts at every header row and holds the rows up to the next
+        header. Rows of sections rejected by accept_section are skipped while
+        reading, so at most one section is kept in memory.
+
+        Args:
+            input_path: Path to the CSV file to be processed
+            accept_section: Returns whether a section with the given name is needed (default: all)
+            expected_columns: Expected number of columns (default: 17)
+
+        Yields:
+            tuple: (section_name, header, rows)
+        """
+        section_name = None
+        header: List[str] = []
+        rows: List[List[str]] = []
+        keep = False
+
+        with open(input_path, 'r', encoding='utf-8') as file:
+            for row in csv.reader(file):
+                row = CSVPreprocessor._fit_row(row, expected_columns)
+
+                if row[1] == "Header":
+                    if keep:
+                        yield section_name, header, rows
+
+                    section_name = row[0]
+                    header = row
+                    rows = []
+                    keep = bool(section_name) and (accept_section is None or accept_section(section_name))
+                elif keep:
+                    rows.append(row)
+
+        if keep:
+            yield section_name, header, rows
+
+    @staticmethod
+    def _fit_row(row: List[str], expected_columns: int) -> List[str]:
+        """Pads or truncates the row to the expected number of columns"""
+        # Satırı istenen uzunluğa getir
+        if len(row) < expected_columns:
+            row.extend([''] * (expected_columns - len(row)))
+        elif len(row) > expected_columns:
+            row = row[:expected_columns]
+        return row
@@ -0,0 +1,102 @@
+"""
+Lightweight per-report timing spans and counters.
+
+ReportService.process_report opens a collection with collect(); code running
+inside it (in the same thread, or in threads that copy the context) records
+timings with span() and events with count(). Outside a collection both are
+no-ops, so services can be instrumented without knowing who calls them.
+Spans nest: a parser span includes the rate lookups made while parsing.
+"""
+import threading
+import time
+
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+_current: ContextVar[Optional['Diagnostics']] = ContextVar('diagnostics', default=None)
+
+
+class Diagnostics:
+    def __init__(self):
+        self.spans: Dict[str, float] = {}
+        self.span_counts: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+        self.started_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_time(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+            self.span_counts[name] = self.span_counts.get(name, 0) + 1
+
+    def add_count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'total_seconds': round(time.perf_counter() - self.started_at, 6),
+                'spans': {name: {'seconds': round(seconds, 6), 'count': self.span_counts[name]}
+                          for name, seconds in self.spans.items()},
+                'counters': dict(self.counters)
+            }
+
+
+class _Span:
+    __slots__ = ('diagnostics', 'name', 'started_at')
+
+    def __init__(self, diagnostics: Diagnostics, name: str):
+        self.diagnostics = diagnostics
+        self.name = name
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.diagnostics.add_time(self.name, time.perf_counter() - self.started_at)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _Collection:
+    def __init__(self):
+        self.diagnostics = Diagnostics()
+
+    def __enter__(self) -> Diagnostics:
+        self._token = _current.set(self.diagnostics)
+        return self.diagnostics
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _current.reset(self._token)
+        return False
+
+
+def collect() -> _Collection:
+    """Collect the spans and counters recorded until the block ends"""
+    return _Collection()
+
+
+def span(name: str):
+    """Add the time spent in the block to the span of the given name"""
+    diagnostics = _current.get()
+    return _Span(diagnostics, name) if diagnostics is not None else _NO_SPAN
+
+
+def count(name: str, amount: int = 1) -> None:
+    diagnostics = _current.get()
+    if diagnostics is not None:
+        diagnostics.add_count(name, amount)
@@ -1,5 +1,14 @@
 import os
+import re
 import shutil
+import time
+import uuid
+
+from pathlib import Path
+from typing import Optional, Tuple
+
+# Report ids are uuid4 hex strings; anything else never names a directory
+REPORT_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
 
 
 class FileManager:
@@ -29,3 +38,30 @@ class FileManager:
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(content)
         return file_path
+
+    def create_report_directory(self, base_dir) -> Tuple[str, Path]:
+        """Create a directory with a new unique report id under base_dir"""
+        report_id = uuid.uuid4().hex
+        report_dir = Path(base_dir) / report_id
+        report_dir.mkdir(parents=True)
+        return report_id, report_dir
+
+    def get_report_directory(self, base_dir, report_id: str) -> Optional[Path]:
+        """Directory of an existing report, or None for unknown or malformed ids"""
+        if not REPORT_ID_PATTERN.match(report_id):
+            return None
+        report_dir = Path(base_dir) / report_id
+        return report_dir if report_dir.is_dir() else None
+
+    def remove_stale_directories(self, dir_path, max_age_seconds: float):
+        """Delete the subdirectories of dir_path that were not modified for max_age_seconds"""
+        if not os.path.exists(dir_path):
+            return
+
+        threshold = time.time() - max_age_seconds
+        for entry in os.scandir(dir_path):
+            try:
+                if entry.is_dir() and entry.stat().st_mtime < threshold:
+                    shutil.rmtree(entry.path)
+            except Exception as e:
+                print(f'Failed to delete {entry.path}. Reason: {e}')
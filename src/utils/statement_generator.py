@@ -0,0 +1,190 @@
+"""
+Seeded generator of synthetic IBKR activity statements.
+
+The statements follow the layout the parsers read: stock and option trades as
+Order / Trade / ClosedLot rows (with a few Forex trades that are skipped),
+dividends, withholding taxes and fees, framed by the sections a real
+statement starts and ends with. The same seed always produces the same file.
+
+Usage:
+    PYTHONPATH=src python -m utils.statement_generator output.csv --rows 100000 [--seed 42]
+"""
+import argparse
+import csv
+import random
+
+from datetime import date, timedelta
+from typing import Iterator, List
+
+TRADES_HEADER = ['Trades', 'Header', 'DataDiscriminator', 'Asset Category', 'Currency', 'Symbol', 'Date/Time',
+                 'Exchange', 'Quantity', 'T. Price', 'Proceeds', 'Comm/Fee', 'Basis', 'Realized P/L', 'Code']
+DIVIDENDS_HEADER = ['Dividends', 'Header', 'Currency', 'Date', 'Description', 'Amount']
+WITHHOLDING_TAX_HEADER = ['Withholding Tax', 'Header', 'Currency', 'Date', 'Description', 'Amount', 'Code']
+FEES_HEADER = ['Fees', 'Header', 'Subtitle', 'Currency', 'Date', 'Description', 'Amount']
+
+SYMBOLS = {
+    'AAPL': 'US0378331005', 'MSFT': 'US5949181045', 'NVDA': 'US67066G1040', 'TSLA': 'US88160R1014',
+    'AMD': 'US0079031078', 'AMZN': 'US0231351067', 'GOOGL': 'US02079K3059', 'META': 'US30303M1027',
+    'SPY': 'US78462F1030', 'QQQ': 'US46090E1038',
+}
+EXCHANGES = ['NASDAQ', 'NYSE', 'ARCA', 'IBKRATS', 'CBOE']
+
+# Share of the requested rows that goes to each kind of section
+DIVIDEND_SHARE = 0.05
+WITHHOLDING_TAX_SHARE = 0.05
+FEE_SHARE = 0.02
+
+# Rows that are not part of the generated sections (statement info, totals, open positions)
+FRAME_ROWS = 16
+
+
+class StatementGenerator:
+    """
+    Writes statements of roughly the requested number of rows. Trades take
+    most of the rows; an average trade uses four of them (Order, Trade and
+    one to three ClosedLots).
+    """
+
+    def __init__(self, seed: int = 42, start: date = date(2021, 1, 4), days: int = 3 * 365):
+        self.seed = seed
+        self.start = start
+        self.days = days
+
+    def write(self, path: str, rows: int) -> int:
+        """Write a statement of about the given number of rows and return the exact count"""
+        count = 0
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            for row in self.rows(rows):
+                writer.writerow(row)
+                count += 1
+        return count
+
+    def rows(self, rows: int) -> Iterator[List[str]]:
+        """Statement rows, generated lazily so that million-row files need little memory"""
+        rng = random.Random(self.seed)
+        body = max(rows - FRAME_ROWS, 0)
+        dividends = int(body * DIVIDEND_SHARE)
+        withholding_taxes = int(body * WITHHOLDING_TAX_SHARE)
+        fees = int(body * FEE_SHARE)
+        trade_rows = body - dividends - withholding_taxes - fees
+
+        yield ['Statement', 'Header', 'Field Name', 'Field Value']
+        yield ['Statement', 'Data', 'BrokerName', 'Interactive Brokers LLC']
+        yield ['Statement', 'Data', 'Title', 'Activity Statement']
+        yield ['Statement', 'Data', 'Period', f"{self.start:%B %d, %Y} - {self._end:%B %d, %Y}"]
+        yield ['Account Information', 'Header', 'Field Name', 'Field Value']
+        yield ['Account Information', 'Data', 'Name', 'Synthetic Account']
+        yield ['Account Information', 'Data', 'Base Currency', 'USD']
+
+        yield from self._trades(rng, trade_rows)
+        yield from self._dividends(rng, dividends)
+        yield from self._withholding_taxes(rng, withholding_taxes)
+        yield from self._fees(rng, fees)
+
+        yield ['Open Positions', 'Header', 'DataDiscriminator', 'Asset Category', 'Currency', 'Symbol', 'Quantity']
+        yield ['Open Positions', 'Data', 'Summary', 'Stocks', 'USD', 'AAPL', '10']
+
+    @property
+    def _end(self) -> date:
+        return self.start + timedelta(days=self.days)
+
+    def _date(self, rng: random.Random) -> date:
+        return self.start + timedelta(days=rng.randrange(self.days))
+
+    def _trades(self, rng: random.Random, rows: int) -> Iterator[List[str]]:
+        # Stocks take most trades, options a quarter, Forex a handful
+        categories = [('Stocks', int(rows * 0.73)), ('Equity and Index Options', int(rows * 0.25))]
+        categories.append(('Forex', rows - sum(count for _, count in categories)))
+
+        for category, category_rows in categories:
+            yield TRADES_HEADER
+            written = 1
+            while written < category_rows - 1:
+                trade_rows = list(self._trade(rng, category))
+                yield from trade_rows
+                written += len(trade_rows)
+            yield ['Trades', 'SubTotal', '', category, 'USD', '', '', '', '', '', '0', '0', '0', '0', '']
+
+        yield ['Trades', 'Total', '', '', '', '', '', '', '', '', '0', '0', '0', '0', '']
+
+    def _trade(self, rng: random.Random, category: str) -> Iterator[List[str]]:
+        symbol = rng.choice(list(SYMBOLS))
+        if category == 'Equity and Index Options':
+            expiry = self._date(rng)
+            symbol = f"{symbol} {expiry:%d%b%y}".upper() + f" {rng.randrange(50, 600, 5)} {rng.choice('CP')}"
+        elif category == 'Forex':
+            symbol = 'USD.TRY'
+
+        sell_date = self._date(rng)
+        is_short = rng.random() < 0.1
+        sign = 1 if is_short else -1
+        lots = []
+        for _ in range(rng.choice([1, 1, 2, 3])):
+            if category == 'Stocks' and rng.random() < 0.2:
+                quantity = f"{rng.uniform(0.1, 20):.4f}"  # Fractional shares
+            else:
+                quantity = str(rng.randint(1, 100))
+            buy_date = sell_date - timedelta(days=rng.randrange(1, 720))
+            lots.append((quantity, buy_date, f"{rng.uniform(1, 500):.{rng.choice([2, 4])}f}"))
+
+        total_quantity = sum(float(quantity) for quantity, _, _ in lots)
+        quantity = f"{sign * total_quantity:.4f}".rstrip('0').rstrip('.')
+        price = f"{rng.uniform(1, 600):.2f}"
+        proceeds = f"{-sign * total_quantity * float(price):.2f}"
+        commission = f"{-rng.uniform(0.35, 5):.{rng.choice([2, 6])}f}"
+        realized = f"{rng.uniform(-500, 800):.2f}"
+        timestamp = f"{sell_date:%Y-%m-%d}, {rng.randint(9, 15):02d}:{rng.randint(0, 59):02d}:00"
+        exchange = rng.choice(EXCHANGES)
+
+        yield ['Trades', 'Data', 'Order', category, 'USD', symbol, timestamp, '-', quantity, price,
+               proceeds, commission, '0', realized, 'C']
+        yield ['Trades', 'Data', 'Trade', category, 'USD', symbol, timestamp, exchange, quantity, price,
+               proceeds, commission, '0', realized, 'C']
+        for lot_quantity, buy_date, lot_price in lots:
+            basis = f"{float(lot_quantity) * float(lot_price):.2f}"
+            lot_realized = f"{rng.uniform(-100, 200):.2f}"
+            yield ['Trades', 'Data', 'ClosedLot', category, 'USD', symbol, f"{buy_date:%Y-%m-%d}", '',
+                   f"{-sign * float(lot_quantity):g}", lot_price, '', '', basis, lot_realized, 'LT' if rng.random() < 0.3 else 'ST']
+
+    def _dividends(self, rng: random.Random, rows: int) -> Iterator[List[str]]:
+        yield DIVIDENDS_HEADER
+        for _ in range(max(rows - 2, 0)):
+            symbol = rng.choice(list(SYMBOLS))
+            per_share = rng.choice(['0.24', '0.75', '0.22', '1.31'])
+            yield ['Dividends', 'Data', 'USD', f"{self._date(rng):%Y-%m-%d}",
+                   f"{symbol}({SYMBOLS[symbol]}) Cash Dividend USD {per_share} per Share (Ordinary Dividend)",
+                   f"{rng.uniform(0.5, 150):.2f}"]
+        yield ['Dividends', 'Data', 'Total', '', '', '0']
+
+    def _withholding_taxes(self, rng: random.Random, rows: int) -> Iterator[List[str]]:
+        yield WITHHOLDING_TAX_HEADER
+        for _ in range(max(rows - 2, 0)):
+            symbol = rng.choice(list(SYMBOLS))
+            yield ['Withholding Tax', 'Data', 'USD', f"{self._date(rng):%Y-%m-%d}",
+                   f"{symbol}({SYMBOLS[symbol]}) Cash Dividend USD 0.24 per Share - US Tax",
+                   f"{-rng.uniform(0.05, 22):.2f}", '']
+        yield ['Withholding Tax', 'Data', 'Total', '', '', '0', '']
+
+    def _fees(self, rng: random.Random, rows: int) -> Iterator[List[str]]:
+        yield FEES_HEADER
+        for _ in range(max(rows - 2, 0)):
+            symbol = rng.choice(list(SYMBOLS))
+            yield ['Fees', 'Data', 'Other Fees', 'USD', f"{self._date(rng):%Y-%m-%d}",
+                   f"{symbol}:Market data fee for {self._date(rng):%b %Y}", f"{-rng.uniform(0.5, 10):.2f}"]
+        yield ['Fees', 'Data', 'Total', '', '', '', '0']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic IBKR activity statement')
+    parser.add_argument('output', help='Path of the CSV file to write')
+    parser.add_argument('--rows', type=int, default=10_000, help='Approximate number of rows')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    count = StatementGenerator(seed=args.seed).write(args.output, args.rows)
+    print(f"Wrote {count} rows to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
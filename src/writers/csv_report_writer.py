@@ -1,7 +1,8 @@
 from typing import List, Any
-from decimal import Decimal
 import csv
+from models.trade_store import TradeStore
 from protocols.report_writer_protocol import ReportWriterProtocol
+from services.totals_accumulator import TotalsAccumulator
 
 
 class CSVReportWriter(ReportWriterProtocol):
@@ -20,7 +21,7 @@ class CSVReportWriter(ReportWriterProtocol):
         # for now, we don't need to write a main header
         pass
 
-    def write_section(self, section_name: str, data: List[Any]) -> None:
+    def write_section(self, section_name: str, data: List[Any], totals: TotalsAccumulator = None) -> None:
         if not data:
             return
 
@@ -28,36 +29,35 @@ class CSVReportWriter(ReportWriterProtocol):
         headers = self._get_section_headers(section_name)
         self.csv_writer.writerow(headers)
 
-        # Write data rows
-        for item in data:
-            self.csv_writer.writerow(item.to_csv_row())
+        # Write data rows, adding each item to the totals as it is written
+        section_totals = (totals or TotalsAccumulator()).section(section_name)
+        if isinstance(data, TradeStore):
+            # A TradeStore sums its columns without creating the rows again
+            self.csv_writer.writerows(item.to_csv_row() for item in data)
+            section_totals.add_all(data)
+        else:
+            add = section_totals.add
+            for item in data:
+                self.csv_writer.writerow(item.to_csv_row())
+                add(item)
 
         # Add section total for all sections
-        if data:
-            # Find indices for USD and TL columns
-            usd_index = headers.index("USD") if "USD" in headers else headers.index("USD K/Z")
-            tl_index = headers.index("TL") if "TL" in headers else headers.index("TL K/Z")
-
-            # Calculate totals
-            total_tl = sum(item.amount_tl for item in data if item.amount_tl)
-            total_usd = sum(item.amount_usd for item in data if item.amount_usd)
+        # Find indices for USD and TL columns
+        usd_index = headers.index("USD") if "USD" in headers else headers.index("USD K/Z")
+        tl_index = headers.index("TL") if "TL" in headers else headers.index("TL K/Z")
 
-            # Add taxable amount for Trades section
-            if section_name == "Trades":
-                taxable_index = headers.index("Vergiye Tabi Kazanç")
-                total_taxable = sum(item.taxable_amount_tl for item in data if item.taxable_amount_tl)
+        # Create total row with proper length
+        total_row = [""] * len(headers)
+        total_row[0] = "TOPLAM"
 
-            # Create total row with proper length
-            total_row = [""] * len(headers)
-            total_row[0] = "TOPLAM"
-
-            if section_name == "Trades":
-                total_row[taxable_index] = f"{total_taxable:.2f}"
+        # Add taxable amount for Trades section
+        if section_name == "Trades":
+            total_row[headers.index("Vergiye Tabi Kazanç")] = f"{section_totals.taxable:.2f}"
 
-            total_row[tl_index] = f"{total_tl:.2f}"
-            total_row[usd_index] = f"{total_usd:.2f}"
+        total_row[tl_index] = f"{section_totals.tl:.2f}"
+        total_row[usd_index] = f"{section_totals.usd:.2f}"
 
-            self.csv_writer.writerow(total_row)
+        self.csv_writer.writerow(total_row)
 
     def _get_section_headers(self, section_name: str) -> List[str]:
         if section_name == "Trades":
@@ -94,22 +94,22 @@ class CSVReportWriter(ReportWriterProtocol):
                 "Kategori"
             ]
 
-    def write_summary(self, totals: dict[str, dict[str, Decimal]]) -> None:
+    def write_summary(self, totals: TotalsAccumulator) -> None:
         self.csv_writer.writerow([])  # Empty row
         self.csv_writer.writerow(["Özet"])
         self.csv_writer.writerow(["Kategori", "USD", "TL"])
 
         # Write category totals
-        for category, amounts in totals.items():
+        for category, amounts in totals.categories.items():
             self.csv_writer.writerow([
                 category,
                 f"{amounts['USD']:.2f}",          # 2 decimals for USD
                 f"{amounts['TL']:.2f}"            # 2 decimals for TL
             ])
 
-        # Calculate grand totals
-        total_usd = sum(amounts['USD'] for amounts in totals.values())
-        total_try = sum(amounts['TL'] for amounts in totals.values())
+        # Grand totals
+        grand_totals = totals.grand_totals()
+        total_usd, total_try = grand_totals['USD'], grand_totals['TL']
 
         self.csv_writer.writerow([])  # Empty row
         self.csv_writer.writerow([
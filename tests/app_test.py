@@ -1,7 +1,13 @@
+import os
+import subprocess
+import sys
 import unittest
 
+from pathlib import Path
 from src.app import app
 
+ROOT = Path(__file__).resolve().parent.parent
+
 
 class AppTest(unittest.TestCase):
 
@@ -16,6 +22,14 @@ class AppTest(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn(b'<html>', response.data)  # Example check for HTML content
 
+    def test_import_defers_report_dependencies(self):
+        # A cold start must not import what only building a report needs
+        script = "import sys, app; print(sorted(m for m in ('pandas', 'pymongo', 'evds') if m in sys.modules))"
+        env = dict(os.environ, PYTHONPATH=str(ROOT / 'src'))
+        result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), '[]')
+
     def tearDown(self):
         # Clean up after each test if necessary
         pass
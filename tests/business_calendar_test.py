@@ -0,0 +1,69 @@
+import threading
+import time
+import unittest
+
+from datetime import date, datetime
+from utils.business_calendar import TurkishBusinessCalendar, build_resolution_table
+
+
+class TurkishBusinessCalendarTest(unittest.TestCase):
+
+    def setUp(self):
+        self.calendar = TurkishBusinessCalendar()
+
+    def test_weekends_and_official_holidays_are_closed(self):
+        self.assertFalse(self.calendar.is_business_day(date(2024, 1, 6)))    # Saturday
+        self.assertFalse(self.calendar.is_business_day(date(2024, 4, 23)))   # Fixed holiday
+        self.assertFalse(self.calendar.is_business_day(date(2024, 6, 18)))   # Kurban Bayramı
+        self.assertTrue(self.calendar.is_business_day(datetime(2024, 6, 20, 10, 30)))
+
+    def test_next_business_day_skips_long_holidays(self):
+        # Kurban Bayramı 2024 runs from Sunday 16 to Wednesday 19 June
+        self.assertEqual(self.calendar.next_business_day(date(2024, 6, 15)), date(2024, 6, 20))
+        self.assertEqual(self.calendar.next_business_day(date(2024, 6, 20)), date(2024, 6, 20))
+        self.assertEqual(self.calendar.add_business_days(date(2024, 6, 14), 1), date(2024, 6, 20))
+
+    def test_threads_never_see_a_year_without_its_holidays(self):
+        class SlowSet(set):
+            """Widens the time it takes to add the holidays of a year"""
+
+            def add(self, item):
+                time.sleep(0.001)
+                super().add(item)
+
+            def update(self, *others):
+                time.sleep(0.02)
+                super().update(*others)
+
+        self.calendar._holidays = SlowSet()
+        barrier = threading.Barrier(8)
+        results = []
+
+        def check():
+            barrier.wait()
+            results.append(self.calendar.is_holiday(date(2024, 6, 18)))
+
+        threads = [threading.Thread(target=check) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [True] * 8)
+
+
+class BuildResolutionTableTest(unittest.TestCase):
+
+    def test_maps_dates_to_next_published_date(self):
+        published = [date(2024, 1, 5), date(2024, 1, 8), date(2024, 1, 9)]
+
+        table = build_resolution_table(published, date(2024, 1, 4), date(2024, 1, 10))
+
+        self.assertEqual(table[date(2024, 1, 4)], date(2024, 1, 5))
+        self.assertEqual(table[date(2024, 1, 6)], date(2024, 1, 8))
+        self.assertEqual(table[date(2024, 1, 8)], date(2024, 1, 8))
+        self.assertNotIn(date(2024, 1, 10), table)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import contextvars
+import threading
+import unittest
+
+from utils.diagnostics import collect, count, span
+
+
+class DiagnosticsTest(unittest.TestCase):
+
+    def test_spans_and_counters_are_recorded_inside_a_collection(self):
+        count('ignored')
+        with collect() as diagnostics:
+            with span('parse'):
+                count('evds_calls')
+                count('evds_calls', 2)
+            with span('parse'):
+                pass
+        count('ignored')
+
+        result = diagnostics.to_dict()
+        self.assertEqual(result['counters'], {'evds_calls': 3})
+        self.assertEqual(result['spans']['parse']['count'], 2)
+        self.assertGreaterEqual(result['total_seconds'], result['spans']['parse']['seconds'])
+
+    def test_collections_do_not_leak_into_each_other(self):
+        with collect() as outer:
+            count('outer')
+            with collect() as inner:
+                count('inner')
+            count('outer')
+
+        self.assertEqual(outer.counters, {'outer': 2})
+        self.assertEqual(inner.counters, {'inner': 1})
+
+    def test_threads_that_copy_the_context_report_to_the_same_collection(self):
+        with collect() as diagnostics:
+            threads = [threading.Thread(target=contextvars.copy_context().run, args=(count, 'lookups'))
+                       for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(diagnostics.counters, {'lookups': 8})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+
+from databases.memory_db import MemoryDB
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from rate_sources.fake_rate_source import FakeRateSource
+from services.evds_service import DEFAULT_EXCHANGE_RATE, EvdsService
+from services.rate_cache_service import RateCacheService
+from services.rate_table import RateRequirements
+
+
+class EvdsServiceTest(unittest.TestCase):
+    """EvdsService against the local rate source and database, without network access"""
+
+    def setUp(self):
+        RateCacheService.get_instance().clear()
+        self.database = MemoryDB()
+        self.source = FakeRateSource(published_until=date(2024, 6, 30))
+        self.service = EvdsService(self.database, self.source)
+
+    def test_weekend_uses_the_next_business_day(self):
+        monday = self.service.get_exchange_rate(datetime(2024, 3, 4))
+        saturday = self.service.get_exchange_rate(datetime(2024, 3, 2))
+
+        self.assertEqual(saturday, monday)
+        self.assertEqual(self.database.get_exchange_rate('02-03-2024'), float(monday))
+
+    def test_resolve_rates_needs_one_call_and_stores_the_rates(self):
+        requirements = RateRequirements()
+        requirements.add_exchange_dates(date(2024, 1, 1) + timedelta(days=i) for i in range(91))
+        self.service.resolve_rates(requirements)
+        calls = self.source.calls
+
+        rate = self.service.get_exchange_rate(datetime(2024, 2, 15))
+
+        self.assertEqual(calls, 1)
+        self.assertEqual(self.source.calls, calls)
+        self.assertEqual(rate, Decimal(str(self.database.get_exchange_rate('15-02-2024'))))
+
+    def test_unpublished_dates_are_remembered_as_missing(self):
+        self.assertEqual(self.service.get_exchange_rate(datetime(2024, 8, 1)), DEFAULT_EXCHANGE_RATE)
+        calls = self.source.calls
+
+        self.assertEqual(self.service.get_exchange_rate(datetime(2024, 8, 1)), DEFAULT_EXCHANGE_RATE)
+        self.assertEqual(self.source.calls, calls)
+        self.assertTrue(self.database.is_rate_missing('exchange_rate', '01-08-2024'))
+
+    def test_failed_calls_are_not_remembered_as_missing(self):
+        self.source.failure_rate = 1.0
+        requirements = RateRequirements()
+        requirements.add_exchange_dates([date(2024, 3, 4), date(2024, 3, 5)])
+        requirements.add_yiufe_dates([date(2024, 3, 4)])
+
+        table = self.service.resolve_rates(requirements)
+        with self.assertRaises(ValueError):
+            table.get_exchange_rate(datetime(2024, 3, 4))
+        with self.assertRaises(ValueError):
+            self.service.get_yiufe_index(datetime(2024, 1, 31))
+
+        cache = RateCacheService.get_instance()
+        for date_str in ('04-03-2024', '05-03-2024'):
+            self.assertFalse(self.database.is_rate_missing('exchange_rate', date_str))
+            self.assertIsNone(cache.get_exchange_rate(date_str))
+        self.assertFalse(self.database.is_rate_missing('yiufe_index', '31-01-2024'))
+        self.assertIsNone(cache.get_yiufe_index('31-01-2024'))
+
+        # Once the source answers again the rates are fetched
+        self.source.failure_rate = 0.0
+        self.assertNotEqual(self.service.get_exchange_rate(datetime(2024, 3, 4)), DEFAULT_EXCHANGE_RATE)
+
+    def test_yiufe_rate_between_months(self):
+        rate = self.service.get_yiufe_index_rate(datetime(2023, 3, 10), datetime(2024, 3, 20))
+        buy_index = self.service.get_yiufe_index(datetime(2023, 1, 31))
+        sell_index = self.service.get_yiufe_index(datetime(2024, 1, 31))
+
+        self.assertEqual(rate, Decimal(str((sell_index - buy_index) / buy_index * 100)))
+
+    def test_resolve_rates_batches_distinct_dates(self):
+        requirements = RateRequirements()
+        trade_dates = [date(2023, 3, 10), date(2023, 11, 4), date(2024, 3, 20), date(2024, 10, 1)]
+        requirements.add_exchange_dates(trade_dates)
+        requirements.add_yiufe_dates(trade_dates)
+
+        table = self.service.resolve_rates(requirements)
+        calls = self.source.calls
+        rates = [table.get_exchange_rate(datetime.combine(day, datetime.min.time())) for day in trade_dates]
+        yiufe_rate = table.get_yiufe_index_rate(datetime(2023, 3, 10), datetime(2024, 3, 20))
+
+        # One range call per series, none while computing
+        self.assertEqual(calls, 2)
+        self.assertEqual(self.source.calls, calls)
+        self.assertEqual(rates[1], self.service.get_exchange_rate(datetime(2023, 11, 6)))
+        self.assertEqual(rates[3], DEFAULT_EXCHANGE_RATE)
+        self.assertIsNotNone(yiufe_rate)
+        self.assertIsNone(table.get_yiufe_index_rate(datetime(2023, 3, 10), datetime(2024, 10, 1)))
+
+        RateCacheService.get_instance().clear()
+        fresh = EvdsService(self.database, self.source)
+        self.assertEqual(fresh.get_yiufe_index_rate(datetime(2023, 3, 10), datetime(2024, 3, 20)), yiufe_rate)
+        self.assertEqual(self.source.calls, calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import time
+import unittest
+
+from pathlib import Path
+from utils.file_manager import FileManager
+
+
+class FileManagerReportDirectoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.temp_dir.name)
+        self.file_manager = FileManager()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_every_report_gets_its_own_directory(self):
+        first_id, first_dir = self.file_manager.create_report_directory(self.base_dir)
+        second_id, second_dir = self.file_manager.create_report_directory(self.base_dir)
+
+        self.assertNotEqual(first_id, second_id)
+        self.assertNotEqual(first_dir, second_dir)
+        self.assertEqual(self.file_manager.get_report_directory(self.base_dir, first_id), first_dir)
+
+    def test_unknown_and_malformed_ids_are_rejected(self):
+        (self.base_dir / 'nested').mkdir()
+
+        self.assertIsNone(self.file_manager.get_report_directory(self.base_dir, 'a' * 32))
+        self.assertIsNone(self.file_manager.get_report_directory(self.base_dir, 'nested'))
+        self.assertIsNone(self.file_manager.get_report_directory(self.base_dir, '../' + 'a' * 29))
+
+    def test_only_stale_directories_are_removed(self):
+        old_id, old_dir = self.file_manager.create_report_directory(self.base_dir)
+        new_id, new_dir = self.file_manager.create_report_directory(self.base_dir)
+        an_hour_ago = time.time() - 3600
+        os.utime(old_dir, (an_hour_ago, an_hour_ago))
+
+        self.file_manager.remove_stale_directories(self.base_dir, max_age_seconds=60)
+
+        self.assertFalse(old_dir.exists())
+        self.assertTrue(new_dir.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import signal
+import tempfile
+import time
+import unittest
+
+from pathlib import Path
+from services.job_service import JOB_DONE, JobService
+from utils.statement_generator import StatementGenerator
+
+
+class JobServiceTest(unittest.TestCase):
+    """Jobs on real worker processes, with the in-memory database and the fake rate source"""
+
+    def setUp(self):
+        self.environ = dict(os.environ)
+        os.environ.update({'DATABASE': 'memory', 'RATE_SOURCE': 'fake'})
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.service = JobService(max_workers=1, jobs_dir=Path(self.temp_dir.name))
+
+    def tearDown(self):
+        self.service.shutdown()
+        self.temp_dir.cleanup()
+        os.environ.clear()
+        os.environ.update(self.environ)
+
+    def _wait(self, job):
+        deadline = time.monotonic() + 120
+        while not job.is_finished and time.monotonic() < deadline:
+            time.sleep(0.1)
+        self.assertTrue(job.is_finished)
+
+    def test_jobs_run_after_a_worker_dies(self):
+        broken = self.service.executor
+        os.kill(broken.submit(os.getpid).result(timeout=120), signal.SIGKILL)
+
+        # Whether it is submitted before or after the pool notices, the first job finishes
+        self._wait(self.service.submit(lambda path: StatementGenerator(seed=1).write(path, 200)))
+        job = self.service.submit(lambda path: StatementGenerator(seed=2).write(path, 200))
+        self._wait(job)
+
+        self.assertIsNot(self.service.executor, broken)
+        self.assertEqual(job.status, JOB_DONE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+
+from unittest.mock import patch
+from services import logger_service
+from services.logger_service import LoggerService
+
+
+class LoggerServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.warning_path = os.path.join(self.temp_dir.name, 'warning.log')
+        self.info_path = os.path.join(self.temp_dir.name, 'info.log')
+        patches = [
+            patch.object(logger_service, 'WARNING_LOG_PATH', self.warning_path),
+            patch.object(logger_service, 'INFO_LOG_PATH', self.info_path)
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.logger = LoggerService()
+
+    def tearDown(self):
+        self.logger.close()
+        self.temp_dir.cleanup()
+
+    def _lines(self, path: str):
+        with open(path, encoding='utf-8') as f:
+            return f.read().splitlines()
+
+    def test_flush_writes_entries_in_order(self):
+        for i in range(2500):
+            self.logger.log_info(f"satır {i}")
+        self.logger.flush()
+
+        lines = self._lines(self.info_path)
+        self.assertEqual(len(lines), 2500)
+        self.assertTrue(lines[0].endswith('INFO: satır 0'))
+        self.assertTrue(lines[-1].endswith('INFO: satır 2499'))
+
+    def test_repeated_warnings_are_written_once_with_a_count(self):
+        for _ in range(5):
+            self.logger.log_warning("No rate found")
+        self.logger.log_warning("Other warning")
+        self.logger.flush()
+
+        lines = self._lines(self.warning_path)
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].endswith('WARNING: No rate found'))
+        self.assertTrue(lines[1].endswith('WARNING: Other warning'))
+        self.assertTrue(lines[2].endswith('WARNING: (repeated 4 more times) No rate found'))
+
+    def test_the_writer_survives_failing_entries(self):
+        self.logger.log_info("lone surrogate \ud800")
+        self.logger.flush()
+        with patch.object(self.logger, '_write_batch', side_effect=RuntimeError("disk full")):
+            self.logger.log_info("lost")
+            self.logger.flush()
+        self.logger.log_info("after")
+        self.logger.flush()
+
+        lines = self._lines(self.info_path)
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].endswith('INFO: lone surrogate \\ud800'))
+        self.assertTrue(lines[1].endswith('INFO: after'))
+        self.assertTrue(self.logger._thread.is_alive())
+
+    def test_files_are_rotated(self):
+        with patch.object(logger_service, 'LOG_MAX_BYTES', 100), patch.object(logger_service, 'LOG_BACKUP_COUNT', 2):
+            for i in range(20):
+                self.logger.log_info(f"message number {i:02d}")
+            self.logger.flush()
+
+        self.assertTrue(os.path.exists(f"{self.info_path}.1"))
+        self.assertTrue(os.path.exists(f"{self.info_path}.2"))
+        self.assertFalse(os.path.exists(f"{self.info_path}.3"))
+        self.assertTrue(self._lines(self.info_path)[-1].endswith('message number 19'))
+
+    def test_a_failed_write_closes_the_file(self):
+        self.logger.log_info("first")
+        self.logger.flush()
+        handle = self.logger._files[self.info_path]
+
+        class FailingFile:
+            def write(self, text):
+                raise OSError("disk full")
+
+            def close(self):
+                handle.close()
+
+        self.logger._files[self.info_path] = FailingFile()
+        self.logger.log_info("lost")
+        self.logger.flush()
+
+        self.assertTrue(handle.closed)
+        self.assertNotIn(self.info_path, self.logger._files)
+        self.assertNotIn(self.info_path, self.logger._sizes)
+
+    def test_a_failed_rotation_reopens_the_file(self):
+        with patch.object(logger_service, 'LOG_MAX_BYTES', 100), patch.object(logger_service, 'LOG_BACKUP_COUNT', 2):
+            with patch.object(logger_service.os, 'replace', side_effect=OSError("busy")):
+                for i in range(5):
+                    self.logger.log_info(f"message number {i:02d}")
+                self.logger.flush()
+
+            self.assertNotIn(self.info_path, self.logger._sizes)
+            self.logger.log_info("after")
+            self.logger.flush()
+
+        # The reopened file starts from its size on disk, so it is rotated right away
+        self.assertFalse(os.path.exists(self.info_path))
+        self.assertEqual(len(self._lines(f"{self.info_path}.1")), 6)
+        self.assertTrue(self._lines(f"{self.info_path}.1")[-1].endswith('INFO: after'))
+
+
+
+if __name__ == '__main__':
+    unittest.main()
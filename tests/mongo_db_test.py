@@ -0,0 +1,76 @@
+import unittest
+
+from databases.mongo_db import MongoDB
+from decimal import Decimal
+from services.logger_service import LoggerService
+from unittest.mock import patch
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+
+@unittest.skipIf(mongomock is None, 'mongomock is not installed')
+class MongoDBTest(unittest.TestCase):
+    """MongoDB against an in-memory mongomock client"""
+
+    def setUp(self):
+        # pymongo 4.11+ passes sort to bulk updates, which mongomock does not accept yet
+        add_update = mongomock.collection.BulkOperationBuilder.add_update
+
+        def add_update_without_sort(builder, *args, sort=None, **kwargs):
+            return add_update(builder, *args, **kwargs)
+
+        p = patch.object(mongomock.collection.BulkOperationBuilder, 'add_update', add_update_without_sort)
+        p.start()
+        self.addCleanup(p.stop)
+
+        self.database = MongoDB(mongomock.MongoClient())
+        self.database.ensure_indexes()
+
+    def test_bulk_saves_keep_existing_dates(self):
+        self.database.save_exchange_rates({'01-03-2024': Decimal('31.5'), '02-03-2024': Decimal('31.6')})
+        self.database.save_exchange_rates({'02-03-2024': Decimal('99'), '03-03-2024': Decimal('31.7')})
+        self.database.save_yiufe_indices({'31-01-2024': Decimal('3035.59')})
+        self.database.save_yiufe_index('31-01-2024', Decimal('1'))
+
+        self.assertEqual(self.database.get_exchange_rates(['01-03-2024', '02-03-2024', '03-03-2024']),
+                         {'01-03-2024': 31.5, '02-03-2024': 31.6, '03-03-2024': 31.7})
+        self.assertEqual(self.database.get_yiufe_indices(['31-01-2024']), {'31-01-2024': Decimal('3035.59')})
+        self.assertEqual(self.database.exchange_rates.count_documents({}), 3)
+        self.assertEqual(self.database.yiufe_indices.count_documents({}), 1)
+
+    def test_bulk_getters_leave_out_missing_dates(self):
+        self.database.save_exchange_rates({'01-03-2024': Decimal('31.5')})
+        self.database.save_yiufe_indices({'31-01-2024': Decimal('3035.59')})
+
+        self.assertEqual(self.database.get_exchange_rates(['01-03-2024', '04-03-2024']), {'01-03-2024': 31.5})
+        self.assertEqual(self.database.get_yiufe_indices(['29-02-2024']), {})
+        self.assertEqual(self.database.get_exchange_rates([]), {})
+        self.assertIsNone(self.database.get_exchange_rate('04-03-2024'))
+
+    def test_missing_rates_expire(self):
+        self.database.save_missing_rate('exchange_rate', '01-08-2024', ttl_seconds=60)
+        self.database.save_missing_rate('yiufe_index', '31-07-2024', ttl_seconds=-1)
+
+        self.assertTrue(self.database.is_rate_missing('exchange_rate', '01-08-2024'))
+        self.assertFalse(self.database.is_rate_missing('yiufe_index', '01-08-2024'))
+        self.assertFalse(self.database.is_rate_missing('yiufe_index', '31-07-2024'))
+
+    def test_duplicate_dates_are_logged_instead_of_failing(self):
+        database = MongoDB(mongomock.MongoClient())
+        database.exchange_rates.insert_many([{'date': '01-03-2024', 'rate': 31.5}, {'date': '01-03-2024', 'rate': 31.5}])
+
+        with patch.object(LoggerService.get_instance(), 'log_error') as log_error:
+            database.ensure_indexes()
+
+        log_error.assert_called_once()
+        self.assertIn('exchange_rates', log_error.call_args.args[0])
+        self.assertEqual(database.exchange_rates.count_documents({}), 2)
+        # The other collections still get their indexes
+        self.assertIn('date_1', database.yiufe_indices.index_information())
+
+
+if __name__ == '__main__':
+    unittest.main()
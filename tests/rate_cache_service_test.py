@@ -0,0 +1,77 @@
+import threading
+import unittest
+
+from decimal import Decimal
+from services.rate_cache_service import MISSING, LRUCache, RateCacheService
+
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_counts_hits_and_misses(self):
+        cache = LRUCache(max_size=10)
+        cache.set('a', 1)
+        cache.get('a')
+        cache.get('a')
+        cache.get('missing')
+
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_missing_entries_expire(self):
+        cache = LRUCache(max_size=10)
+        cache.set_missing('unpublished', ttl_seconds=60)
+        cache.set_missing('expired', ttl_seconds=0)
+
+        self.assertIs(cache.get('unpublished'), MISSING)
+        self.assertIsNone(cache.get('expired'))
+        self.assertEqual(cache.stats()['negative_hits'], 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_concurrent_writers_respect_size_limit(self):
+        cache = LRUCache(max_size=100)
+
+        def fill(offset):
+            for i in range(1000):
+                cache.set(offset + i, i)
+                cache.get(offset + i)
+
+        threads = [threading.Thread(target=fill, args=(n * 1000,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(cache), 100)
+        self.assertEqual(cache.stats()['hits'] + cache.stats()['misses'], 8000)
+
+
+class RateCacheServiceTest(unittest.TestCase):
+
+    def test_instance_is_shared(self):
+        self.assertIs(RateCacheService.get_instance(), RateCacheService.get_instance())
+
+    def test_stores_rates_as_decimal(self):
+        cache = RateCacheService(max_size=10)
+        cache.set_exchange_rate('02-01-2024', 29.5314)
+        cache.set_yiufe_index('31-12-2023', Decimal('3035.59'))
+
+        self.assertEqual(cache.get_exchange_rate('02-01-2024'), Decimal('29.5314'))
+        self.assertEqual(cache.get_yiufe_index('31-12-2023'), Decimal('3035.59'))
+        self.assertEqual(cache.stats()['exchange_rates']['size'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
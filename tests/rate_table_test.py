@@ -0,0 +1,61 @@
+import unittest
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from services.rate_table import RateTable, convert_to_try
+
+
+class StubRateService:
+    """Rates of every date, counting the lookups the table could not serve"""
+
+    def __init__(self):
+        self.lookups = 0
+
+    def get_exchange_rate(self, date: datetime) -> float:
+        self.lookups += 1
+        return 30 + date.toordinal() % 7 / 8
+
+    def get_next_available_exchange_rate(self, date: datetime) -> float:
+        return self.get_exchange_rate(date + timedelta(days=1))
+
+
+class RateTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = StubRateService()
+        planned = [date(2024, 1, 1) + timedelta(days=i) for i in range(0, 60, 2)]
+        self.table = RateTable({day: self.service.get_exchange_rate(day) for day in planned}, self.service)
+        self.service.lookups = 0
+
+    def test_column_conversion_matches_row_by_row(self):
+        dates = [datetime(2024, 1, 1) + timedelta(days=i % 60) for i in range(0, 500, 2)]
+        amounts = [Decimal(f"{i * 37 % 1000 - 400}.{i % 100:02d}") for i in range(len(dates))]
+
+        converted, rates = convert_to_try(self.table, amounts, dates)
+
+        expected_rates = [Decimal(str(self.table.get_exchange_rate(day))) for day in dates]
+        expected = [amount * rate for amount, rate in zip(amounts, expected_rates)]
+        self.assertEqual([str(value) for value in converted], [str(value) for value in expected])
+        self.assertEqual(rates, expected_rates)
+        self.assertEqual(self.service.lookups, 0)
+
+    def test_dates_outside_the_table_are_looked_up(self):
+        dates = [datetime(2024, 1, 2), datetime(2024, 1, 3), datetime(2023, 12, 1)]
+
+        converted, rates = convert_to_try(self.table, [Decimal('10')] * 3, dates)
+
+        self.assertEqual(self.service.lookups, 2)
+        self.assertEqual(rates[1], Decimal(str(self.service.get_exchange_rate(dates[1]))))
+        self.assertEqual(converted[2], Decimal('10') * rates[2])
+
+    def test_unresolved_rates_raise(self):
+        def unavailable(date):
+            raise ValueError(f"Could not get exchange rate for {date:%d-%m-%Y}")
+        self.service.get_exchange_rate = unavailable
+
+        with self.assertRaises(ValueError):
+            convert_to_try(self.table, [Decimal('10')] * 2, [datetime(2024, 1, 1), datetime(2023, 12, 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import unittest
+
+from decimal import Decimal
+from pathlib import Path
+from services.report_cache_service import SUMMARY_NAME, ReportCacheService
+
+
+class ReportCacheServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.work_dir = Path(self.temp_dir.name)
+        self.cache = ReportCacheService(cache_dir=self.work_dir / 'cache', max_bytes=10 * 1024)
+        self.created = 0
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _upload(self, name: str, content: str) -> Path:
+        path = self.work_dir / name
+        path.write_text(content)
+        return path
+
+    def _create(self, input_path: Path, report_path: Path, report: str):
+        def create():
+            self.created += 1
+            os.remove(input_path)
+            report_path.write_text(report)
+            return {'totals': {'TL': Decimal('12.345678')}}
+        return create
+
+    def test_identical_uploads_are_served_from_the_cache(self):
+        first_input = self._upload('first.csv', 'Trades,Header\n')
+        first_report = self.work_dir / 'first_report.csv'
+        first = self.cache.get_or_create(first_input, first_report, self._create(first_input, first_report, 'rapor'))
+
+        second_input = self._upload('second.csv', 'Trades,Header\n')
+        second_report = self.work_dir / 'second_report.csv'
+        second = self.cache.get_or_create(second_input, second_report, self._create(second_input, second_report, 'yeni'))
+
+        self.assertEqual(self.created, 1)
+        self.assertEqual(first['totals'], second['totals'])
+        self.assertEqual(second['diagnostics'], {'report_cache_hit': True})
+        self.assertEqual(second_report.read_text(), 'rapor')
+        self.assertFalse(second_input.exists())
+
+    def test_reports_with_unresolved_rates_are_not_cached(self):
+        input_path = self._upload('first.csv', 'Trades,Header\n')
+        report_path = self.work_dir / 'first_report.csv'
+        create = self._create(input_path, report_path, 'rapor')
+
+        def create_with_fallback():
+            return {**create(), 'diagnostics': {'counters': {'unresolved_rates': 2}}}
+
+        key = self.cache.key_for(input_path)
+        self.cache.get_or_create(input_path, report_path, create_with_fallback)
+
+        self.assertIsNone(self.cache.get(key, self.work_dir / 'cached.csv'))
+
+    def test_summaries_are_stored_as_json(self):
+        input_path = self._upload('first.csv', 'Trades,Header\n')
+        report_path = self.work_dir / 'first_report.csv'
+        key = self.cache.key_for(input_path)
+        self.cache.get_or_create(input_path, report_path, self._create(input_path, report_path, 'rapor'))
+
+        with open(self.cache.cache_dir / key / SUMMARY_NAME, encoding='utf-8') as f:
+            self.assertEqual(json.load(f), {'totals': {'TL': {'$decimal': '12.345678'}}})
+        self.assertEqual(self.cache.get(key, self.work_dir / 'cached.csv'), {'totals': {'TL': Decimal('12.345678')}})
+
+    def test_least_recently_used_entries_are_evicted(self):
+        keys = []
+        for i in range(3):
+            input_path = self._upload(f'{i}.csv', f'statement {i}')
+            report_path = self.work_dir / f'{i}_report.csv'
+            keys.append(self.cache.key_for(input_path))
+            self.cache.get_or_create(input_path, report_path, self._create(input_path, report_path, 'x' * 4000))
+            os.utime(self.cache.cache_dir / keys[-1], (i, i))
+
+        self.assertIsNone(self.cache.get(keys[0], self.work_dir / 'evicted.csv'))
+        self.assertIsNotNone(self.cache.get(keys[2], self.work_dir / 'kept.csv'))
+
+
+if __name__ == '__main__':
+    unittest.main()
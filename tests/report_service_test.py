@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from databases.memory_db import MemoryDB
+from datetime import date
+from parsers.dividend_parser import DividendParser
+from parsers.fee_parser import FeeParser
+from parsers.trade_parser import TradeParser
+from parsers.withholding_tax_parser import WithholdingTaxParser
+from rate_sources.fake_rate_source import FakeRateSource
+from services.evds_service import EvdsService
+from services.rate_cache_service import RateCacheService
+from services.report_service import ReportService
+from utils.statement_generator import StatementGenerator
+from writers.csv_report_writer import CSVReportWriter
+
+
+class ReportServiceTest(unittest.TestCase):
+    """Whole reports against the local rate source and database, without network access"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.statement_path = os.path.join(cls.temp_dir.name, 'statement.csv')
+        StatementGenerator(seed=7, start=date(2023, 1, 2), days=500).write(cls.statement_path, 600)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def _run(self, name: str, **options):
+        RateCacheService.get_instance().clear()
+        evds_service = EvdsService(MemoryDB(), FakeRateSource(published_until=date(2024, 6, 30)))
+        parsers = [TradeParser(evds_service), FeeParser(evds_service),
+                   DividendParser(evds_service), WithholdingTaxParser(evds_service)]
+
+        input_path = os.path.join(self.temp_dir.name, f'{name}.csv')
+        report_path = os.path.join(self.temp_dir.name, f'{name}_report.csv')
+        shutil.copyfile(self.statement_path, input_path)
+        with CSVReportWriter(report_path) as writer:
+            summary = ReportService(parsers, writer, evds_service, **options).process_report(input_path)
+
+        with open(report_path, encoding='utf-8-sig') as f:
+            return summary, f.read()
+
+    def test_parallel_parsing_matches_the_sequential_run(self):
+        sequential_summary, sequential_report = self._run('sequential', parse_workers=1)
+
+        for engine in ('pandas', 'stream'):
+            summary, report = self._run(f'parallel_{engine}', engine=engine, parse_workers=4)
+            self.assertEqual(report, sequential_report)
+            self.assertEqual(summary['categories'], sequential_summary['categories'])
+            self.assertEqual(summary['tax_summary'], sequential_summary['tax_summary'])
+
+
+
+class SplitIntoSectionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.service = ReportService(parsers=[], writer=None)
+
+    def _split(self, rows):
+        df = pd.DataFrame([[name, row_type, str(i)] for i, (name, row_type) in enumerate(rows)])
+        return [(name, section.iloc[:, 2].tolist()) for name, section in self.service._split_into_sections(df)]
+
+    def test_rows_before_the_first_header_are_ignored(self):
+        sections = self._split([('Statement', 'Data'), ('Statement', 'Data'), ('Trades', 'Header'), ('Trades', 'Data')])
+
+        self.assertEqual(sections, [('Trades', ['2', '3'])])
+
+    def test_consecutive_headers_give_a_section_of_only_its_header(self):
+        sections = self._split([('Fees', 'Header'), ('Trades', 'Header'), ('Trades', 'Data')])
+
+        self.assertEqual(sections, [('Fees', ['0']), ('Trades', ['1', '2'])])
+
+    def test_a_repeated_section_name_gives_separate_sections(self):
+        sections = self._split([('Trades', 'Header'), ('Trades', 'Data'),
+                                ('Trades', 'Header'), ('Trades', 'Data'), ('Trades', 'Data')])
+
+        self.assertEqual(sections, [('Trades', ['0', '1']), ('Trades', ['2', '3', '4'])])
+
+    def test_the_last_section_runs_to_the_end_of_the_file(self):
+        sections = self._split([('Trades', 'Header'), ('Trades', 'Data'), ('Dividends', 'Header'),
+                                ('Dividends', 'Data'), ('Dividends', 'Total')])
+
+        self.assertEqual(sections[-1], ('Dividends', ['2', '3', '4']))
+
+    def test_empty_statement_has_no_sections(self):
+        self.assertEqual(self.service._split_into_sections(pd.DataFrame()), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from utils.statement_generator import StatementGenerator
+
+
+class StatementGeneratorTest(unittest.TestCase):
+
+    def test_same_seed_gives_the_same_statement(self):
+        first = list(StatementGenerator(seed=3).rows(2000))
+        second = list(StatementGenerator(seed=3).rows(2000))
+        other = list(StatementGenerator(seed=4).rows(2000))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+
+    def test_statement_has_the_requested_size_and_sections(self):
+        rows = list(StatementGenerator().rows(5000))
+        sections = {row[0] for row in rows if row[1] == 'Header'}
+        discriminators = {row[2] for row in rows if row[0] == 'Trades' and row[1] == 'Data'}
+
+        self.assertAlmostEqual(len(rows), 5000, delta=10)
+        self.assertTrue({'Trades', 'Dividends', 'Withholding Tax', 'Fees'} <= sections)
+        self.assertEqual(discriminators, {'Order', 'Trade', 'ClosedLot'})
+        self.assertTrue(all(len(row) <= 17 for row in rows))
+
+
+if __name__ == '__main__':
+    unittest.main()
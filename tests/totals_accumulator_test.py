@@ -0,0 +1,46 @@
+import unittest
+
+from datetime import datetime
+from decimal import Decimal
+from models.domains.dividend import Dividend
+from parsers.trade_parser import TradeParser
+from services.totals_accumulator import TotalsAccumulator
+from trade_parser_test import StubRateService, build_trades_section
+
+
+class TotalsAccumulatorTest(unittest.TestCase):
+
+    def test_trade_store_and_trade_list_give_the_same_totals(self):
+        df = build_trades_section(2000, seed=5)
+        trades = TradeParser(StubRateService(), columnar=False).parse(df)
+        store = TradeParser(StubRateService(), columnar=True).parse(df)
+
+        by_item, by_column = TotalsAccumulator(), TotalsAccumulator()
+        item_totals = by_item.section("Trades")
+        for trade in trades:
+            item_totals.add(trade)
+        column_totals = by_column.section("Trades")
+        column_totals.add_all(store)
+
+        self.assertEqual(str(item_totals.tl), str(sum(trade.amount_tl for trade in trades if trade.amount_tl)))
+        for name in ('usd', 'tl', 'taxable'):
+            self.assertEqual(str(getattr(column_totals, name)), str(getattr(item_totals, name)))
+        self.assertEqual(str(by_column.categories), str(by_item.categories))
+        self.assertEqual(by_item.categories['Opsiyon']['TL'],
+                         sum((trade.taxable_amount_tl for trade in trades if trade.is_option), Decimal('0')))
+
+    def test_categories_add_up_across_sections(self):
+        accumulator = TotalsAccumulator()
+        for amount in ('10.50', '-0.25'):
+            accumulator.section("Dividends").add_all([Dividend(
+                date=datetime(2024, 1, 2), description='Brüt Temettü', amount_usd=Decimal(amount),
+                amount_tl=Decimal(amount) * 30, taxable_amount_tl=Decimal(amount) * 30, exchange_rate=Decimal('30'),
+                symbol='AAPL')])
+        accumulator.section("Unknown").add_all([])
+
+        self.assertEqual(accumulator.categories['Temettü'], {'USD': Decimal('10.25'), 'TL': Decimal('307.50')})
+        self.assertEqual(accumulator.grand_totals(), {'USD': Decimal('10.25'), 'TL': Decimal('307.50')})
+
+
+if __name__ == '__main__':
+    unittest.main()
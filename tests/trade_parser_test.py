@@ -0,0 +1,212 @@
+import os
+import random
+import unittest
+
+import pandas as pd
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from models.domains.closed_lot import ClosedLot
+from models.domains.order import Order
+from models.domains.trade import Trade
+from parsers.trade_parser import TradeParser
+from typing import List, Sequence
+
+# Trades of the columnar vs row by row comparison; the generator adds NaN rows
+# every 1000 trades. Set TRADE_PARSER_TEST_TRADES=100000 for the full-size run
+TRADE_COUNT = int(os.environ.get('TRADE_PARSER_TEST_TRADES', 5_000))
+TRADE_FIELDS = [
+    'symbol', 'date', 'amount_usd', 'quantity', 'commission', 'commission_tl', 'is_option', 'price',
+    'buy_date', 'sell_date', 'buy_exchange_rate', 'exchange_rate', 'buy_amount_tl', 'sell_amount_tl',
+    'buy_price', 'sell_price', 'yiufe_rate', 'description', 'amount_tl', 'indexed_buy_amount_tl',
+    'taxable_amount_tl'
+]
+
+
+class StubRateService:
+    """Deterministic rates, so both parsing paths see the same values without EVDS"""
+
+    def get_exchange_rate(self, date: datetime) -> Decimal:
+        return Decimal(date.toordinal() % 3000 + 10000) / Decimal('1000')
+
+    def get_next_available_exchange_rate(self, date: datetime) -> Decimal:
+        return self.get_exchange_rate(date + timedelta(days=1))
+
+    def get_yiufe_index_rate(self, buy_date: datetime, sell_date: datetime) -> Decimal:
+        return Decimal((sell_date.year - buy_date.year) * 12 + sell_date.month - buy_date.month) * Decimal('2.5')
+
+    def get_yiufe_index_rates(self, buy_dates: Sequence[datetime], sell_dates: Sequence[datetime]) -> List[Decimal]:
+        return [self.get_yiufe_index_rate(buy_date, sell_date) for buy_date, sell_date in zip(buy_dates, sell_dates)]
+
+
+def build_trades_section(trade_count: int, seed: int = 7) -> pd.DataFrame:
+    rng = random.Random(seed)
+    header = ['Trades', 'Header', 'DataDiscriminator', 'Asset Category', 'Currency', 'Symbol', 'Date/Time',
+              'Exchange', 'Quantity', 'T. Price', 'Proceeds', 'Comm/Fee', 'Basis', 'Realized P/L', 'Code']
+    rows = [header]
+
+    def row(discriminator, category, symbol, date, quantity, price, commission, basis, realized):
+        return ['Trades', 'Data', discriminator, category, 'USD', symbol, date, 'NASDAQ', quantity, price,
+                '0', commission, basis, realized, '']
+
+    # Rows the parser must skip or attach to nothing
+    rows.append(row('Trade', 'Stocks', 'ORPHAN', '2023-01-02, 10:00:00', '-1', '10', '-1', '', '5'))
+    rows.append(row('ClosedLot', 'Stocks', 'ORPHAN', '2022-01-03', '1', '9', '', '9', '1'))
+
+    for i in range(trade_count):
+        category = rng.choice(['Stocks', 'Stocks', 'Equity and Index Options', 'Forex'])
+        symbol = rng.choice(['AAPL', 'MSFT', 'NVDA', 'TSLA']) + (' 19JAN24 150 C' if category != 'Stocks' else '')
+        sell_date = datetime(2021, 1, 1) + timedelta(days=rng.randrange(1400))
+        sign = 1 if rng.random() < 0.1 else -1
+        lots = [(rng.randint(1, 40), sell_date - timedelta(days=rng.randrange(1, 900)), f"{rng.uniform(1, 500):.4f}")
+                for _ in range(rng.randint(1, 3))]
+        quantity = str(sign * sum(q for q, _, _ in lots))
+        timestamp = f"{sell_date:%Y-%m-%d}, 10:30:00"
+        price = f"{rng.uniform(1, 600):.2f}"
+        commission = f"{-rng.uniform(0.3, 5):.6f}"
+        realized = f"{rng.uniform(-500, 800):.2f}"
+
+        if i % 1000 == 1:
+            timestamp = 'not a date'  # Invalid Trade row: its lots go to the previous trade
+        if i % 1000 == 2:
+            realized = ''
+        if i % 1000 == 4:
+            realized = 'nan'  # Invalid Trade row: its profit cannot be compared
+        order_quantity = quantity if i % 1000 != 5 else 'NaN'  # Invalid Order row: its trade goes to the previous order
+        if i % 1000 == 6:
+            commission = 'sNaN'  # Invalid Trade row: its commission has no absolute value
+
+        rows.append(row('Order', category, symbol, timestamp, order_quantity, price, commission, '', realized))
+        rows.append(row('Trade', category, symbol, timestamp, quantity, price, commission, '', realized))
+        for lot_quantity, buy_date, lot_price in lots:
+            buy = f"{buy_date:%Y-%m-%d}" if i % 1000 != 3 else f"{buy_date:%Y-%m-%d}, 09:00:00"
+            rows.append(row('ClosedLot', category, symbol, buy, str(-sign * lot_quantity), lot_price, '',
+                            f"{lot_quantity * float(lot_price):.2f}", f"{rng.uniform(-100, 200):.2f}"))
+
+        if i % 5000 == 0:
+            rows.append(['Trades', 'SubTotal', '', category, 'USD', symbol, '', '', '', '', '0', '0', '0', '0', ''])
+
+    rows.append(['Trades', 'Data', 'Total', 'Stocks', 'USD', '', '', '', '', '', '0', '0', '0', '0', ''])
+    return pd.DataFrame([r + [''] * (17 - len(r)) for r in rows])
+
+
+def parse_row_by_row(parser: TradeParser, df: pd.DataFrame):
+    """The original iterrows implementation of TradeParser.parse, used as the reference"""
+    trades, orders = [], []
+    current_order = None
+    current_trade = None
+
+    for _, row in df.iterrows():
+        try:
+            if row.iloc[1] != "Data":
+                continue
+            asset_category = str(row.iloc[3]).strip()
+            if asset_category == "Forex":
+                continue
+            if "Total" in str(row.iloc[2]):
+                continue
+            is_option = asset_category == "Equity and Index Options"
+            discriminator = row.iloc[2]
+
+            if discriminator == "Order":
+                current_order = Order(symbol=str(row.iloc[5]), quantity=Decimal(str(row.iloc[8])), is_option=is_option)
+                orders.append(current_order)
+            elif discriminator == "Trade":
+                current_trade = Trade(
+                    symbol=str(row.iloc[5]),
+                    date=datetime.strptime(str(row.iloc[6]).split(',')[0], '%Y-%m-%d'),
+                    amount_usd=Decimal(str(row.iloc[13])),
+                    quantity=Decimal(str(row.iloc[8])),
+                    commission=Decimal(str(row.iloc[11])),
+                    is_option=is_option,
+                    price=Decimal(str(row.iloc[9]))
+                )
+                if current_order:
+                    current_order.add_trade(current_trade)
+            elif discriminator == "ClosedLot":
+                if current_trade:
+                    current_trade.add_closed_lot(ClosedLot(
+                        quantity=Decimal(str(row.iloc[8])),
+                        buy_date=datetime.strptime(str(row.iloc[6]), '%Y-%m-%d'),
+                        basis=Decimal(str(row.iloc[12])),
+                        realized_pl=Decimal(str(row.iloc[13])),
+                        price=Decimal(str(row.iloc[9]))
+                    ))
+        except Exception:
+            continue
+
+    rates = parser.evds_service
+    for order in orders:
+        for trade in order.trades:
+            for lot in trade.closed_lots:
+                quantity = abs(lot.quantity)
+                is_short = lot.quantity < 0
+                lot_commission = trade.commission * abs(lot.quantity / trade.quantity)
+
+                if is_short:
+                    buy_date, sell_date, buy_price, sell_price = trade.sell_date, lot.buy_date, trade.price, lot.price
+                else:
+                    buy_date, sell_date, buy_price, sell_price = lot.buy_date, trade.sell_date, lot.price, trade.price
+                if trade.is_option:
+                    buy_price = buy_price * Decimal('100')
+                    sell_price = sell_price * Decimal('100')
+
+                buy_rate = rates.get_exchange_rate(buy_date)
+                sell_rate = rates.get_exchange_rate(sell_date)
+                trades.append(Trade(
+                    symbol=trade.symbol,
+                    date=buy_date,
+                    amount_usd=lot.realized_pl,
+                    quantity=-lot.quantity if not is_short else lot.quantity,
+                    commission=lot_commission,
+                    is_option=trade.is_option,
+                    price=trade.price,
+                    buy_date=buy_date,
+                    sell_date=sell_date,
+                    buy_exchange_rate=Decimal(str(buy_rate)),
+                    exchange_rate=Decimal(str(sell_rate)),
+                    buy_amount_tl=quantity * buy_price * Decimal(str(buy_rate)),
+                    sell_amount_tl=quantity * sell_price * Decimal(str(sell_rate)),
+                    buy_price=buy_price,
+                    sell_price=sell_price,
+                    is_short=is_short,
+                    yiufe_rate=rates.get_yiufe_index_rate(buy_date, sell_date)
+                ))
+
+    return trades
+
+
+def trade_values(trade: Trade) -> list:
+    return [getattr(trade, field) for field in TRADE_FIELDS]
+
+
+class TradeParserTest(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = TradeParser(StubRateService())
+
+    def test_columnar_parse_matches_row_by_row_parse(self):
+        df = build_trades_section(TRADE_COUNT)
+
+        expected = parse_row_by_row(self.parser, df)
+        actual = self.parser.parse(df)
+
+        self.assertGreater(len(expected), TRADE_COUNT)
+        self.assertEqual(len(actual), len(expected))
+        for expected_trade, actual_trade in zip(expected, actual):
+            self.assertEqual(trade_values(actual_trade), trade_values(expected_trade))
+            self.assertEqual(actual_trade.to_csv_row(), expected_trade.to_csv_row())
+
+    def test_skips_forex_and_total_rows(self):
+        df = build_trades_section(50)
+        forex_rows = df[df.iloc[:, 3] == 'Forex']
+
+        trades = self.parser.parse(df)
+
+        self.assertGreater(len(forex_rows), 0)
+        self.assertTrue(all(trade.symbol != 'ORPHAN' for trade in trades))
+        self.assertEqual(len(trades), len(parse_row_by_row(self.parser, df)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+import numpy as np
+
+from models.trade_store import TradeStore
+from parsers.trade_parser import TradeParser
+from trade_parser_test import StubRateService, build_trades_section, trade_values
+
+
+class TradeStoreTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        df = build_trades_section(3000, seed=11)
+        cls.trades = TradeParser(StubRateService(), columnar=False).parse(df)
+        cls.store = TradeParser(StubRateService(), columnar=True).parse(df)
+
+    def test_rows_match_trade_objects(self):
+        self.assertIsInstance(self.store, TradeStore)
+        self.assertEqual(len(self.store), len(self.trades))
+        for trade, row in zip(self.trades, self.store):
+            self.assertEqual(trade_values(row), trade_values(trade))
+            self.assertEqual(row.to_csv_row(), trade.to_csv_row())
+        self.assertEqual(trade_values(self.store[-1]), trade_values(self.trades[-1]))
+        with self.assertRaises(IndexError):
+            self.store[len(self.store)]
+
+    def test_totals_and_filters_match_sums_over_trades(self):
+        options = self.store.is_option
+
+        self.assertEqual(str(self.store.total('amount_tl', skip_empty=True)),
+                         str(sum(trade.amount_tl for trade in self.trades if trade.amount_tl)))
+        self.assertEqual(str(self.store.total('taxable_amount_tl', options)),
+                         str(sum(trade.taxable_amount_tl for trade in self.trades if trade.is_option)))
+        self.assertEqual([trade.symbol for trade in self.store.filter(~options)],
+                         [trade.symbol for trade in self.trades if not trade.is_option])
+        self.assertEqual(self.store.column('symbol').tolist(), [trade.symbol for trade in self.trades])
+        self.assertEqual(self.store.total('amount_usd', np.zeros(len(self.store), dtype=bool)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import threading
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from services.yiufe_rate_matrix import YiufeRateMatrix, month_ordinal
+
+
+class YiufeRateMatrixTest(unittest.TestCase):
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.resolved = []
+        self.matrix = YiufeRateMatrix(lambda day: day, self.resolve_index, lambda message: None)
+
+    def resolve_index(self, day: datetime) -> Decimal:
+        self.resolved.append(day)
+        # January blocks until released, like a slow EVDS call
+        if day.month == 1:
+            self.release.wait(5)
+        return Decimal(100 + day.month)
+
+    def test_months_are_resolved_outside_the_lock(self):
+        january, february = month_ordinal(datetime(2024, 1, 1)), month_ordinal(datetime(2024, 2, 1))
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            slow = executor.submit(self.matrix.index, january)
+            # February does not wait for January, which is still being resolved
+            self.assertEqual(executor.submit(self.matrix.index, february).result(timeout=2), Decimal(102))
+            self.assertFalse(slow.done())
+            self.release.set()
+            self.assertEqual(slow.result(timeout=2), Decimal(101))
+
+        self.assertEqual(self.matrix.rate(january, february), Decimal(str(Decimal(1) / Decimal(101) * 100)))
+
+    def test_a_month_is_resolved_once(self):
+        january = month_ordinal(datetime(2024, 1, 1))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(self.matrix.index, january) for _ in range(4)]
+            self.release.set()
+            indices = [future.result(timeout=2) for future in futures]
+
+        self.assertEqual(indices, [Decimal(101)] * 4)
+        self.assertEqual(len(self.resolved), 1)
+
+    def test_rates_match_rate_pair_by_pair(self):
+        self.release.set()
+        resolve_index = self.matrix._resolve_index
+        # Months from June 2024 on have no published index
+        self.matrix._resolve_index = lambda day: None if day >= datetime(2024, 6, 1) else resolve_index(day)
+        months = [month_ordinal(datetime(2024, month, 1)) for month in range(1, 9)]
+        buy_months = [months[i % 3] for i in range(40)]
+        # Repeated, reversed and unresolved pairs, in an order np.unique sorts differently
+        sell_months = [months[7 - i % 8] for i in range(40)]
+
+        rates = self.matrix.rates(buy_months, sell_months)
+
+        expected = [self.matrix.rate(buy, sell) for buy, sell in zip(buy_months, sell_months)]
+        self.assertEqual(rates, expected)
+        self.assertIn(None, rates)
+        self.assertEqual(rates[3], Decimal(str(Decimal(4) / Decimal(101) * 100)))
+        self.assertEqual(self.matrix.rates([], []), [])
+
+
+if __name__ == '__main__':
+    unittest.main()